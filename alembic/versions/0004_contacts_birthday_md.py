@@ -0,0 +1,38 @@
+"""contacts birthday month-day ordinal
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 11:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('contacts', sa.Column('birthday_md', sa.Integer(), nullable=True))
+    op.execute(
+        'UPDATE contacts SET birthday_md = '
+        'EXTRACT(MONTH FROM birthday) * 100 + EXTRACT(DAY FROM birthday)'
+    )
+    op.alter_column('contacts', 'birthday_md', nullable=False)
+    op.create_index(
+        'ix_contacts_user_id_birthday_md',
+        'contacts',
+        ['user_id', 'birthday_md'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_contacts_user_id_birthday_md', table_name='contacts')
+    op.drop_column('contacts', 'birthday_md')
@@ -22,5 +22,5 @@ html_static_path = ['_static']
 # Mock imports для залежностей які важко імпортувати
 autodoc_mock_imports = [
     'fastapi', 'sqlalchemy', 'pydantic', 'jose', 'passlib', 
-    'cloudinary', 'fastapi_mail', 'redis', 'slowapi'
+    'cloudinary', 'redis', 'slowapi'
 ]
\ No newline at end of file
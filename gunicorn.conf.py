@@ -0,0 +1,25 @@
+"""
+Production server settings.
+
+    gunicorn -c gunicorn.conf.py src.main:app
+
+The app is imported once in the master and forked into ``WEB_CONCURRENCY``
+uvicorn workers. Each worker opens its own database pools and Redis
+connections in the app lifespan and closes them on shutdown. On SIGTERM
+workers stop accepting connections, finish in-flight requests and run the
+lifespan shutdown; ones still busy after ``GRACEFUL_TIMEOUT`` are killed.
+"""
+import os
+
+from src.core.config import settings
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = settings.WEB_CONCURRENCY
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = True
+graceful_timeout = settings.GRACEFUL_TIMEOUT
+# Longer than any request the API serves, imports and avatar uploads included
+timeout = 120
+keepalive = 5
+accesslog = "-"
+errorlog = "-"
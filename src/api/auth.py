@@ -1,66 +1,67 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
-import cloudinary
-import cloudinary.uploader
+from fastapi import APIRouter, Depends, HTTPException, Request, status, UploadFile, File
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.database import get_db
 from src.core.config import settings
 from src.core.auth import create_access_token
 from src.core.dependencies import get_current_user
+from src.core.rate_limit import enforce_auth_limits
 from src.schemas.user import UserCreate, UserLogin, UserResponse, Token
 from src.crud import user as crud_user
-from src.services.email import send_verification_email
-
-# Cloudinary configuration
-cloudinary.config(
-    cloud_name=settings.CLOUDINARY_CLOUD_NAME,
-    api_key=settings.CLOUDINARY_API_KEY,
-    api_secret=settings.CLOUDINARY_API_SECRET
-)
+from src.services.email import enqueue_verification_email
+from src.services import avatars
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register_user(user: UserCreate, db: Session = Depends(get_db)):
+async def register_user(
+    user: UserCreate, request: Request, db: AsyncSession = Depends(get_db)
+):
     """Register new user and send verification email."""
-    db_user = crud_user.get_user_by_email(db, email=user.email)
+    await enforce_auth_limits(request, "register", user.email)
+    
+    db_user = await crud_user.get_user_by_email(db, email=user.email)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="User with this email already exists"
         )
     
-    new_user = crud_user.create_user(db=db, user=user)
+    new_user = await crud_user.create_user(db=db, user=user)
     
     try:
-        await send_verification_email(new_user.email, new_user.id)
+        await enqueue_verification_email(new_user.email, new_user.id)
     except Exception as e:
-        print(f"Failed to send verification email: {e}")
+        print(f"Failed to queue verification email: {e}")
     
     return new_user
 
 @router.post("/login", response_model=Token)
-def login_user(user_credentials: UserLogin, db: Session = Depends(get_db)):
+async def login_user(
+    user_credentials: UserLogin, request: Request, db: AsyncSession = Depends(get_db)
+):
     """Authenticate user and return JWT token."""
-    user = crud_user.authenticate_user(db, user_credentials.email, user_credentials.password)
+    await enforce_auth_limits(request, "login", user_credentials.email)
+    
+    user = await crud_user.authenticate_user(db, user_credentials.email, user_credentials.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
         )
     
-    access_token = create_access_token(data={"sub": user.email})
+    access_token = create_access_token(data={"sub": user.email, "uid": user.id})
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user_info(current_user: UserResponse = Depends(get_current_user)):
+async def get_current_user_info(current_user: UserResponse = Depends(get_current_user)):
     """Get current authenticated user information."""
     return current_user
 
 @router.post("/verify/{user_id}")
-def verify_email(user_id: int, db: Session = Depends(get_db)):
+async def verify_email(user_id: int, db: AsyncSession = Depends(get_db)):
     """Verify user email address."""
-    success = crud_user.verify_user_email(db, user_id)
+    success = await crud_user.verify_user_email(db, user_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -69,37 +70,44 @@ def verify_email(user_id: int, db: Session = Depends(get_db)):
     return {"message": "Email verified successfully"}
 
 @router.post("/avatar", response_model=UserResponse)
-def upload_avatar(
+async def upload_avatar(
     file: UploadFile = File(...),
     current_user: UserResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Upload user avatar to Cloudinary."""
+    """
+    Upload user avatar.
+    
+    The image is resized to 200x200 locally and stored in the configured
+    backend (Cloudinary or local files); identical uploads are stored once.
+    """
+    # Release the connection held since authentication; only the final write needs one
+    await db.close()
+    
     try:
-        result = cloudinary.uploader.upload(
-            file.file,
-            folder="avatars",
-            public_id=f"avatar_{current_user.id}",
-            overwrite=True,
-            transformation=[
-                {"width": 200, "height": 200, "crop": "fill"}
-            ]
+        data = await avatars.read_upload(file, settings.AVATAR_MAX_BYTES)
+        avatar_url = await avatars.store_avatar(data)
+    except avatars.AvatarTooLarge:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Avatar file is too large"
         )
-        
-        updated_user = crud_user.update_user_avatar(
-            db, current_user.id, result["secure_url"]
+    except avatars.InvalidAvatar:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File is not a supported image"
         )
-        
-        if not updated_user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-        
-        return updated_user
-        
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error uploading avatar: {str(e)}"
-        )
\ No newline at end of file
+        )
+    
+    updated_user = await crud_user.update_user_avatar(db, current_user.id, avatar_url)
+    if not updated_user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
+    return updated_user
@@ -1,61 +1,205 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
 from src.core.database import get_db
-from src.core.dependencies import get_current_user
+from src.core.dependencies import get_current_user, get_read_db, contacts_etag, contacts_version
+from src.core.pagination import encode_cursor, decode_cursor
 from src.models.user import User
-from src.schemas.contact import ContactCreate, ContactUpdate, ContactResponse
+from src.schemas.contact import (
+    ContactCreate, ContactUpdate, ContactResponse, ContactImportResult,
+    ContactBatchRequest, ContactBatchResult
+)
 from src.crud import contact as crud_contact
+from src.crud import search as crud_search
+from src.services import contact_cache, contact_export, contact_import
 
 router = APIRouter(prefix="/contacts", tags=["contacts"])
 
 @router.post("/", response_model=ContactResponse, status_code=201)
-def create_contact(
+async def create_contact(
     contact: ContactCreate, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create new contact for authenticated user."""
-    return crud_contact.create_contact(db=db, contact=contact, user_id=current_user.id)
+    return await crud_contact.create_contact(db=db, contact=contact, user_id=current_user.id)
 
-@router.get("/", response_model=List[ContactResponse])
-def get_contacts(
+@router.post("/import", response_model=ContactImportResult)
+async def import_contacts(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    skip_existing: bool = Query(False),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Bulk import contacts from a streamed CSV or NDJSON request body.
+    
+    The format comes from ``format`` or the ``Content-Type`` header
+    (``text/csv`` / ``application/x-ndjson``). CSV needs a header row with
+    contact field names. With ``skip_existing`` rows whose email the user
+    already has are skipped. Invalid rows are reported, valid ones are saved.
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        if "csv" in content_type:
+            format = "csv"
+        elif "ndjson" in content_type or "jsonl" in content_type:
+            format = "ndjson"
+        else:
+            raise HTTPException(
+                status_code=415,
+                detail="Send text/csv or application/x-ndjson, or pass format"
+            )
+    
+    return await contact_import.import_contacts(
+        db=db,
+        user_id=current_user.id,
+        chunks=request.stream(),
+        fmt=format,
+        skip_existing=skip_existing
+    )
+
+@router.post("/batch", response_model=List[ContactBatchResult])
+async def batch_contacts(
+    batch: ContactBatchRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Apply create, update and delete operations in one transaction.
+    
+    Operations run in order and each gets its own result: ``201`` with the
+    new id for creates, ``200`` for updates and deletes, ``404`` if the
+    contact does not exist. Writes are set-based, so the whole batch costs
+    a handful of statements and a single commit.
+    """
+    return await crud_contact.apply_contact_batch(
+        db=db, operations=batch.operations, user_id=current_user.id
+    )
+
+@router.get("/", response_model=List[ContactResponse], dependencies=[Depends(contacts_etag)])
+async def get_contacts(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None),
+    q: Optional[str] = Query(None),
     first_name: Optional[str] = Query(None),
     last_name: Optional[str] = Query(None),
     email: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+    version: Optional[int] = Depends(contacts_version)
+):
+    """
+    Get user contacts with optional filtering.
+    
+    Pass ``cursor`` from the previous page's ``X-Next-Cursor`` header (or
+    ``Link: rel="next"``) to seek past it instead of using ``skip``.
+    ``q`` searches first name, last name and email at once, ordered by
+    relevance; it is paged with ``skip`` only and ignores the field filters.
+    Serialized pages are cached per user until the next contact write.
+    """
+    if q:
+        if cursor:
+            raise HTTPException(status_code=400, detail="cursor cannot be combined with q")
+        params = {"q": q, "skip": skip, "limit": limit}
+        
+        async def load():
+            contacts = await crud_search.search_user_contacts(
+                db=db, user_id=current_user.id, q=q, skip=skip, limit=limit
+            )
+            return contacts, None
+    else:
+        after = None
+        if cursor:
+            try:
+                after = decode_cursor(cursor)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+        params = {
+            "skip": skip, "limit": limit, "cursor": cursor,
+            "first_name": first_name, "last_name": last_name, "email": email
+        }
+        
+        async def load():
+            contacts = await crud_contact.get_user_contact_rows(
+                db=db, 
+                user_id=current_user.id,
+                skip=skip, 
+                limit=limit, 
+                first_name=first_name, 
+                last_name=last_name, 
+                email=email,
+                after=after
+            )
+            next_cursor = None
+            if limit > 0 and len(contacts) == limit:
+                last = contacts[-1]
+                next_cursor = encode_cursor(last.last_name, last.id)
+            return contacts, next_cursor
+    
+    body, next_cursor = await contact_cache.get_or_load(current_user.id, version, params, load)
+    if next_cursor:
+        next_url = request.url.remove_query_params("skip").include_query_params(cursor=next_cursor)
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return contact_cache.json_response(body, response)
+
+@router.get("/export")
+async def export_contacts(
+    format: str = Query("ndjson", pattern="^(csv|ndjson)$"),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get user contacts with optional filtering."""
-    return crud_contact.get_user_contacts(
-        db=db, 
-        user_id=current_user.id,
-        skip=skip, 
-        limit=limit, 
-        first_name=first_name, 
-        last_name=last_name, 
-        email=email
+    """
+    Export the full contact book as a streamed CSV or NDJSON download.
+    
+    The request's session is closed when the dependency exits, before the
+    body is sent; the stream reopens it and closes it when done.
+    """
+    return StreamingResponse(
+        contact_export.export_contacts(db, current_user.id, format),
+        media_type=contact_export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="contacts.{format}"'}
     )
 
-@router.get("/birthdays/upcoming", response_model=List[ContactResponse])
-def get_upcoming_birthdays(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+@router.get(
+    "/birthdays/upcoming",
+    response_model=List[ContactResponse],
+    dependencies=[Depends(contacts_etag)]
+)
+async def get_upcoming_birthdays(
+    response: Response,
+    days: int = Query(7, ge=0, le=366),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+    version: Optional[int] = Depends(contacts_version)
 ):
-    """Get contacts with birthdays in next 7 days."""
-    return crud_contact.get_user_upcoming_birthdays(db=db, user_id=current_user.id)
+    """Get contacts with birthdays in the next ``days`` days (7 by default)."""
+    async def load():
+        contacts = await crud_contact.get_user_upcoming_birthdays(
+            db=db, user_id=current_user.id, days=days
+        )
+        return contacts, None
+    
+    params = {"route": "birthdays", "days": days, "today": date.today().isoformat()}
+    body, _ = await contact_cache.get_or_load(current_user.id, version, params, load)
+    return contact_cache.json_response(body, response)
 
-@router.get("/{contact_id}", response_model=ContactResponse)
-def get_contact(
+@router.get("/{contact_id}", response_model=ContactResponse, dependencies=[Depends(contacts_etag)])
+async def get_contact(
     contact_id: int, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get specific contact by ID."""
-    db_contact = crud_contact.get_user_contact(
+    db_contact = await crud_contact.get_user_contact(
         db=db, contact_id=contact_id, user_id=current_user.id
     )
     if db_contact is None:
@@ -63,14 +207,14 @@ def get_contact(
     return db_contact
 
 @router.put("/{contact_id}", response_model=ContactResponse)
-def update_contact(
+async def update_contact(
     contact_id: int, 
     contact_update: ContactUpdate, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update existing contact."""
-    updated_contact = crud_contact.update_contact(
+    updated_contact = await crud_contact.update_contact(
         db=db, contact_id=contact_id, contact_update=contact_update, user_id=current_user.id
     )
     if not updated_contact:
@@ -78,13 +222,13 @@ def update_contact(
     return updated_contact
 
 @router.delete("/{contact_id}")
-def delete_contact(
+async def delete_contact(
     contact_id: int, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete contact by ID."""
-    success = crud_contact.delete_contact(
+    success = await crud_contact.delete_contact(
         db=db, contact_id=contact_id, user_id=current_user.id
     )
     if not success:
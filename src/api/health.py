@@ -0,0 +1,21 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from src.core import warmup
+
+router = APIRouter(tags=["health"])
+
+@router.get("/ready", include_in_schema=False)
+def get_readiness():
+    """
+    Report whether this worker has finished warming up.
+
+    Returns 503 with the unfinished steps until then, so load balancers
+    only route traffic to warm workers. ``GET /`` stays the liveness check.
+    """
+    if not warmup.is_ready():
+        return JSONResponse(
+            status_code=503,
+            content={"status": "warming_up", "pending": sorted(warmup.pending)}
+        )
+    return {"status": "ready"}
@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Response
+
+from src.core import auth, cache, database, metrics
+
+router = APIRouter(tags=["metrics"])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+@router.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Expose process metrics in Prometheus text format."""
+    stats = cache.get_cache_stats()
+    hashing = auth.get_hashing_stats()
+    lines = metrics.render()
+    lines += metrics.render_samples(
+        "cache_requests_total", "Cache lookups by tier and outcome.", "counter",
+        ("tier", "result"),
+        [
+            ((tier, result), stats[tier][key])
+            for tier in ("local", "redis", "results")
+            for result, key in (("hit", "hits"), ("miss", "misses"))
+        ]
+    )
+    lines += metrics.render_samples(
+        "result_cache_bytes_total", "Serialized response bytes written to and served from "
+        "the result cache.", "counter", ("direction",),
+        [(("stored",), stats["results"]["bytes_stored"]),
+         (("served",), stats["results"]["bytes_served"])]
+    )
+    lines += metrics.render_samples(
+        "user_cache_stampede_total", "User cache stampede protection events by outcome.",
+        "counter", ("outcome",),
+        [((outcome,), count) for outcome, count in stats["stampede"].items()]
+    )
+    lines += metrics.render_samples(
+        "user_cache_local_entries", "Users held in the in-process cache.", "gauge",
+        (), [((), stats["local"]["size"])]
+    )
+    lines += metrics.render_samples(
+        "db_pool_checked_out", "Connections currently checked out.", "gauge",
+        ("pool",), [((name,), count) for name, count in database.pool_checkouts()]
+    )
+    lines += metrics.render_samples(
+        "password_hash_pending", "Password hash jobs queued or running in the hashing pool.",
+        "gauge", (), [((), hashing["pending"])]
+    )
+    lines += metrics.render_samples(
+        "password_hash_completed_total", "Password hash jobs finished by the hashing pool.",
+        "counter", (), [((), hashing["completed"])]
+    )
+    lines += metrics.render_samples(
+        "password_hash_workers", "Threads in the password hashing pool.", "gauge",
+        (), [((), hashing["workers"])]
+    )
+    return Response("\n".join(lines) + "\n", media_type=CONTENT_TYPE)
@@ -1,39 +1,168 @@
+import asyncio
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from typing import TYPE_CHECKING, Callable, Optional, Tuple
 from fastapi import HTTPException, status
+from src.core.cache import LocalCache
 from src.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+# passlib and bcrypt are imported on first use, see get_pwd_context
+pwd_context: Optional["CryptContext"] = None
+
+# bcrypt releases the GIL, so a small thread pool keeps hashing off the event loop
+_hash_executor: Optional[ThreadPoolExecutor] = None
+hashing_stats = {"pending": 0, "completed": 0}
+
+def get_pwd_context() -> "CryptContext":
+    """Password hashing context, created on first use."""
+    global pwd_context
+    if pwd_context is None:
+        from passlib.context import CryptContext
+
+        pwd_context = CryptContext(
+            schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS
+        )
+    return pwd_context
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify plain password against hashed password."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """Generate hash for plain text password."""
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """Verify password and return a new hash if the stored one uses outdated settings."""
+    return get_pwd_context().verify_and_update(plain_password, hashed_password)
+
+def _get_hash_executor() -> ThreadPoolExecutor:
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            thread_name_prefix="password-hash"
+        )
+    return _hash_executor
+
+async def _run_hashing(func, *args):
+    hashing_stats["pending"] += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(
+            _get_hash_executor(), func, *args
+        )
+    finally:
+        hashing_stats["pending"] -= 1
+        hashing_stats["completed"] += 1
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash password in the hashing pool without blocking the event loop."""
+    return await _run_hashing(get_password_hash, password)
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """Run :func:`verify_and_update_password` in the hashing pool."""
+    return await _run_hashing(verify_and_update_password, plain_password, hashed_password)
+
+def get_hashing_stats() -> dict:
+    """
+    Get hashing pool metrics.
+
+    Returns:
+        Dict with queue depth (``pending``, queued plus running jobs),
+        ``completed`` job count and pool size
+    """
+    return {**hashing_stats, "workers": settings.PASSWORD_HASH_WORKERS}
+
+def shutdown_hash_executor() -> None:
+    """Stop the hashing pool; it is recreated on next use."""
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=True)
+        _hash_executor = None
+
+def _jose_backend():
+    from jose import JWTError, jwt
+    return jwt.encode, jwt.decode, JWTError
+
+def _pyjwt_backend():
+    import jwt
+    return jwt.encode, jwt.decode, jwt.PyJWTError
+
+# Backends share the encode(claims, key, algorithm=)/decode(token, key, algorithms=) API
+JWT_BACKENDS = {"jose": _jose_backend, "pyjwt": _pyjwt_backend}
+
+def load_jwt_backend(name: str) -> Tuple[Callable, Callable, type]:
+    """
+    Import a JWT backend.
+
+    Args:
+        name: Key of ``JWT_BACKENDS``
+
+    Returns:
+        ``encode`` and ``decode`` functions and the backend's error class
+    """
+    return JWT_BACKENDS[name]()
+
+_jwt_backend: Optional[Tuple[Callable, Callable, type]] = None
+
+def get_jwt_backend() -> Tuple[Callable, Callable, type]:
+    """The ``settings.JWT_BACKEND`` backend, imported on first use."""
+    global _jwt_backend
+    if _jwt_backend is None:
+        _jwt_backend = load_jwt_backend(settings.JWT_BACKEND)
+    return _jwt_backend
+
+# sha256(token) -> verified payload; entries never outlive the token's exp
+token_cache = LocalCache(settings.TOKEN_CACHE_SIZE, settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
 
 def create_access_token(data: dict) -> str:
     """Create JWT access token with expiration."""
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    encode, _, _ = get_jwt_backend()
+    return encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
-def verify_token(token: str) -> str:
-    """Verify JWT token and return email from payload."""
+def decode_access_token(token: str) -> dict:
+    """
+    Verify JWT token and return its payload, which always carries a subject.
+
+    Verified payloads are cached in process memory by token hash, so a
+    token presented again skips signature and claims checks until it
+    expires.
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    cached = token_cache.get(key)
+    if cached is not None and cached["exp"] > time.time():
+        return dict(cached)
+
+    _, decode, error = get_jwt_backend()
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials"
-            )
-        return email
-    except JWTError:
+        payload = decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except error:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials"
+        )
+    if payload.get("sub") is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials"
-        )
\ No newline at end of file
+        )
+    remaining = payload.get("exp", 0) - time.time()
+    if remaining > 0:
+        token_cache.set(key, payload, ttl=remaining)
+    return dict(payload)
+
+def verify_token(token: str) -> str:
+    """Verify JWT token and return email from payload."""
+    return decode_access_token(token)["sub"]
\ No newline at end of file
@@ -0,0 +1,56 @@
+from fastapi import HTTPException, status
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+class BodySizeLimitMiddleware:
+    """
+    Reject request bodies over a per-path byte limit with 413.
+
+    Requests announcing a larger ``Content-Length`` are refused before the
+    body is read; chunked bodies are counted while streaming and cut off as
+    soon as they cross the limit.
+
+    Args:
+        app: ASGI application
+        limits: Maximum body size in bytes by exact request path
+    """
+
+    def __init__(self, app: ASGIApp, limits: dict):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limit = self.limits.get(scope.get("path")) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and int(content_length) > limit:
+            body = b'{"detail":"Request body too large"}'
+            await send({
+                "type": "http.response.start",
+                "status": status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Raised inside the app, so FastAPI's handler turns it into a response
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail="Request body too large"
+                    )
+            return message
+
+        await self.app(scope, limited_receive, send)
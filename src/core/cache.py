@@ -1,52 +1,651 @@
+import asyncio
 import json
+import math
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
 import redis
-from typing import Optional
+import redis.asyncio
+from redis.exceptions import RedisError, WatchError
+from typing import (
+    Awaitable, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple, Union
+)
+from src.core import metrics
 from src.core.config import settings
 from src.models.user import User
 
-# Redis client
-redis_client = redis.Redis.from_url(settings.redis_url)
+_timeouts = {
+    "socket_timeout": settings.REDIS_SOCKET_TIMEOUT,
+    "socket_connect_timeout": settings.REDIS_CONNECT_TIMEOUT,
+}
 
-def cache_user(user: User, expire_seconds: int = 300) -> None:
+# Sync client: rate limiting, mail queue, avatar URLs and the pub/sub listener thread
+redis_client = redis.Redis.from_url(settings.redis_url, **_timeouts)
+
+# Async client for cache operations on the request path; one connection
+# pool per process, shared by all requests
+async_redis_client = redis.asyncio.Redis.from_url(
+    settings.redis_url, max_connections=settings.REDIS_MAX_CONNECTIONS, **_timeouts
+)
+
+def reset_redis_pool() -> None:
+    """Drop Redis connections inherited from a parent process."""
+    redis_client.connection_pool.reset()
+    async_redis_client.connection_pool.reset()
+
+async def close_redis() -> None:
+    """Close the Redis connections of the current process."""
+    redis_client.close()
+    await async_redis_client.aclose()
+
+@metrics.timed_redis("get_many")
+async def get_many(keys: Sequence[str]) -> List[Optional[bytes]]:
     """
-    Cache user data in Redis for 5 minutes.
-    
+    Get several keys in one round trip.
+
     Args:
-        user: User object to cache
-        expire_seconds: Cache expiration time 
+        keys: Redis keys
+
+    Returns:
+        Values in the order of ``keys``, None for missing keys
+    """
+    if not keys:
+        return []
+    return await async_redis_client.mget(keys)
+
+@metrics.timed_redis("set_many")
+async def set_many(mapping: Mapping[str, Union[bytes, str]], expire_seconds: int) -> None:
+    """
+    Set several keys with the same expiration in one pipelined round trip.
+
+    Args:
+        mapping: Values by Redis key
+        expire_seconds: Expiration time of every key
+    """
+    if not mapping:
+        return
+    pipe = async_redis_client.pipeline(transaction=False)
+    for key, value in mapping.items():
+        pipe.set(key, value, ex=expire_seconds)
+    await pipe.execute()
+
+@metrics.timed_redis("delete_many")
+async def delete_many(keys: Sequence[str]) -> int:
+    """
+    Delete several keys in one round trip.
+
+    Returns:
+        Number of keys that existed
+    """
+    if not keys:
+        return 0
+    return await async_redis_client.delete(*keys)
+
+class LocalCache:
     """
-    key = f"user:{user.id}"
-    user_data = {
+    Bounded in-process LRU cache with per-entry TTL.
+
+    Args:
+        maxsize: Maximum number of entries kept in memory
+        ttl: Entry lifetime in seconds
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl: Optional[float] = None) -> None:
+        """Store ``value``; ``ttl`` shortens the lifetime of this entry only."""
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+local_cache = LocalCache(settings.USER_CACHE_LOCAL_SIZE, settings.USER_CACHE_LOCAL_TTL)
+
+# Hit/miss counters per cache tier
+cache_stats = {
+    "local": {"hits": 0, "misses": 0},
+    "redis": {"hits": 0, "misses": 0},
+    "results": {"hits": 0, "misses": 0, "bytes_stored": 0, "bytes_served": 0},
+    # get_or_load_user: misses joining another request's load, expired or
+    # early-refresh entries served while someone else reloads, loads that
+    # waited for another worker's, and early refreshes started
+    "stampede": {"coalesced": 0, "stale_served": 0, "lock_waits": 0, "early_refreshes": 0},
+}
+
+def get_cache_stats() -> dict:
+    """
+    Get hit/miss counters for the local and Redis tiers and the result cache.
+
+    Returns:
+        Dict with counters per tier, current local cache size and result
+        cache hit rate
+    """
+    stats = {tier: dict(counters) for tier, counters in cache_stats.items()}
+    stats["local"]["size"] = len(local_cache)
+    results = stats["results"]
+    lookups = results["hits"] + results["misses"]
+    results["hit_rate"] = results["hits"] / lookups if lookups else 0.0
+    return stats
+
+def reset_cache_stats() -> None:
+    """Reset all counters of every tier."""
+    for counters in cache_stats.values():
+        for name in counters:
+            counters[name] = 0
+
+def _user_key(user_id: int) -> str:
+    return f"user:{user_id}"
+
+def _user_data(user: User) -> dict:
+    return {
         "id": user.id,
         "username": user.username,
         "email": user.email,
         "is_verified": user.is_verified,
         "avatar_url": user.avatar_url
     }
-    redis_client.setex(key, expire_seconds, json.dumps(user_data))
 
-def get_cached_user(user_id: int) -> Optional[dict]:
+def _decode_user(raw: bytes) -> Tuple[dict, float, float]:
+    """Split a Redis user entry into data, logical expiry and load time."""
+    entry = json.loads(raw)
+    if "user" not in entry:
+        # Written before entries carried their expiry
+        return entry, math.inf, 0.0
+    return entry["user"], entry["expires_at"], entry["delta"]
+
+async def cache_users(users: Iterable[User], expire_seconds: int = 300, delta: float = 0.0) -> None:
+    """
+    Cache several users in Redis and in process memory, one round trip.
+
+    Redis keeps entries ``USER_CACHE_STALE_SECONDS`` past their expiry so
+    ``get_or_load_user`` can serve them while one request reloads.
+
+    Args:
+        users: User objects to cache
+        expire_seconds: Cache expiration time
+        delta: Seconds it took to load the users, for early refresh
+    """
+    expires_at = time.time() + expire_seconds
+    entries = {}
+    for user in users:
+        user_data = _user_data(user)
+        local_cache.set(user.id, user_data)
+        entries[_user_key(user.id)] = json.dumps(
+            {"user": user_data, "expires_at": expires_at, "delta": delta}
+        )
+    await set_many(entries, expire_seconds + settings.USER_CACHE_STALE_SECONDS)
+
+async def get_cached_users(user_ids: Iterable[int]) -> Dict[int, dict]:
     """
-    Get cached user data from Redis.
-    
+    Get cached data of several users, checking process memory before Redis.
+
+    Users missing from process memory are fetched with a single MGET.
+
+    Args:
+        user_ids: Users' unique identifiers
+
+    Returns:
+        User data dicts by id, for cached users only
+    """
+    found = {}
+    missing = []
+    for user_id in user_ids:
+        user_data = local_cache.get(user_id)
+        if user_data is not None:
+            cache_stats["local"]["hits"] += 1
+            found[user_id] = dict(user_data)
+        else:
+            cache_stats["local"]["misses"] += 1
+            missing.append(user_id)
+
+    if not missing:
+        return found
+    values = await get_many([_user_key(user_id) for user_id in missing])
+    now = time.time()
+    for user_id, data in zip(missing, values):
+        if data is not None:
+            user_data, expires_at, _ = _decode_user(data)
+        if data is None or expires_at <= now:
+            cache_stats["redis"]["misses"] += 1
+            continue
+        cache_stats["redis"]["hits"] += 1
+        local_cache.set(user_id, user_data)
+        found[user_id] = dict(user_data)
+    return found
+
+@metrics.timed_redis("invalidate_users")
+async def invalidate_users(user_ids: Iterable[int]) -> None:
+    """
+    Remove users from cache, pin their reads to the primary and tell other
+    workers to drop their local copies, all in one pipelined round trip.
+
+    Args:
+        user_ids: Users' unique identifiers
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    pipe = async_redis_client.pipeline(transaction=False)
+    pipe.delete(*(_user_key(user_id) for user_id in user_ids))
+    for user_id in user_ids:
+        local_cache.delete(user_id)
+        pipe.set(_primary_pin_key(user_id), 1, ex=settings.READ_YOUR_WRITES_SECONDS)
+        pipe.publish(settings.USER_CACHE_CHANNEL, str(user_id))
+    await pipe.execute()
+
+async def cache_user(user: User, expire_seconds: int = 300) -> None:
+    """
+    Cache user data in Redis for 5 minutes and in process memory.
+
+    Args:
+        user: User object to cache
+        expire_seconds: Cache expiration time
+    """
+    await cache_users([user], expire_seconds)
+
+async def get_cached_user(user_id: int) -> Optional[dict]:
+    """
+    Get cached user data, checking process memory before Redis.
+
     Args:
         user_id: User's unique identifier
-        
+
     Returns:
         User data dict or None
     """
-    key = f"user:{user_id}"
-    data = redis_client.get(key)
-    if data:
-        return json.loads(data)
+    return (await get_cached_users([user_id])).get(user_id)
+
+async def invalidate_user_cache(user_id: int) -> None:
+    """
+    Remove user from cache and tell other workers to drop their local copy.
+
+    Args:
+        user_id: User's unique identifier
+    """
+    await invalidate_users([user_id])
+
+# user id -> future of the load running in this process
+_user_loads: Dict[int, asyncio.Future] = {}
+
+async def _single_flight(flights: dict, key, func: Callable[[], Awaitable]):
+    """
+    Run ``func`` once for concurrent callers with the same ``key``.
+
+    Later callers await the first caller's result or exception. If the
+    first caller is cancelled, one of them takes over.
+    """
+    while (future := flights.get(key)) is not None:
+        cache_stats["stampede"]["coalesced"] += 1
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if not future.cancelled():
+                raise
+
+    future = asyncio.get_running_loop().create_future()
+    flights[key] = future
+    try:
+        result = await func()
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        # Mark retrieved: there may be no one waiting
+        future.exception()
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        del flights[key]
+
+def _refresh_due(expires_at: float, delta: float) -> bool:
+    """
+    XFetch: refresh before expiry with a probability that grows as expiry
+    nears and with the cost of a reload; always refresh once expired.
+    """
+    jitter = -delta * settings.USER_CACHE_XFETCH_BETA * math.log(1.0 - random.random())
+    return time.time() + jitter >= expires_at
+
+def _user_lock_key(user_id: int) -> str:
+    return f"lock:user:{user_id}"
+
+async def _acquire_user_lock(user_id: int) -> Optional[str]:
+    """Take the cross-worker reload lock; returns its token, or None if held."""
+    token = uuid.uuid4().hex
+    acquired = await async_redis_client.set(
+        _user_lock_key(user_id), token, nx=True,
+        px=int(settings.USER_CACHE_LOCK_TIMEOUT * 1000)
+    )
+    return token if acquired else None
+
+async def _release_user_lock(user_id: int, token: str) -> None:
+    """Delete the lock unless it expired and another worker took it since."""
+    key = _user_lock_key(user_id)
+    try:
+        async with async_redis_client.pipeline(transaction=True) as pipe:
+            await pipe.watch(key)
+            if await pipe.get(key) == token.encode():
+                pipe.multi()
+                pipe.delete(key)
+                await pipe.execute()
+    except (WatchError, RedisError):
+        pass  # The lock expires on its own
+
+async def _wait_for_user(user_id: int) -> Optional[dict]:
+    """Poll for the entry another worker is loading, up to the lock timeout."""
+    cache_stats["stampede"]["lock_waits"] += 1
+    deadline = time.monotonic() + settings.USER_CACHE_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        await asyncio.sleep(settings.USER_CACHE_LOCK_POLL_INTERVAL)
+        raw = await async_redis_client.get(_user_key(user_id))
+        if raw is not None:
+            user_data, _, _ = _decode_user(raw)
+            local_cache.set(user_id, user_data)
+            return user_data
     return None
 
-def invalidate_user_cache(user_id: int) -> None:
+async def _load_user(
+    user_id: int,
+    load: Callable[[], Awaitable[Optional[User]]],
+    expire_seconds: int,
+    token: Optional[str] = None
+) -> Optional[dict]:
+    if token is None:
+        try:
+            token = await _acquire_user_lock(user_id)
+            if token is None:
+                user_data = await _wait_for_user(user_id)
+                if user_data is not None:
+                    return user_data
+        except RedisError as e:
+            print(f"User cache lock unavailable: {e}")
+    try:
+        start = time.perf_counter()
+        user = await load()
+        if user is None:
+            return None
+        try:
+            await cache_users([user], expire_seconds, delta=time.perf_counter() - start)
+        except RedisError as e:
+            print(f"User cache unavailable: {e}")
+        return _user_data(user)
+    finally:
+        if token is not None:
+            await _release_user_lock(user_id, token)
+
+async def get_or_load_user(
+    user_id: int,
+    load: Callable[[], Awaitable[Optional[User]]],
+    expire_seconds: int = 300
+) -> Optional[dict]:
     """
-    Remove user from cache.
-    
+    Get user data through the cache, protecting the database from stampedes.
+
+    A miss is loaded once per process: concurrent misses for the same user
+    wait for the first one. Across workers the loader takes a short Redis
+    lock; other workers wait for its entry instead of querying as well.
+    Entries are refreshed early, XFetch-style, and kept for
+    ``USER_CACHE_STALE_SECONDS`` past expiry: whoever gets the lock reloads
+    while every other request is served the entry it already has.
+
     Args:
         user_id: User's unique identifier
+        load: Coroutine factory fetching the user from the database
+        expire_seconds: Cache expiration time
+
+    Returns:
+        User data dict, or None if ``load`` found no user
+    """
+    user_data = local_cache.get(user_id)
+    if user_data is not None:
+        cache_stats["local"]["hits"] += 1
+        return dict(user_data)
+    cache_stats["local"]["misses"] += 1
+
+    try:
+        with metrics.timed_redis("get_or_load_user"):
+            raw = await async_redis_client.get(_user_key(user_id))
+    except RedisError as e:
+        print(f"User cache unavailable: {e}")
+        user = await load()
+        return _user_data(user) if user is not None else None
+
+    if raw is None:
+        cache_stats["redis"]["misses"] += 1
+        user_data = await _single_flight(
+            _user_loads, user_id, lambda: _load_user(user_id, load, expire_seconds)
+        )
+        return dict(user_data) if user_data is not None else None
+
+    cache_stats["redis"]["hits"] += 1
+    user_data, expires_at, delta = _decode_user(raw)
+    if not _refresh_due(expires_at, delta):
+        local_cache.set(user_id, user_data)
+        return dict(user_data)
+
+    token = None
+    if user_id not in _user_loads:
+        try:
+            token = await _acquire_user_lock(user_id)
+        except RedisError as e:
+            print(f"User cache lock unavailable: {e}")
+    if token is None:
+        cache_stats["stampede"]["stale_served"] += 1
+        return dict(user_data)
+    if expires_at > time.time():
+        cache_stats["stampede"]["early_refreshes"] += 1
+    started = []
+
+    def refresh():
+        started.append(True)
+        return _load_user(user_id, load, expire_seconds, token)
+
+    fresh = await _single_flight(_user_loads, user_id, refresh)
+    if not started:
+        # Joined a load that began while the lock was being taken
+        await _release_user_lock(user_id, token)
+    return dict(fresh) if fresh is not None else None
+
+def _handle_invalidation(message: dict) -> None:
+    """Evict the user named in a pub/sub invalidation message."""
+    try:
+        local_cache.delete(int(message["data"]))
+    except (TypeError, ValueError):
+        pass
+
+def start_invalidation_listener():
+    """
+    Subscribe to the invalidation channel in a background thread.
+
+    Returns:
+        Worker thread; call its ``stop()`` method on shutdown
+    """
+    pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(**{settings.USER_CACHE_CHANNEL: _handle_invalidation})
+    return pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+
+def _primary_pin_key(user_id: int) -> str:
+    return f"db:primary:{user_id}"
+
+@metrics.timed_redis("pin_to_primary")
+async def pin_to_primary(user_id: int) -> None:
+    """
+    Send a user's reads to the primary database for a while after a write.
+
+    Args:
+        user_id: User who just changed data
+    """
+    await async_redis_client.set(
+        _primary_pin_key(user_id), 1, ex=settings.READ_YOUR_WRITES_SECONDS
+    )
+
+@metrics.timed_redis("is_pinned_to_primary")
+async def is_pinned_to_primary(user_id: int) -> bool:
+    """Whether the user wrote within ``READ_YOUR_WRITES_SECONDS``."""
+    return bool(await async_redis_client.exists(_primary_pin_key(user_id)))
+
+def _contacts_version_key(user_id: int) -> str:
+    return f"contacts:version:{user_id}"
+
+# Users of this process whose version bump failed after a write, see contacts_changed
+_unbumped_contacts: Set[int] = set()
+
+@metrics.timed_redis("get_contacts_version")
+async def get_contacts_version(user_id: int) -> int:
+    """
+    Get the version of a user's contact collection.
+
+    A missing counter starts from the current time in nanoseconds rather
+    than zero, so versions never repeat after Redis loses the key. If a
+    write's bump failed earlier in this process, the bump is retried first
+    so the version the old data was served under is never handed out again.
+
+    Args:
+        user_id: Owner of the contacts
+
+    Returns:
+        Current version number
+    """
+    if user_id in _unbumped_contacts:
+        version = await bump_contacts_version(user_id)
+        _unbumped_contacts.discard(user_id)
+        return version
+    key = _contacts_version_key(user_id)
+    version = await async_redis_client.get(key)
+    if version is None:
+        await async_redis_client.set(key, time.time_ns(), nx=True)
+        version = await async_redis_client.get(key)
+    return int(version)
+
+@metrics.timed_redis("bump_contacts_version")
+async def bump_contacts_version(user_id: int) -> int:
+    """
+    Mark a user's contact collection as changed.
+
+    Also pins the user's reads to the primary database, see
+    ``pin_to_primary``.
+
+    Args:
+        user_id: Owner of the contacts
+
+    Returns:
+        New version number
+    """
+    key = _contacts_version_key(user_id)
+    pipe = async_redis_client.pipeline(transaction=True)
+    pipe.set(key, time.time_ns(), nx=True)
+    pipe.incr(key)
+    pipe.set(_primary_pin_key(user_id), 1, ex=settings.READ_YOUR_WRITES_SECONDS)
+    return (await pipe.execute())[1]
+
+async def contacts_changed(user_id: int) -> None:
+    """
+    Bump the contact collection version after a committed write.
+
+    A Redis failure is logged rather than raised, since the write has
+    succeeded. The user is remembered so that ``get_contacts_version``
+    retries the bump before returning a version; until it succeeds, reads
+    get no ETag and skip the result cache instead of validating the old data.
+
+    Args:
+        user_id: Owner of the contacts
+    """
+    try:
+        await bump_contacts_version(user_id)
+    except RedisError as e:
+        print(f"Contacts version not bumped: {e}")
+        _unbumped_contacts.add(user_id)
+    else:
+        _unbumped_contacts.discard(user_id)
+
+def _result_key(user_id: int, version: int, params_key: str) -> str:
+    return f"contacts:result:{user_id}:{version}:{params_key}"
+
+@metrics.timed_redis("get_cached_result")
+async def get_cached_result(user_id: int, version: int, params_key: str) -> Optional[dict]:
+    """
+    Get a cached serialized response for a contact read.
+
+    Entries are keyed by the collection version, so a bump of
+    ``contacts:version:{id}`` makes all of the user's entries unreachable
+    at once; the stale ones simply expire.
+
+    Args:
+        user_id: Owner of the contacts
+        version: Current collection version
+        params_key: Digest of the normalized query parameters
+
+    Returns:
+        Dict with ``body`` bytes and optional ``cursor``, or None
+    """
+    entry = await async_redis_client.hgetall(_result_key(user_id, version, params_key))
+    if not entry:
+        cache_stats["results"]["misses"] += 1
+        return None
+    cache_stats["results"]["hits"] += 1
+    cache_stats["results"]["bytes_served"] += len(entry[b"body"])
+    cursor = entry.get(b"cursor")
+    return {"body": entry[b"body"], "cursor": cursor.decode() if cursor else None}
+
+@metrics.timed_redis("cache_result")
+async def cache_result(
+    user_id: int,
+    version: int,
+    params_key: str,
+    body: bytes,
+    cursor: Optional[str] = None,
+    expire_seconds: int = settings.RESULT_CACHE_TTL
+) -> None:
+    """
+    Store a serialized response for a contact read.
+
+    Args:
+        user_id: Owner of the contacts
+        version: Collection version the response was built from
+        params_key: Digest of the normalized query parameters
+        body: Response body
+        cursor: Next page cursor, if any
+        expire_seconds: Cache expiration time
     """
-    key = f"user:{user_id}"
-    redis_client.delete(key)
\ No newline at end of file
+    key = _result_key(user_id, version, params_key)
+    entry = {"body": body}
+    if cursor:
+        entry["cursor"] = cursor
+    pipe = async_redis_client.pipeline(transaction=True)
+    pipe.hset(key, mapping=entry)
+    pipe.expire(key, expire_seconds)
+    await pipe.execute()
+    cache_stats["results"]["bytes_stored"] += len(body)
@@ -13,15 +13,67 @@ class Settings:
     POSTGRES_HOST: str = os.getenv("POSTGRES_HOST", "localhost")
     POSTGRES_PORT: str = os.getenv("POSTGRES_PORT", "5433")
     POSTGRES_DB: str = os.getenv("POSTGRES_DB", "contacts_db")
+    # Optional read replicas: comma-separated async SQLAlchemy URLs
+    DATABASE_REPLICA_URLS: list = [
+        url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+    ]
+    # "round_robin" or "least_connections"
+    DATABASE_REPLICA_STRATEGY: str = os.getenv("DATABASE_REPLICA_STRATEGY", "round_robin")
+    # Reads of a user who just wrote stay on the primary for this long
+    READ_YOUR_WRITES_SECONDS: int = int(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
     
     # JWT
     SECRET_KEY: str = os.getenv("SECRET_KEY", "fallback-secret-key")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # "jose" (python-jose) or "pyjwt" (needs the optional PyJWT package)
+    JWT_BACKEND: str = os.getenv("JWT_BACKEND", "jose")
+    # Verified tokens kept in process memory until they expire
+    TOKEN_CACHE_SIZE: int = int(os.getenv("TOKEN_CACHE_SIZE", "4096"))
+    
+    # Production server (gunicorn.conf.py)
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+    # Seconds a worker gets to finish in-flight requests after SIGTERM
+    GRACEFUL_TIMEOUT: int = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+    
+    # Password hashing
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
     
     # Redis for rate limiting
     REDIS_HOST: str = os.getenv("REDIS_HOST", "localhost")
     REDIS_PORT: int = int(os.getenv("REDIS_PORT", "6379"))
+    # Seconds to wait for a reply or a new connection before giving up
+    REDIS_SOCKET_TIMEOUT: float = float(os.getenv("REDIS_SOCKET_TIMEOUT", "1.0"))
+    REDIS_CONNECT_TIMEOUT: float = float(os.getenv("REDIS_CONNECT_TIMEOUT", "1.0"))
+    # Connections of the async client's pool, per worker
+    REDIS_MAX_CONNECTIONS: int = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+    
+    # User cache: in-process LRU in front of Redis
+    USER_CACHE_LOCAL_SIZE: int = int(os.getenv("USER_CACHE_LOCAL_SIZE", "1024"))
+    USER_CACHE_LOCAL_TTL: float = float(os.getenv("USER_CACHE_LOCAL_TTL", "30"))
+    USER_CACHE_CHANNEL: str = os.getenv("USER_CACHE_CHANNEL", "user-cache-invalidation")
+    # Stampede protection: expired entries are served this long while one request reloads
+    USER_CACHE_STALE_SECONDS: int = int(os.getenv("USER_CACHE_STALE_SECONDS", "30"))
+    # Cross-worker reload lock lifetime and how often waiting workers poll for the entry
+    USER_CACHE_LOCK_TIMEOUT: float = float(os.getenv("USER_CACHE_LOCK_TIMEOUT", "2.0"))
+    USER_CACHE_LOCK_POLL_INTERVAL: float = float(os.getenv("USER_CACHE_LOCK_POLL_INTERVAL", "0.05"))
+    # XFetch beta: > 1 refreshes earlier, 0 disables early refresh
+    USER_CACHE_XFETCH_BETA: float = float(os.getenv("USER_CACHE_XFETCH_BETA", "1.0"))
+    
+    # POST /contacts/batch
+    CONTACT_BATCH_MAX_OPERATIONS: int = int(os.getenv("CONTACT_BATCH_MAX_OPERATIONS", "1000"))
+    
+    # Serialized contact list responses, keyed by user and collection version
+    RESULT_CACHE_TTL: int = int(os.getenv("RESULT_CACHE_TTL", "60"))
+    
+    # Auth admission control: "<requests>/<seconds>" sliding windows
+    RATE_LIMIT_LOGIN_IP: str = os.getenv("RATE_LIMIT_LOGIN_IP", "20/60")
+    RATE_LIMIT_LOGIN_EMAIL: str = os.getenv("RATE_LIMIT_LOGIN_EMAIL", "5/60")
+    RATE_LIMIT_REGISTER_IP: str = os.getenv("RATE_LIMIT_REGISTER_IP", "5/60")
+    RATE_LIMIT_REGISTER_EMAIL: str = os.getenv("RATE_LIMIT_REGISTER_EMAIL", "3/3600")
+    # Reject auth requests while this many password hashes are queued or running
+    AUTH_HASH_BACKLOG_LIMIT: int = int(os.getenv("AUTH_HASH_BACKLOG_LIMIT", "32"))
     
     # Email
     MAIL_USERNAME: str = os.getenv("MAIL_USERNAME", "")
@@ -30,15 +82,32 @@ class Settings:
     MAIL_PORT: int = 587
     MAIL_SERVER: str = "smtp.gmail.com"
     
+    # Outbound mail queue
+    MAIL_QUEUE_BATCH_SIZE: int = int(os.getenv("MAIL_QUEUE_BATCH_SIZE", "50"))
+    MAIL_MAX_ATTEMPTS: int = int(os.getenv("MAIL_MAX_ATTEMPTS", "5"))
+    MAIL_RETRY_BASE_DELAY: float = float(os.getenv("MAIL_RETRY_BASE_DELAY", "30"))
+    
     # Cloudinary
     CLOUDINARY_CLOUD_NAME: str = os.getenv("CLOUDINARY_CLOUD_NAME", "")
     CLOUDINARY_API_KEY: str = os.getenv("CLOUDINARY_API_KEY", "")
     CLOUDINARY_API_SECRET: str = os.getenv("CLOUDINARY_API_SECRET", "")
     
+    # Avatars: "cloudinary" or "local" storage
+    AVATAR_STORAGE: str = os.getenv("AVATAR_STORAGE", "cloudinary")
+    AVATAR_MAX_BYTES: int = int(os.getenv("AVATAR_MAX_BYTES", str(5 * 1024 * 1024)))
+    AVATAR_SIZE: int = 200
+    AVATAR_WORKERS: int = int(os.getenv("AVATAR_WORKERS", "2"))
+    AVATAR_LOCAL_DIR: str = os.getenv("AVATAR_LOCAL_DIR", "media/avatars")
+    AVATAR_LOCAL_URL: str = os.getenv("AVATAR_LOCAL_URL", "/media/avatars")
+    
     @property
     def database_url(self) -> str:
         return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
     
+    @property
+    def async_database_url(self) -> str:
+        return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+    
     @property
     def redis_url(self) -> str:
         return f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}"
@@ -1,17 +1,124 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+import itertools
+import time
+from typing import Iterable, List, Optional, Tuple
 
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from . import metrics
 from .config import settings
 
-engine = create_engine(settings.database_url)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+class MeteredQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool that records how long checkouts wait for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.pool_checkout_wait.observe(
+                time.perf_counter() - start, (self.logging_name or "default",)
+            )
+
+def create_engine(url: str, name: str) -> AsyncEngine:
+    """Create an instrumented async engine; ``name`` labels its pool metrics."""
+    new_engine = create_async_engine(url, poolclass=MeteredQueuePool, pool_logging_name=name)
+    metrics.instrument_engine(new_engine)
+    return new_engine
+
+# Created on first use, see get_engine
+_engine: Optional[AsyncEngine] = None
+SessionLocal = async_sessionmaker(class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+def get_engine() -> AsyncEngine:
+    """Primary database engine, created on first use."""
+    global _engine
+    if _engine is None:
+        _engine = create_engine(settings.async_database_url, "primary")
+    return _engine
 
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
+def _checked_out(replica: AsyncEngine) -> int:
+    pool = replica.sync_engine.pool
+    return pool.checkedout() if hasattr(pool, "checkedout") else 0
+
+class ReplicaSet:
+    """
+    Read replicas with round-robin or least-connections selection.
+
+    Least connections compares pool checkouts; ties, and engines whose
+    pool does not count checkouts, fall back to round-robin order.
+
+    Args:
+        engines: Replica engines; an iterator is consumed on first use
+        strategy: ``round_robin`` or ``least_connections``
+    """
+
+    def __init__(self, engines: Iterable[AsyncEngine], strategy: str = "round_robin"):
+        self._engines = engines
+        self.strategy = strategy
+        self._turn = itertools.count()
+        self._sessionmaker = async_sessionmaker(
+            class_=AsyncSession, autoflush=False, expire_on_commit=False
+        )
+
+    @property
+    def engines(self) -> List[AsyncEngine]:
+        if not isinstance(self._engines, list):
+            self._engines = list(self._engines)
+        return self._engines
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def pick(self) -> AsyncEngine:
+        """Choose the replica for the next session."""
+        start = next(self._turn) % len(self.engines)
+        ordered = self.engines[start:] + self.engines[:start]
+        if self.strategy == "least_connections":
+            return min(ordered, key=_checked_out)
+        return ordered[0]
+
+    def session(self) -> AsyncSession:
+        """Open a session bound to the chosen replica."""
+        return self._sessionmaker(bind=self.pick())
+
+replicas = ReplicaSet(
+    (
+        create_engine(url, f"replica{index}")
+        for index, url in enumerate(settings.DATABASE_REPLICA_URLS)
+    ),
+    settings.DATABASE_REPLICA_STRATEGY
+)
+
+def _engines() -> List[AsyncEngine]:
+    return [get_engine(), *replicas.engines]
+
+def pool_checkouts() -> List[Tuple[str, int]]:
+    """Connections currently checked out, per pool name."""
+    return [
+        (db_engine.sync_engine.pool.logging_name or "default", _checked_out(db_engine))
+        for db_engine in _engines()
+    ]
+
+async def open_pools() -> None:
+    """
+    Give the current process fresh connection pools.
+
+    Run at startup of every worker: pools inherited from a parent that
+    imported the app before forking are replaced without closing the
+    parent's connections.
+    """
+    for db_engine in _engines():
+        await db_engine.dispose(close=False)
+
+async def dispose_engines() -> None:
+    """Close the pooled connections of the primary and every replica."""
+    for db_engine in _engines():
+        await db_engine.dispose()
+
+async def get_db():
+    async with SessionLocal(bind=get_engine()) as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
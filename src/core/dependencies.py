@@ -1,24 +1,90 @@
-from fastapi import Depends, HTTPException, status
+import hashlib
+from datetime import date
+from typing import Optional
+from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import HTTPBearer
-from sqlalchemy.orm import Session
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.core import database
 from src.core.database import get_db
-from src.core.auth import verify_token
-from src.core.cache import get_cached_user, cache_user
-from src.crud.user import get_user_by_email
+from src.core.auth import decode_access_token
+from src.core.cache import (
+    get_or_load_user, cache_user, get_contacts_version, is_pinned_to_primary
+)
+from src.crud.user import get_user_by_email, get_user_by_id
 from src.models.user import User
 
 security = HTTPBearer()
 
-def get_current_user(
-    token: str = Depends(security),
-    db: Session = Depends(get_db)
+async def get_token_payload(token: str = Depends(security)) -> dict:
+    """
+    Verify the bearer token and return its claims.
+    
+    Args:
+        token: JWT bearer token
+        
+    Returns:
+        Token payload with ``sub`` and, for tokens issued at login, ``uid``
+        
+    Raises:
+        HTTPException: If token invalid
+    """
+    # Get token from Bearer schema
+    return decode_access_token(token.credentials)
+
+async def _pinned_to_primary(user_id: int) -> bool:
+    try:
+        return await is_pinned_to_primary(user_id)
+    except RedisError:
+        # Cannot tell whether the user just wrote: stay consistent
+        return True
+
+async def get_read_db(
+    payload: dict = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Database session for read-only queries of the current user.
+    
+    Yields a session on a read replica when replicas are configured. A user
+    who wrote within ``READ_YOUR_WRITES_SECONDS`` keeps reading from the
+    primary, through the request's regular session, so they always see
+    their own changes.
+    
+    Args:
+        payload: Token claims; ``uid`` identifies the user
+        db: Primary database session
+    """
+    user_id = payload.get("uid")
+    if not database.replicas or user_id is None or await _pinned_to_primary(user_id):
+        yield db
+        return
+    async with database.replicas.session() as session:
+        yield session
+
+async def _load_user(db: AsyncSession, user_id: int) -> Optional[User]:
+    try:
+        return await get_user_by_id(db, user_id)
+    finally:
+        # End the read transaction now rather than when the request finishes,
+        # so slow routes such as avatar uploads do not hold a connection
+        await db.close()
+
+async def get_current_user(
+    payload: dict = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_read_db)
 ) -> User:
     """
     Get current authenticated user from JWT token with Redis caching.
     
+    The token carries the user id in its ``uid`` claim, so a cache hit is
+    answered without touching the database and returns a detached user.
+    Concurrent misses for one user share a single query, see
+    ``get_or_load_user``; the session is closed right after it.
+    
     Args:
-        token: JWT bearer token
-        db: Database session
+        payload: Verified token claims
+        db: Read-only database session
         
     Returns:
         Authenticated user object
@@ -26,28 +92,90 @@ def get_current_user(
     Raises:
         HTTPException: If token invalid or user not found
     """
-    # Get token from Bearer schema
-    credentials = token.credentials
-    email = verify_token(credentials)
+    email = payload["sub"]
+    
+    # Get user through the cache by the id stored in the token
+    user_id = payload.get("uid")
+    if user_id is not None:
+        user_data = await get_or_load_user(user_id, lambda: _load_user(db, user_id))
+        if user_data is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found"
+            )
+        if user_data["email"] == email:
+            return User(**user_data)
     
-    # First try to get user from database to get user_id
-    user = get_user_by_email(db, email=email)
+    user = await get_user_by_email(db, email=email)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
     
-    # Try to get user from cache
-    cached_data = get_cached_user(user.id)
-    if cached_data:
-        # Return user-like object from cache
-        user.username = cached_data["username"]
-        user.is_verified = cached_data["is_verified"]
-        user.avatar_url = cached_data["avatar_url"]
-        return user
-    
     # Cache user for next requests
-    cache_user(user)
+    await cache_user(user)
+    
+    return user
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+async def contacts_version(current_user: User = Depends(get_current_user)) -> Optional[int]:
+    """
+    Get the version of the current user's contact collection.
+    
+    Read once per request, before the database is queried, so ETags and
+    cached results are never newer than the version they are filed under.
+    
+    Args:
+        current_user: Authenticated user
+        
+    Returns:
+        Collection version, or None if Redis is unavailable
+    """
+    try:
+        return await get_contacts_version(current_user.id)
+    except RedisError:
+        return None
+
+async def contacts_etag(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    version: Optional[int] = Depends(contacts_version)
+) -> Optional[str]:
+    """
+    Conditional GET for contact reads.
+    
+    Builds a strong ETag from the user's contact collection version (kept
+    in Redis and bumped on every contact write), the request URL and the
+    current date. A matching ``If-None-Match`` is answered with 304 before
+    the route touches the database.
+    
+    Args:
+        request: Incoming request
+        response: Response to set the ``ETag`` header on
+        current_user: Authenticated user
+        version: Current collection version
+        
+    Returns:
+        ETag value, or None if the version is unavailable
+        
+    Raises:
+        HTTPException: 304 Not Modified if the client's copy is current
+    """
+    if version is None:
+        return None
+    
+    resource = f"{request.url.path}?{request.url.query}#{date.today().isoformat()}"
+    digest = hashlib.sha256(resource.encode()).hexdigest()[:16]
+    etag = f'"{current_user.id}-{version}-{digest}"'
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
     
-    return user
\ No newline at end of file
+    response.headers["ETag"] = etag
+    return etag
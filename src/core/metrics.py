@@ -0,0 +1,281 @@
+import inspect
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+
+# Seconds; Prometheus' default buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+Labels = Tuple[str, ...]
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _label_text(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Histogram:
+    """
+    Cumulative histogram rendered in Prometheus text format.
+
+    Observations are plain list updates without locks: each worker process
+    keeps its own series and everything runs on the event loop thread.
+
+    Args:
+        name: Metric name
+        documentation: HELP text
+        labelnames: Label names, values are passed to ``observe``
+        buckets: Upper bounds, ascending
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Labels = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Labels, list] = {}
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def clear(self) -> None:
+        self._series.clear()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += bucket_count
+                le = 'le="' + (bound if bound == "+Inf" else _number(float(bound))) + '"'
+                lines.append(
+                    f"{self.name}_bucket{_label_text(self.labelnames, labels, le)} {cumulative}"
+                )
+            label_text = _label_text(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_number(total)}")
+            lines.append(f"{self.name}_count{label_text} {count}")
+        return lines
+
+def render_samples(
+    name: str,
+    documentation: str,
+    kind: str,
+    labelnames: Labels,
+    samples: Iterable[Tuple[Labels, float]]
+) -> List[str]:
+    """Render counter or gauge samples collected at scrape time."""
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{_label_text(labelnames, labels)} {_number(value)}")
+    return lines
+
+request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.",
+    ("method", "route", "status")
+)
+request_statements = Histogram(
+    "db_statements_per_request", "SQL statements executed per HTTP request.",
+    ("route",), COUNT_BUCKETS
+)
+request_db_time = Histogram(
+    "db_time_per_request_seconds", "Time spent in SQL statements per HTTP request.",
+    ("route",)
+)
+statement_duration = Histogram(
+    "db_statement_duration_seconds", "SQL statement execution time.", buckets=FAST_BUCKETS
+)
+pool_checkout_wait = Histogram(
+    "db_pool_checkout_wait_seconds", "Time to obtain a connection from the pool.",
+    ("pool",), FAST_BUCKETS
+)
+redis_duration = Histogram(
+    "redis_operation_duration_seconds", "Latency of cache operations against Redis.",
+    ("operation",), FAST_BUCKETS
+)
+
+HISTOGRAMS = (
+    request_duration, request_statements, request_db_time,
+    statement_duration, pool_checkout_wait, redis_duration,
+)
+
+class StatementCounter:
+    """SQL statements executed in one request or ``count_statements`` block."""
+
+    __slots__ = ("count", "seconds", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: List[str] = []
+
+# Counter of the request being served
+request_sql: ContextVar[Optional[StatementCounter]] = ContextVar("request_sql", default=None)
+
+# Called with (method, route, status, counter) after every HTTP request
+request_observers: List[Callable[[str, str, int, StatementCounter], None]] = []
+
+@contextmanager
+def count_statements() -> Iterator[StatementCounter]:
+    """
+    Count SQL statements executed inside the block.
+
+    Requests count their own statements through ``MetricsMiddleware``;
+    this covers code running outside a request, such as workers.
+    """
+    counter = StatementCounter()
+    token = request_sql.set(counter)
+    try:
+        yield counter
+    finally:
+        request_sql.reset(token)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    statement_duration.observe(elapsed)
+    counter = request_sql.get()
+    if counter is not None:
+        counter.count += 1
+        counter.seconds += elapsed
+        counter.statements.append(statement)
+
+def _handle_error(context):
+    # after_cursor_execute does not run for a failed statement
+    if context.connection is not None:
+        starts = context.connection.info.get("query_start")
+        if starts:
+            starts.pop()
+
+def instrument_engine(engine) -> None:
+    """
+    Time every SQL statement of an engine and add it to the current request.
+
+    Args:
+        engine: Async or sync engine; safe to call more than once
+    """
+    target = getattr(engine, "sync_engine", engine)
+    for name, listener in (
+        ("before_cursor_execute", _before_cursor_execute),
+        ("after_cursor_execute", _after_cursor_execute),
+        ("handle_error", _handle_error),
+    ):
+        if not event.contains(target, name, listener):
+            event.listen(target, name, listener)
+
+class timed_redis:
+    """
+    Record the latency of Redis-backed cache operations.
+
+    Usable as a decorator, of plain or async functions, or as a context
+    manager around the Redis calls.
+
+    Args:
+        operation: ``operation`` label value
+    """
+
+    __slots__ = ("operation", "start")
+
+    def __init__(self, operation: str):
+        self.operation = operation
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        redis_duration.observe(time.perf_counter() - self.start, (self.operation,))
+        return False
+
+    def __call__(self, func: Callable) -> Callable:
+        operation = self.operation
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with timed_redis(operation):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed_redis(operation):
+                return func(*args, **kwargs)
+        return wrapper
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request latency and SQL work per route.
+
+    Routes are labelled by their path template (``/contacts/{contact_id}``),
+    unmatched paths as ``<unmatched>``, to keep label cardinality bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_holder = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder[0] = message["status"]
+            await send(message)
+
+        sql = StatementCounter()
+        token = request_sql.set(sql)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            request_sql.reset(token)
+            route = scope.get("route")
+            path = route.path if route is not None else "<unmatched>"
+            request_duration.observe(elapsed, (scope["method"], path, str(status_holder[0])))
+            request_statements.observe(sql.count, (path,))
+            request_db_time.observe(sql.seconds, (path,))
+            for observer in request_observers:
+                observer(scope["method"], path, status_holder[0], sql)
+
+def render() -> List[str]:
+    """Render all histograms."""
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    return lines
+
+def reset() -> None:
+    """Drop all recorded observations."""
+    for histogram in HISTOGRAMS:
+        histogram.clear()
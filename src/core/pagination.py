@@ -0,0 +1,39 @@
+import base64
+import json
+from typing import Tuple
+
+def encode_cursor(sort_key: str, contact_id: int) -> str:
+    """
+    Encode the last seen (sort key, id) pair into an opaque cursor.
+    
+    Args:
+        sort_key: Sort key value of the last returned row
+        contact_id: ID of the last returned row
+        
+    Returns:
+        URL-safe cursor string
+    """
+    raw = json.dumps([sort_key, contact_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """
+    Decode a cursor produced by :func:`encode_cursor`.
+    
+    Args:
+        cursor: Opaque cursor string
+        
+    Returns:
+        (sort key, id) pair
+        
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_key, contact_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(sort_key, str) or not isinstance(contact_id, int):
+        raise ValueError("Invalid cursor")
+    return sort_key, contact_id
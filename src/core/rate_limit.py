@@ -0,0 +1,112 @@
+import math
+import time
+import uuid
+from typing import Optional
+
+from fastapi import HTTPException, Request, status
+from redis.exceptions import RedisError
+
+from src.core import cache
+from src.core.auth import get_hashing_stats
+from src.core.config import settings
+
+class SlidingWindowLimiter:
+    """
+    Sliding-log rate limiter stored in Redis sorted sets.
+
+    Each accepted hit is a member scored by its timestamp; hits older than
+    the window are trimmed before counting.
+
+    Args:
+        name: Limiter name used in Redis keys
+        limit: Requests allowed per window
+        window: Window length in seconds
+    """
+
+    def __init__(self, name: str, limit: int, window: float):
+        self.name = name
+        self.limit = limit
+        self.window = window
+
+    @classmethod
+    def from_setting(cls, name: str, value: str) -> "SlidingWindowLimiter":
+        """Build limiter from a ``"<requests>/<seconds>"`` setting."""
+        limit, window = value.split("/")
+        return cls(name, int(limit), float(window))
+
+    async def hit(self, key: str) -> Optional[float]:
+        """
+        Register a request for ``key``.
+
+        Args:
+            key: Client identifier (IP address, email)
+
+        Returns:
+            None if allowed, otherwise seconds until the next request is allowed
+        """
+        redis_key = f"ratelimit:{self.name}:{key}"
+        now = time.time()
+        member = f"{now}:{uuid.uuid4().hex}"
+        async with cache.async_redis_client.pipeline(transaction=True) as pipe:
+            pipe.zremrangebyscore(redis_key, 0, now - self.window)
+            pipe.zadd(redis_key, {member: now})
+            pipe.zcard(redis_key)
+            pipe.zrange(redis_key, 0, 0, withscores=True)
+            pipe.expire(redis_key, math.ceil(self.window))
+            _, _, count, oldest, _ = await pipe.execute()
+        if count <= self.limit:
+            return None
+        # Rejected attempts do not occupy the window
+        await cache.async_redis_client.zrem(redis_key, member)
+        return max(oldest[0][1] + self.window - now, 0)
+
+limiters = {
+    ("login", "ip"): SlidingWindowLimiter.from_setting("login:ip", settings.RATE_LIMIT_LOGIN_IP),
+    ("login", "email"): SlidingWindowLimiter.from_setting(
+        "login:email", settings.RATE_LIMIT_LOGIN_EMAIL
+    ),
+    ("register", "ip"): SlidingWindowLimiter.from_setting(
+        "register:ip", settings.RATE_LIMIT_REGISTER_IP
+    ),
+    ("register", "email"): SlidingWindowLimiter.from_setting(
+        "register:email", settings.RATE_LIMIT_REGISTER_EMAIL
+    ),
+}
+
+async def enforce_auth_limits(request: Request, route: str, email: str) -> None:
+    """
+    Admission control for expensive auth routes.
+
+    Sheds load with 503 while the password hashing backlog is over
+    ``AUTH_HASH_BACKLOG_LIMIT``, then applies the per-IP and per-email
+    sliding windows of ``route``. Redis errors let the request through.
+
+    Args:
+        request: Incoming request, used for the client IP
+        route: ``login`` or ``register``
+        email: Account email from the request body
+
+    Raises:
+        HTTPException: 503 when overloaded, 429 when rate limited; both
+            carry a ``Retry-After`` header
+    """
+    if get_hashing_stats()["pending"] >= settings.AUTH_HASH_BACKLOG_LIMIT:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, try again later",
+            headers={"Retry-After": "1"}
+        )
+
+    client_ip = request.client.host if request.client else "unknown"
+    keys = (("ip", client_ip), ("email", email.lower()))
+    try:
+        for kind, key in keys:
+            retry_after = await limiters[(route, kind)].hit(key)
+            if retry_after is not None:
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many requests",
+                    headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+                )
+    except RedisError as e:
+        print(f"Rate limiter unavailable: {e}")
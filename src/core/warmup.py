@@ -0,0 +1,64 @@
+import asyncio
+from typing import Awaitable, Callable, List, Tuple
+
+from sqlalchemy import text
+
+from src.core import auth, cache, database
+
+RETRY_DELAY = 1.0
+MAX_RETRY_DELAY = 30.0
+
+def _load_hashing() -> None:
+    # passlib picks and imports the bcrypt backend on first hash otherwise
+    auth.get_pwd_context().handler().get_backend()
+
+async def _check_database() -> None:
+    async with database.get_engine().connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+# (name, step): imports run in threads so the event loop keeps serving
+STEPS: List[Tuple[str, Callable[[], Awaitable]]] = [
+    ("password_hashing", lambda: asyncio.to_thread(_load_hashing)),
+    ("jwt", lambda: asyncio.to_thread(auth.get_jwt_backend)),
+    ("redis", lambda: cache.async_redis_client.ping()),
+    ("database", _check_database),
+]
+
+# Steps of the current process that have not succeeded yet
+pending = {name for name, _ in STEPS}
+
+def is_ready() -> bool:
+    """Whether every warm-up step has succeeded."""
+    return not pending
+
+async def _run_step(name: str, step: Callable[[], Awaitable]) -> None:
+    delay = RETRY_DELAY
+    while True:
+        try:
+            await step()
+        except Exception as e:
+            print(f"Warm-up step {name} failed, retrying in {delay:.0f}s: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RETRY_DELAY)
+        else:
+            pending.discard(name)
+            return
+
+async def _run_steps() -> None:
+    await asyncio.gather(*(_run_step(name, step) for name, step in STEPS))
+
+def start_warmup() -> asyncio.Task:
+    """
+    Load lazily initialized subsystems and check backing services.
+
+    Steps run concurrently in a background task; a failing step is retried
+    with exponential backoff until it succeeds, so readiness follows the
+    database and Redis coming up. Started from the app lifespan in every
+    worker.
+
+    Returns:
+        Warm-up task; cancel it on shutdown
+    """
+    pending.clear()
+    pending.update(name for name, _ in STEPS)
+    return asyncio.create_task(_run_steps())
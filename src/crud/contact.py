@@ -1,101 +1,322 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import (
+    ARRAY, Integer, Row, and_, any_, bindparam, case, column, delete, insert, or_, select,
+    tuple_, update, values
+)
 from datetime import date, timedelta
-from typing import List, Optional
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
 
-from src.models.contact import Contact
-from src.schemas.contact import ContactCreate, ContactUpdate
+from src.core.cache import contacts_changed
+from src.models.contact import Contact, birthday_ordinal
+from src.schemas.contact import ContactBatchOperation, ContactCreate, ContactUpdate
 
-def create_contact(db: Session, contact: ContactCreate, user_id: int) -> Contact:
+async def create_contact(db: AsyncSession, contact: ContactCreate, user_id: int) -> Contact:
     """Створити новий контакт для користувача"""
     db_contact = Contact(**contact.dict(), user_id=user_id)
     db.add(db_contact)
-    db.commit()
-    db.refresh(db_contact)
+    await db.commit()
+    await contacts_changed(user_id)
+    await db.refresh(db_contact)
     return db_contact
 
-def get_user_contact(db: Session, contact_id: int, user_id: int) -> Optional[Contact]:
+def _contact_row(contact: ContactCreate) -> dict:
+    row = contact.dict()
+    row["birthday_md"] = birthday_ordinal(contact.birthday)
+    return row
+
+async def bulk_create_contacts(
+    db: AsyncSession,
+    contacts: List[ContactCreate],
+    user_id: int,
+    skip_existing: bool = False
+) -> List[bool]:
+    """Створити пакет контактів одним багаторядковим INSERT.
+
+    Якщо ``skip_existing`` увімкнено, контакти з email, який уже є у користувача
+    (або повторюється в пакеті), пропускаються. Повертає прапорці створення
+    для кожного елемента ``contacts``. Фіксацію транзакції та оновлення версії
+    колекції (``contacts_changed``) виконує викликач.
+    """
+    existing = set()
+    if skip_existing and contacts:
+        result = await db.execute(
+            select(Contact.email).filter(
+                Contact.user_id == user_id,
+                Contact.email.in_({contact.email for contact in contacts})
+            )
+        )
+        existing = set(result.scalars().all())
+
+    rows = []
+    created = []
+    for contact in contacts:
+        if skip_existing and contact.email in existing:
+            created.append(False)
+            continue
+        existing.add(contact.email)
+        row = _contact_row(contact)
+        row["user_id"] = user_id
+        rows.append(row)
+        created.append(True)
+
+    if rows:
+        await db.execute(insert(Contact.__table__), rows)
+    return created
+
+UPDATE_COLUMNS = (
+    "first_name", "last_name", "email", "phone", "birthday", "birthday_md", "additional_data"
+)
+
+def _id_in(db: AsyncSession, ids: Iterable[int]):
+    # One array parameter on PostgreSQL keeps the statement shape independent of len(ids)
+    if db.get_bind().dialect.name == "postgresql":
+        return Contact.id == any_(bindparam("ids", list(ids), type_=ARRAY(Integer)))
+    return Contact.id.in_(list(ids))
+
+def _postgres_bulk_update(user_id: int, updates: Dict[int, dict]):
+    table = Contact.__table__
+    changes = values(
+        *(column(name, table.c[name].type) for name in ("id", *UPDATE_COLUMNS)),
+        name="changes"
+    ).data([
+        (contact_id, *(row[name] for name in UPDATE_COLUMNS))
+        for contact_id, row in updates.items()
+    ])
+    return (
+        update(table)
+        .where(table.c.id == changes.c.id, table.c.user_id == user_id)
+        .values({name: changes.c[name] for name in UPDATE_COLUMNS})
+    )
+
+async def _bulk_update(db: AsyncSession, user_id: int, updates: Dict[int, dict]) -> None:
+    if db.get_bind().dialect.name == "postgresql":
+        await db.execute(_postgres_bulk_update(user_id, updates))
+        return
+    # SQLite cannot name VALUES columns in FROM: one executemany UPDATE instead
+    table = Contact.__table__
+    await db.execute(
+        update(table).where(table.c.id == bindparam("contact_id"), table.c.user_id == user_id),
+        [{"contact_id": contact_id, **row} for contact_id, row in updates.items()]
+    )
+
+async def apply_contact_batch(
+    db: AsyncSession,
+    operations: List[ContactBatchOperation],
+    user_id: int
+) -> List[dict]:
+    """Виконати пакет операцій create/update/delete в одній транзакції.
+
+    Операції застосовуються по порядку: оновлення чи видалення контакту, якого
+    немає у користувача (або вже видаленого раніше в пакеті), отримує статус 404.
+    Записи виконуються наборами: один INSERT, один UPDATE і один DELETE на пакет.
+    Повертає результат для кожної операції.
+    """
+    alive: Set[int] = set()
+    target_ids = {operation.id for operation in operations if operation.op != "create"}
+    if target_ids:
+        result = await db.execute(
+            select(Contact.id).filter(Contact.user_id == user_id, _id_in(db, target_ids))
+        )
+        alive = set(result.scalars().all())
+
+    results = []
+    creates = []
+    updates: Dict[int, dict] = {}
+    deletes: Set[int] = set()
+    for index, operation in enumerate(operations):
+        outcome = {"index": index, "op": operation.op, "id": operation.id}
+        results.append(outcome)
+        if operation.op == "create":
+            row = _contact_row(operation.contact)
+            row["user_id"] = user_id
+            creates.append((outcome, row))
+            outcome["status"] = 201
+        elif operation.id not in alive:
+            outcome.update(status=404, detail="Contact not found")
+        elif operation.op == "update":
+            updates[operation.id] = _contact_row(operation.contact)
+            outcome["status"] = 200
+        else:
+            alive.discard(operation.id)
+            updates.pop(operation.id, None)
+            deletes.add(operation.id)
+            outcome["status"] = 200
+
+    table = Contact.__table__
+    if creates:
+        inserted = await db.execute(
+            insert(table).returning(table.c.id, sort_by_parameter_order=True),
+            [row for _, row in creates]
+        )
+        for (outcome, _), contact_id in zip(creates, inserted.scalars().all()):
+            outcome["id"] = contact_id
+    if updates:
+        await _bulk_update(db, user_id, updates)
+    if deletes:
+        await db.execute(delete(table).where(table.c.user_id == user_id, _id_in(db, deletes)))
+
+    if creates or updates or deletes:
+        await db.commit()
+        await contacts_changed(user_id)
+    return results
+
+async def get_user_contact(db: AsyncSession, contact_id: int, user_id: int) -> Optional[Contact]:
     """Отримати контакт користувача за ID"""
-    return db.query(Contact).filter(
-        and_(Contact.id == contact_id, Contact.user_id == user_id)
-    ).first()
+    result = await db.execute(
+        select(Contact).filter(and_(Contact.id == contact_id, Contact.user_id == user_id))
+    )
+    return result.scalars().first()
+
+EXPORT_COLUMNS = (
+    Contact.id,
+    Contact.first_name,
+    Contact.last_name,
+    Contact.email,
+    Contact.phone,
+    Contact.birthday,
+    Contact.additional_data,
+)
 
-def get_user_contacts(
-    db: Session, 
+def _user_contacts_query(
+    entities: tuple,
     user_id: int,
-    skip: int = 0, 
-    limit: int = 100,
-    first_name: Optional[str] = None,
-    last_name: Optional[str] = None,
-    email: Optional[str] = None
-) -> List[Contact]:
-    """Отримати список контактів користувача з фільтрацією"""
-    query = db.query(Contact).filter(Contact.user_id == user_id)
-    
+    skip: int,
+    limit: int,
+    first_name: Optional[str],
+    last_name: Optional[str],
+    email: Optional[str],
+    after: Optional[Tuple[str, int]]
+):
+    query = select(*entities).filter(Contact.user_id == user_id)
+    if after is not None:
+        query = query.filter(tuple_(Contact.last_name, Contact.id) > tuple_(*after))
+
     if first_name:
         query = query.filter(Contact.first_name.ilike(f"%{first_name}%"))
     if last_name:
         query = query.filter(Contact.last_name.ilike(f"%{last_name}%"))
     if email:
         query = query.filter(Contact.email.ilike(f"%{email}%"))
-    
-    return query.offset(skip).limit(limit).all()
 
-def update_contact(
-    db: Session, 
-    contact_id: int, 
-    contact_update: ContactUpdate, 
+    return query.order_by(Contact.last_name, Contact.id).offset(skip).limit(limit)
+
+async def get_user_contacts(
+    db: AsyncSession,
+    user_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    first_name: Optional[str] = None,
+    last_name: Optional[str] = None,
+    email: Optional[str] = None,
+    after: Optional[Tuple[str, int]] = None
+) -> List[Contact]:
+    """Отримати список контактів користувача з фільтрацією.
+
+    Контакти впорядковані за (last_name, id); ``after`` задає останню пару
+    попередньої сторінки, і наступна читається пошуком по індексу замість OFFSET.
+    """
+    query = _user_contacts_query(
+        (Contact,), user_id, skip, limit, first_name, last_name, email, after
+    )
+    result = await db.execute(query)
+    return result.scalars().all()
+
+async def get_user_contact_rows(
+    db: AsyncSession,
+    user_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    first_name: Optional[str] = None,
+    last_name: Optional[str] = None,
+    email: Optional[str] = None,
+    after: Optional[Tuple[str, int]] = None
+) -> List[Row]:
+    """Те саме, що ``get_user_contacts``, але рядками ``EXPORT_COLUMNS``.
+
+    ORM-об'єкти не створюються; використовується для серіалізації відповіді.
+    """
+    query = _user_contacts_query(
+        EXPORT_COLUMNS, user_id, skip, limit, first_name, last_name, email, after
+    )
+    result = await db.execute(query)
+    return result.all()
+
+async def stream_user_contacts(
+    db: AsyncSession, user_id: int, batch_size: int = 1000
+) -> AsyncIterator[list]:
+    """Читати всі контакти користувача серверним курсором пакетами рядків.
+
+    Повертаються рядки з колонками ``EXPORT_COLUMNS`` без створення ORM-об'єктів.
+    """
+    result = await db.stream(
+        select(*EXPORT_COLUMNS)
+        .filter(Contact.user_id == user_id)
+        .order_by(Contact.id)
+        .execution_options(yield_per=batch_size)
+    )
+    async for rows in result.partitions():
+        yield rows
+
+async def update_contact(
+    db: AsyncSession,
+    contact_id: int,
+    contact_update: ContactUpdate,
     user_id: int
 ) -> Optional[Contact]:
     """Оновити контакт користувача"""
-    contact = db.query(Contact).filter(
-        and_(Contact.id == contact_id, Contact.user_id == user_id)
-    ).first()
-    
+    contact = await get_user_contact(db, contact_id, user_id)
+
     if contact:
         for field, value in contact_update.dict().items():
             setattr(contact, field, value)
-        db.commit()
-        db.refresh(contact)
+        await db.commit()
+        await contacts_changed(user_id)
+        await db.refresh(contact)
     return contact
 
-def delete_contact(db: Session, contact_id: int, user_id: int) -> bool:
+async def delete_contact(db: AsyncSession, contact_id: int, user_id: int) -> bool:
     """Видалити контакт користувача"""
-    contact = db.query(Contact).filter(
-        and_(Contact.id == contact_id, Contact.user_id == user_id)
-    ).first()
-    
+    contact = await get_user_contact(db, contact_id, user_id)
+
     if contact:
-        db.delete(contact)
-        db.commit()
+        await db.delete(contact)
+        await db.commit()
+        await contacts_changed(user_id)
         return True
     return False
 
-def get_user_upcoming_birthdays(db: Session, user_id: int) -> List[Contact]:
-    """Отримати контакти користувача з днями народження на найближчі 7 днів"""
+async def get_user_upcoming_birthdays(
+    db: AsyncSession, user_id: int, days: int = 7
+) -> List[Contact]:
+    """Отримати контакти користувача з днями народження на найближчі ``days`` днів.
+
+    Порівнюється лише місяць і день (``birthday_md``), тому рік народження не
+    впливає на результат, а перехід через Новий рік обробляється одним запитом.
+    """
     today = date.today()
-    next_week = today + timedelta(days=7)
-    
-    # Базовий запит для користувача
-    base_query = db.query(Contact).filter(Contact.user_id == user_id)
-    
-    if today.year == next_week.year:
-        # Якщо в межах одного року
-        return base_query.filter(
-            and_(Contact.birthday >= today, Contact.birthday <= next_week)
-        ).all()
-    else:
-        # Обробка переходу між роками
-        contacts_this_year = base_query.filter(
-            and_(Contact.birthday >= today, Contact.birthday <= date(today.year, 12, 31))
-        ).all()
-        contacts_next_year = base_query.filter(
-            and_(Contact.birthday >= date(next_week.year, 1, 1), Contact.birthday <= next_week)
-        ).all()
-        return contacts_this_year + contacts_next_year
-
-def get_contact_by_email_and_user(db: Session, email: str, user_id: int) -> Optional[Contact]:
+    start = birthday_ordinal(today)
+    end = birthday_ordinal(today + timedelta(days=days))
+    query = select(Contact).filter(Contact.user_id == user_id)
+
+    # Вікно від 365 днів покриває весь рік і не потребує фільтра
+    if days < 365 and start <= end:
+        query = query.filter(Contact.birthday_md.between(start, end))
+    elif days < 365:
+        # Перехід між роками: кінець грудня або початок січня
+        query = query.filter(or_(Contact.birthday_md >= start, Contact.birthday_md <= end))
+
+    # Найближчі дні народження першими
+    query = query.order_by(
+        case((Contact.birthday_md >= start, 0), else_=1), Contact.birthday_md, Contact.id
+    )
+    result = await db.execute(query)
+    return result.scalars().all()
+
+async def get_contact_by_email_and_user(
+    db: AsyncSession, email: str, user_id: int
+) -> Optional[Contact]:
     """Отримати контакт користувача за email"""
-    return db.query(Contact).filter(
-        and_(Contact.email == email, Contact.user_id == user_id)
-    ).first()
\ No newline at end of file
+    result = await db.execute(
+        select(Contact).filter(and_(Contact.email == email, Contact.user_id == user_id))
+    )
+    return result.scalars().first()
@@ -0,0 +1,74 @@
+from sqlalchemy import column, func, or_, select, table, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+
+from src.models.contact import Contact
+
+SEARCH_COLUMNS = (Contact.first_name, Contact.last_name, Contact.email)
+
+# FTS5 trigram tokenizer cannot match patterns shorter than one trigram
+FTS_MIN_QUERY_LENGTH = 3
+
+contacts_fts = table("contacts_fts", column("rowid"))
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def _substring_filter(q: str):
+    pattern = f"%{_escape_like(q)}%"
+    return or_(*(col.ilike(pattern, escape="\\") for col in SEARCH_COLUMNS))
+
+def _postgres_query(user_id: int, q: str):
+    # ILIKE is answered by the gin_trgm_ops indexes, similarity() ranks the hits
+    score = func.greatest(*(func.similarity(col, q) for col in SEARCH_COLUMNS))
+    return (
+        select(Contact)
+        .filter(Contact.user_id == user_id, _substring_filter(q))
+        .order_by(score.desc(), Contact.id)
+    )
+
+def _sqlite_query(user_id: int, q: str):
+    if len(q) < FTS_MIN_QUERY_LENGTH:
+        return (
+            select(Contact)
+            .filter(Contact.user_id == user_id, _substring_filter(q))
+            .order_by(Contact.last_name, Contact.id)
+        )
+    match = '"' + q.replace('"', '""') + '"'
+    return (
+        select(Contact)
+        .join(contacts_fts, contacts_fts.c.rowid == Contact.id)
+        .filter(text("contacts_fts MATCH :match").bindparams(match=match))
+        .filter(Contact.user_id == user_id)
+        .order_by(text("bm25(contacts_fts)"), Contact.id)
+    )
+
+async def search_user_contacts(
+    db: AsyncSession,
+    user_id: int,
+    q: str,
+    skip: int = 0,
+    limit: int = 100
+) -> List[Contact]:
+    """
+    Search user contacts by first name, last name and email at once.
+
+    Uses pg_trgm indexes on PostgreSQL and the ``contacts_fts`` FTS5 table
+    on SQLite. Results are ordered by relevance, best match first.
+
+    Args:
+        db: Database session
+        user_id: Owner of the contacts
+        q: Substring to look for
+        skip: Number of results to skip
+        limit: Maximum number of results
+
+    Returns:
+        Matching contacts
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        query = _postgres_query(user_id, q)
+    else:
+        query = _sqlite_query(user_id, q)
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
@@ -1,54 +1,73 @@
-from sqlalchemy.orm import Session
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.models.user import User
 from src.schemas.user import UserCreate
-from src.core.auth import get_password_hash, verify_password
-from src.core.cache import invalidate_user_cache
+from src.core.auth import get_password_hash_async, verify_and_update_password_async
+from src.core.cache import invalidate_user_cache, pin_to_primary
 
-def get_user_by_email(db: Session, email: str):
+async def get_user_by_email(db: AsyncSession, email: str):
     """Get user by email address."""
-    return db.query(User).filter(User.email == email).first()
+    result = await db.execute(select(User).filter(User.email == email))
+    return result.scalars().first()
 
-def get_user_by_id(db: Session, user_id: int):
+async def get_user_by_id(db: AsyncSession, user_id: int):
     """Get user by ID."""
-    return db.query(User).filter(User.id == user_id).first()
+    result = await db.execute(select(User).filter(User.id == user_id))
+    return result.scalars().first()
 
-def create_user(db: Session, user: UserCreate):
+async def create_user(db: AsyncSession, user: UserCreate):
     """Create new user with hashed password."""
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
     db_user = User(
         username=user.username,
         email=user.email,
         hashed_password=hashed_password
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    try:
+        await pin_to_primary(db_user.id)
+    except RedisError as e:
+        # The account exists either way; its first reads may hit a lagging replica
+        print(f"Could not pin new user to primary: {e}")
     return db_user
 
-def authenticate_user(db: Session, email: str, password: str):
-    """Authenticate user with email and password."""
-    user = get_user_by_email(db, email)
-    if not user or not verify_password(password, user.hashed_password):
+async def authenticate_user(db: AsyncSession, email: str, password: str):
+    """Authenticate user with email and password.
+
+    If the stored hash was made with a different bcrypt cost, it is
+    transparently replaced with one using the current settings.
+    """
+    user = await get_user_by_email(db, email)
+    if not user:
+        return None
+    valid, new_hash = await verify_and_update_password_async(password, user.hashed_password)
+    if not valid:
         return None
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
     return user
 
-def verify_user_email(db: Session, user_id: int):
+async def verify_user_email(db: AsyncSession, user_id: int):
     """Mark user email as verified and invalidate cache."""
-    user = get_user_by_id(db, user_id)
+    user = await get_user_by_id(db, user_id)
     if user:
         user.is_verified = True
-        db.commit()
-        invalidate_user_cache(user_id)  # Clear cache
+        await db.commit()
+        await invalidate_user_cache(user_id)  # Clear cache
         return True
     return False
 
-def update_user_avatar(db: Session, user_id: int, avatar_url: str):
+async def update_user_avatar(db: AsyncSession, user_id: int, avatar_url: str):
     """Update user avatar URL and invalidate cache."""
-    user = get_user_by_id(db, user_id)
+    user = await get_user_by_id(db, user_id)
     if user:
         user.avatar_url = avatar_url
-        db.commit()
-        db.refresh(user)
-        invalidate_user_cache(user_id) 
+        await db.commit()
+        await db.refresh(user)
+        await invalidate_user_cache(user_id)
         return user
-    return None
\ No newline at end of file
+    return None
@@ -1,13 +1,60 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
+from redis.exceptions import RedisError
 
 from src.api.auth import router as auth_router
 from src.api.contacts import router as contacts_router
+from src.api.health import router as health_router
+from src.api.metrics import router as metrics_router
+from src.core import auth, cache, database, warmup
+from src.core.body_limit import BodySizeLimitMiddleware
+from src.core.metrics import MetricsMiddleware
 from src.core.config import settings
+from src.services import avatars
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Runs in every worker: connections made before a fork must not be shared
+    await database.open_pools()
+    cache.reset_redis_pool()
+    # Evict locally cached users when another worker invalidates them
+    try:
+        listener = cache.start_invalidation_listener()
+    except RedisError as e:
+        print(f"User cache invalidation listener not started: {e}")
+        listener = None
+    # Requests are served meanwhile; GET /ready reports when this is done
+    warmup_task = warmup.start_warmup()
+    yield
+    # Shutdown (SIGTERM) starts once the server has drained in-flight requests
+    warmup_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await warmup_task
+    if listener is not None:
+        listener.stop()
+    auth.shutdown_hash_executor()
+    avatars.shutdown_image_executor()
+    await database.dispose_engines()
+    await cache.close_redis()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    version=settings.VERSION
+    version=settings.VERSION,
+    lifespan=lifespan
+)
+
+# Avatar uploads: refuse oversized bodies before they are read (plus multipart overhead)
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    limits={
+        "/auth/avatar": settings.AVATAR_MAX_BYTES + 64 * 1024,
+        "/contacts/batch": settings.CONTACT_BATCH_MAX_OPERATIONS * 1024
+    }
 )
 
 # CORS middleware
@@ -17,12 +64,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Link", "X-Next-Cursor"],
 )
 
+# Outermost: latency and SQL work per route for /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth_router)
 app.include_router(contacts_router)
+app.include_router(metrics_router)
+app.include_router(health_router)
+
+if settings.AVATAR_STORAGE == "local":
+    os.makedirs(settings.AVATAR_LOCAL_DIR, exist_ok=True)
+    app.mount(
+        settings.AVATAR_LOCAL_URL,
+        StaticFiles(directory=settings.AVATAR_LOCAL_DIR),
+        name="avatars"
+    )
 
 @app.get("/")
 def read_root():
-    return {"message": "Welcome to Contacts API with Authentication"}
\ No newline at end of file
+    return {"message": "Welcome to Contacts API with Authentication"}
@@ -1,9 +1,25 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, Index, DDL, event
+from sqlalchemy.orm import relationship, validates
 from src.core.database import Base
 
 class Contact(Base):
     __tablename__ = "contacts"
+    __table_args__ = (
+        # Keyset pagination: WHERE user_id = ? AND (last_name, id) > (?, ?)
+        Index("ix_contacts_user_id_last_name_id", "user_id", "last_name", "id"),
+        # Upcoming birthdays: WHERE user_id = ? AND birthday_md BETWEEN ? AND ?
+        Index("ix_contacts_user_id_birthday_md", "user_id", "birthday_md"),
+        # Substring search (ILIKE '%x%') via pg_trgm; SQLite uses contacts_fts below
+        *(
+            Index(
+                f"ix_contacts_{column}_trgm",
+                column,
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+            ).ddl_if(dialect="postgresql")
+            for column in ("first_name", "last_name", "email")
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     first_name = Column(String, nullable=False)
@@ -11,8 +27,51 @@ class Contact(Base):
     email = Column(String, index=True, nullable=False)
     phone = Column(String, nullable=False)
     birthday = Column(Date, nullable=False)
+    # month * 100 + day, maintained from birthday
+    birthday_md = Column(Integer, nullable=False)
     additional_data = Column(String, nullable=True)
     
     # Зв'язок з користувачем
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    user = relationship("User", back_populates="contacts")
\ No newline at end of file
+    user = relationship("User", back_populates="contacts")
+    
+    @validates("birthday")
+    def _sync_birthday_md(self, key, value):
+        self.birthday_md = birthday_ordinal(value)
+        return value
+
+def birthday_ordinal(value) -> int:
+    """Month-day ordinal of a date, e.g. 1990-03-15 -> 315."""
+    return value.month * 100 + value.day
+
+# SQLite fallback for search: external-content FTS5 table kept in sync by triggers
+SQLITE_FTS_CREATE = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS contacts_fts USING fts5(
+        first_name, last_name, email,
+        content='contacts', content_rowid='id', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS contacts_fts_ai AFTER INSERT ON contacts BEGIN
+        INSERT INTO contacts_fts(rowid, first_name, last_name, email)
+        VALUES (new.id, new.first_name, new.last_name, new.email);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS contacts_fts_ad AFTER DELETE ON contacts BEGIN
+        INSERT INTO contacts_fts(contacts_fts, rowid, first_name, last_name, email)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.email);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS contacts_fts_au AFTER UPDATE ON contacts BEGIN
+        INSERT INTO contacts_fts(contacts_fts, rowid, first_name, last_name, email)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.email);
+        INSERT INTO contacts_fts(rowid, first_name, last_name, email)
+        VALUES (new.id, new.first_name, new.last_name, new.email);
+    END""",
+]
+
+for statement in SQLITE_FTS_CREATE:
+    event.listen(
+        Contact.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite")
+    )
+event.listen(
+    Contact.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS contacts_fts").execute_if(dialect="sqlite"),
+)
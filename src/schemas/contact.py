@@ -1,6 +1,8 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field, model_validator
 from datetime import date
-from typing import Optional
+from typing import List, Literal, Optional
+
+from src.core.config import settings
 
 class ContactBase(BaseModel):
     first_name: str
@@ -20,4 +22,39 @@ class ContactResponse(ContactBase):
     id: int
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ContactImportError(BaseModel):
+    row: int
+    errors: List[str]
+
+class ContactImportResult(BaseModel):
+    created: int
+    skipped: int
+    failed: int
+    errors: List[ContactImportError]
+
+class ContactBatchOperation(BaseModel):
+    op: Literal["create", "update", "delete"]
+    id: Optional[int] = None
+    contact: Optional[ContactCreate] = None
+    
+    @model_validator(mode="after")
+    def check_fields(self):
+        if self.op != "create" and self.id is None:
+            raise ValueError("id is required for update and delete")
+        if self.op != "delete" and self.contact is None:
+            raise ValueError("contact is required for create and update")
+        return self
+
+class ContactBatchRequest(BaseModel):
+    operations: List[ContactBatchOperation] = Field(
+        ..., min_length=1, max_length=settings.CONTACT_BATCH_MAX_OPERATIONS
+    )
+
+class ContactBatchResult(BaseModel):
+    index: int
+    op: str
+    status: int
+    id: Optional[int] = None
+    detail: Optional[str] = None
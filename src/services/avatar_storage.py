@@ -0,0 +1,87 @@
+import os
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from src.core.config import settings
+
+class AvatarStorage(ABC):
+    """Where processed avatar images are kept."""
+
+    @abstractmethod
+    async def save(self, name: str, data: bytes) -> str:
+        """
+        Store an encoded avatar.
+        
+        Args:
+            name: Content-derived object name, without extension
+            data: JPEG bytes
+            
+        Returns:
+            Public URL of the stored image
+        """
+
+class CloudinaryStorage(AvatarStorage):
+    """Upload avatars to the Cloudinary ``avatars`` folder."""
+
+    def __init__(self):
+        import cloudinary
+
+        cloudinary.config(
+            cloud_name=settings.CLOUDINARY_CLOUD_NAME,
+            api_key=settings.CLOUDINARY_API_KEY,
+            api_secret=settings.CLOUDINARY_API_SECRET
+        )
+
+    async def save(self, name: str, data: bytes) -> str:
+        import cloudinary.uploader
+
+        result = await run_in_threadpool(
+            cloudinary.uploader.upload,
+            data,
+            folder="avatars",
+            public_id=name,
+            overwrite=False,
+            resource_type="image"
+        )
+        return result["secure_url"]
+
+class LocalStorage(AvatarStorage):
+    """
+    Write avatars to a local directory served under ``base_url``.
+    
+    Args:
+        directory: Target directory, created if missing
+        base_url: URL prefix the directory is served from
+    """
+
+    def __init__(self, directory: str, base_url: str):
+        self.directory = directory
+        self.base_url = base_url.rstrip("/")
+        os.makedirs(directory, exist_ok=True)
+
+    def _write(self, path: str, data: bytes) -> None:
+        if os.path.exists(path):
+            return
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    async def save(self, name: str, data: bytes) -> str:
+        filename = f"{name}.jpg"
+        await run_in_threadpool(self._write, os.path.join(self.directory, filename), data)
+        return f"{self.base_url}/{filename}"
+
+_storage: Optional[AvatarStorage] = None
+
+def get_avatar_storage() -> AvatarStorage:
+    """Get the storage backend selected by ``AVATAR_STORAGE``."""
+    global _storage
+    if _storage is None:
+        if settings.AVATAR_STORAGE == "local":
+            _storage = LocalStorage(settings.AVATAR_LOCAL_DIR, settings.AVATAR_LOCAL_URL)
+        else:
+            _storage = CloudinaryStorage()
+    return _storage
@@ -0,0 +1,114 @@
+import asyncio
+import hashlib
+import io
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from fastapi import UploadFile
+
+from src.core import cache
+from src.core.config import settings
+from src.services.avatar_storage import get_avatar_storage
+
+READ_CHUNK_SIZE = 64 * 1024
+# Reject images whose header claims more pixels than this before decoding
+MAX_IMAGE_PIXELS = 40_000_000
+# Uploaded content hash -> stored avatar URL
+URL_CACHE_TTL = 30 * 24 * 3600
+
+class AvatarTooLarge(Exception):
+    """Upload is over ``AVATAR_MAX_BYTES``."""
+
+class InvalidAvatar(Exception):
+    """Upload is not a decodable image."""
+
+_image_executor: Optional[ThreadPoolExecutor] = None
+
+def _get_image_executor() -> ThreadPoolExecutor:
+    global _image_executor
+    if _image_executor is None:
+        _image_executor = ThreadPoolExecutor(
+            max_workers=settings.AVATAR_WORKERS, thread_name_prefix="avatar"
+        )
+    return _image_executor
+
+def shutdown_image_executor() -> None:
+    """Stop the image pool; it is recreated on next use."""
+    global _image_executor
+    if _image_executor is not None:
+        _image_executor.shutdown(wait=True)
+        _image_executor = None
+
+async def read_upload(file: UploadFile, max_bytes: int) -> bytes:
+    """
+    Read an uploaded file in chunks, stopping as soon as it exceeds ``max_bytes``.
+    
+    Raises:
+        AvatarTooLarge: If the file is bigger than allowed
+    """
+    chunks = []
+    size = 0
+    while chunk := await file.read(READ_CHUNK_SIZE):
+        size += len(chunk)
+        if size > max_bytes:
+            raise AvatarTooLarge()
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+def process_avatar(data: bytes, size: int = settings.AVATAR_SIZE) -> bytes:
+    """
+    Decode, center-crop and resize an image to a ``size`` x ``size`` JPEG.
+    
+    Raises:
+        InvalidAvatar: If the data is not a supported image
+    """
+    # Pillow is only needed by avatar uploads, keep it out of app startup
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        image = Image.open(io.BytesIO(data))
+        if image.width * image.height > MAX_IMAGE_PIXELS:
+            raise InvalidAvatar("Image dimensions are too large")
+        image.draft("RGB", (size * 2, size * 2))
+        image = ImageOps.exif_transpose(image)
+        if image.mode in ("RGBA", "LA", "P"):
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        image = ImageOps.fit(image.convert("RGB"), (size, size), Image.Resampling.LANCZOS)
+        output = io.BytesIO()
+        image.save(output, format="JPEG", quality=85, optimize=True)
+        return output.getvalue()
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        raise InvalidAvatar(str(e)) from e
+
+async def store_avatar(data: bytes) -> str:
+    """
+    Process an uploaded image and store it, reusing earlier results.
+    
+    The SHA-256 of the upload names the stored object; if the same bytes
+    were stored before, the known URL is returned without resizing or
+    uploading again.
+    
+    Args:
+        data: Raw uploaded bytes
+        
+    Returns:
+        Public avatar URL
+        
+    Raises:
+        InvalidAvatar: If the data is not a supported image
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    cache_key = f"avatar:{digest}"
+    url = await cache.async_redis_client.get(cache_key)
+    if url:
+        return url.decode()
+
+    processed = await asyncio.get_running_loop().run_in_executor(
+        _get_image_executor(), process_avatar, data
+    )
+    url = await get_avatar_storage().save(digest, processed)
+    await cache.async_redis_client.setex(cache_key, URL_CACHE_TTL, url)
+    return url
@@ -0,0 +1,84 @@
+import hashlib
+import json
+from operator import attrgetter
+from typing import Awaitable, Callable, Optional, Sequence, Tuple
+
+import orjson
+from fastapi import Response
+from redis.exceptions import RedisError
+
+from src.core.cache import cache_result, get_cached_result
+from src.schemas.contact import ContactResponse
+
+# Output keys in the order FastAPI would emit them for ContactResponse
+RESPONSE_FIELDS = tuple(ContactResponse.model_fields)
+_response_values = attrgetter(*RESPONSE_FIELDS)
+
+Loader = Callable[[], Awaitable[Tuple[Sequence, Optional[str]]]]
+
+def params_key(params: dict) -> str:
+    """
+    Digest of normalized query parameters.
+
+    Parameters set to None are dropped and the rest are sorted, so
+    ``?a=1&b=2`` and ``?b=2&a=1`` share an entry.
+    """
+    normalized = {name: value for name, value in params.items() if value is not None}
+    raw = json.dumps(normalized, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+def serialize_contacts(contacts: Sequence) -> bytes:
+    """
+    Serialize contacts to the JSON body of ``List[ContactResponse]``.
+
+    Values come from our own database, so they are read by attribute from
+    ORM objects or ``EXPORT_COLUMNS`` rows and encoded with orjson without
+    re-validating them through the response model. The output is byte for
+    byte what FastAPI produces for the model.
+    """
+    return orjson.dumps([
+        dict(zip(RESPONSE_FIELDS, _response_values(contact))) for contact in contacts
+    ])
+
+async def get_or_load(
+    user_id: int,
+    version: Optional[int],
+    params: dict,
+    load: Loader
+) -> Tuple[bytes, Optional[str]]:
+    """
+    Serve a contact listing from the result cache or build and cache it.
+
+    Without a collection version (Redis unavailable) the cache is bypassed.
+
+    Args:
+        user_id: Owner of the contacts
+        version: Current collection version
+        params: Query parameters that determine the result
+        load: Coroutine factory returning contacts and the next page cursor
+
+    Returns:
+        Serialized body and next page cursor
+    """
+    key = params_key(params)
+    if version is not None:
+        try:
+            cached = await get_cached_result(user_id, version, key)
+        except RedisError as e:
+            print(f"Result cache unavailable: {e}")
+            cached, version = None, None
+        if cached:
+            return cached["body"], cached["cursor"]
+
+    contacts, cursor = await load()
+    body = serialize_contacts(contacts)
+    if version is not None:
+        try:
+            await cache_result(user_id, version, key, body, cursor)
+        except RedisError as e:
+            print(f"Result cache unavailable: {e}")
+    return body, cursor
+
+def json_response(body: bytes, response: Response) -> Response:
+    """Wrap a serialized body, keeping headers set on the injected response."""
+    return Response(content=body, media_type="application/json", headers=dict(response.headers))
@@ -0,0 +1,56 @@
+import csv
+import io
+import json
+from typing import AsyncIterator
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.crud.contact import EXPORT_COLUMNS, stream_user_contacts
+
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+def _encode_ndjson(rows) -> bytes:
+    lines = []
+    for row in rows:
+        record = dict(zip(EXPORT_FIELDS, row))
+        record["birthday"] = record["birthday"].isoformat()
+        lines.append(json.dumps(record, ensure_ascii=False))
+    lines.append("")
+    return "\n".join(lines).encode()
+
+def _encode_csv(rows, header: bool = False) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    writer.writerows(rows)
+    return buffer.getvalue().encode()
+
+async def export_contacts(db: AsyncSession, user_id: int, fmt: str) -> AsyncIterator[bytes]:
+    """
+    Stream every contact of a user as CSV or NDJSON.
+
+    Rows are read with a server-side cursor and encoded one batch at a
+    time, so memory use does not depend on the number of contacts. The
+    session is closed once the stream is exhausted.
+
+    Args:
+        db: Database session
+        user_id: Owner of the contacts
+        fmt: ``csv`` or ``ndjson``
+
+    Yields:
+        Encoded chunks of the export
+    """
+    try:
+        if fmt == "csv":
+            yield _encode_csv([], header=True)
+        async for rows in stream_user_contacts(db, user_id):
+            yield _encode_csv(rows) if fmt == "csv" else _encode_ndjson(rows)
+    finally:
+        await db.close()
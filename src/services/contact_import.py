@@ -0,0 +1,186 @@
+import codecs
+import csv
+import json
+from typing import AsyncIterator, List, Optional, Tuple, Union
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.cache import contacts_changed
+from src.crud.contact import bulk_create_contacts
+from src.schemas.contact import ContactCreate
+
+BATCH_SIZE = 1000
+# Only the first rejected rows are reported in detail to keep the response bounded
+MAX_REPORTED_ERRORS = 1000
+# A quoted CSV value longer than this is reported as a failed row
+MAX_RECORD_SIZE = 64 * 1024
+
+Record = Tuple[int, Union[dict, str]]
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Split a stream of byte chunks into decoded text lines.
+
+    Args:
+        chunks: UTF-8 encoded request body chunks
+
+    Yields:
+        Lines without trailing newline characters
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+async def iter_ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[Record]:
+    """Parse NDJSON lines into (row number, object or error message) pairs."""
+    row = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield row, f"invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield row, "expected a JSON object"
+            continue
+        yield row, record
+
+def _ends_in_quotes(line: str, in_quotes: bool) -> bool:
+    """
+    Whether a quoted value is still open at the end of ``line``.
+
+    Follows ``csv.reader``'s rules: a quote only opens a value at the start
+    of a field, so a stray quote inside an unquoted value is literal.
+    """
+    if '"' not in line:
+        return in_quotes
+    state = "quoted" if in_quotes else "start"
+    for char in line:
+        if state == "quoted":
+            if char == '"':
+                state = "quote"
+        elif state == "quote":
+            # Doubled quote is an escaped one, anything else closes the value
+            state = "quoted" if char == '"' else "start" if char == "," else "field"
+        elif char == ",":
+            state = "start"
+        elif state == "start" and char == '"':
+            state = "quoted"
+        else:
+            state = "field"
+    return state == "quoted"
+
+async def iter_csv_records(lines: AsyncIterator[str]) -> AsyncIterator[Record]:
+    """
+    Parse CSV lines into (row number, dict or error message) pairs.
+
+    The first record is the header. Quoted values may span lines: physical
+    lines are collected while a quoted value is open. A record that grows
+    past ``MAX_RECORD_SIZE`` is reported as failed and parsing resumes
+    with the next line.
+    """
+    header = None
+    row = 0
+    pending = []
+    pending_size = 0
+    in_quotes = False
+    async for line in lines:
+        pending.append(line)
+        pending_size += len(line) + 1
+        in_quotes = _ends_in_quotes(line, in_quotes)
+        if in_quotes:
+            if pending_size > MAX_RECORD_SIZE:
+                row += 1
+                yield row, f"quoted value longer than {MAX_RECORD_SIZE} characters"
+                pending, pending_size, in_quotes = [], 0, False
+            continue
+        text = "\n".join(pending)
+        pending, pending_size = [], 0
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        row += 1
+        if len(values) != len(header):
+            yield row, f"expected {len(header)} columns, got {len(values)}"
+            continue
+        yield row, {name: value if value != "" else None for name, value in zip(header, values)}
+    if pending:
+        yield row + 1, "unterminated quoted value"
+
+def _validate(record: Union[dict, str]) -> Tuple[Optional[ContactCreate], List[str]]:
+    if isinstance(record, str):
+        return None, [record]
+    try:
+        return ContactCreate(**record), []
+    except ValidationError as e:
+        return None, [
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+            for error in e.errors()
+        ]
+
+async def import_contacts(
+    db: AsyncSession,
+    user_id: int,
+    chunks: AsyncIterator[bytes],
+    fmt: str,
+    skip_existing: bool = False,
+    batch_size: int = BATCH_SIZE
+) -> dict:
+    """
+    Validate and insert a streamed CSV or NDJSON contact upload.
+
+    Rows are validated with ``ContactCreate`` and written in batches of
+    ``batch_size``, one multi-row INSERT and commit per batch, so memory
+    use does not grow with the upload size.
+
+    Args:
+        db: Database session
+        user_id: Owner of the imported contacts
+        chunks: Request body chunks
+        fmt: ``csv`` or ``ndjson``
+        skip_existing: Skip rows whose email the user already has
+        batch_size: Rows per INSERT
+
+    Returns:
+        Import report with created/skipped/failed counts and row errors
+    """
+    parse = iter_csv_records if fmt == "csv" else iter_ndjson_records
+    report = {"created": 0, "skipped": 0, "failed": 0, "errors": []}
+    batch = []
+
+    async def flush():
+        created = await bulk_create_contacts(db, batch, user_id, skip_existing)
+        await db.commit()
+        if any(created):
+            await contacts_changed(user_id)
+        report["created"] += sum(created)
+        report["skipped"] += len(created) - sum(created)
+        batch.clear()
+
+    async for row, record in parse(iter_lines(chunks)):
+        contact, errors = _validate(record)
+        if errors:
+            report["failed"] += 1
+            if len(report["errors"]) < MAX_REPORTED_ERRORS:
+                report["errors"].append({"row": row, "errors": errors})
+            continue
+        batch.append(contact)
+        if len(batch) >= batch_size:
+            await flush()
+    if batch:
+        await flush()
+    return report
@@ -1,29 +1,15 @@
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
-from src.core.config import settings
+from src.services import mail_queue
 
-# Email configuration
-conf = ConnectionConfig(
-    MAIL_USERNAME=settings.MAIL_USERNAME,
-    MAIL_PASSWORD=settings.MAIL_PASSWORD,
-    MAIL_FROM=settings.MAIL_FROM,
-    MAIL_PORT=settings.MAIL_PORT,
-    MAIL_SERVER=settings.MAIL_SERVER,
-    MAIL_STARTTLS=True,
-    MAIL_SSL_TLS=False,
-    USE_CREDENTIALS=True,
-    VALIDATE_CERTS=True
-)
-
-async def send_verification_email(email: str, user_id: int):
+def verification_email(email: str, user_id: int) -> dict:
     """
-    Send email verification message to user.
+    Build email verification message.
     
     Args:
         email: User's email address
         user_id: User's unique identifier
         
-    Raises:
-        Exception: If email sending fails
+    Returns:
+        Dict with subject, recipients and HTML body
     """
     
     # HTML template for verification email
@@ -38,12 +24,20 @@ async def send_verification_email(email: str, user_id: int):
     <p>If you didn't create an account, please ignore this email.</p>
     """
     
-    message = MessageSchema(
-        subject="Email Verification - Contacts API",
-        recipients=[email],
-        body=html,
-        subtype=MessageType.html
-    )
+    return {
+        "subject": "Email Verification - Contacts API",
+        "recipients": [email],
+        "html": html
+    }
+
+async def enqueue_verification_email(email: str, user_id: int) -> None:
+    """
+    Put email verification message on the outbound mail queue.
+    
+    The message is delivered by the mail worker (``python -m src.services.mail_queue``).
     
-    fm = FastMail(conf)
-    await fm.send_message(message)
\ No newline at end of file
+    Args:
+        email: User's email address
+        user_id: User's unique identifier
+    """
+    await mail_queue.enqueue_email(**verification_email(email, user_id))
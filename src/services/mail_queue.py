@@ -0,0 +1,228 @@
+import asyncio
+import json
+import socket
+import time
+from email.message import EmailMessage
+from typing import TYPE_CHECKING, List, Optional
+
+from redis.exceptions import RedisError
+
+from src.core import cache
+from src.core.config import settings
+
+# aiosmtplib is only used by the worker process, the API just enqueues
+if TYPE_CHECKING:
+    import aiosmtplib
+
+QUEUE_KEY = "mail:queue"
+RETRY_KEY = "mail:retry"
+DEAD_KEY = "mail:dead"
+# Jobs a worker has taken but not finished, one list per worker id
+PROCESSING_KEY = "mail:processing:{worker_id}"
+MAX_RETRY_DELAY = 3600
+
+async def enqueue_email(subject: str, recipients: List[str], html: str) -> None:
+    """
+    Add a message to the outbound mail queue.
+
+    Args:
+        subject: Message subject
+        recipients: Recipient addresses
+        html: HTML body
+    """
+    job = {"subject": subject, "recipients": recipients, "html": html, "attempts": 0}
+    await cache.async_redis_client.lpush(QUEUE_KEY, json.dumps(job))
+
+def build_message(job: dict, sender: str) -> EmailMessage:
+    """Build MIME message for a queued job."""
+    message = EmailMessage()
+    message["Subject"] = job["subject"]
+    message["From"] = sender
+    message["To"] = ", ".join(job["recipients"])
+    message.set_content(job["html"], subtype="html")
+    return message
+
+class MailWorker:
+    """
+    Deliver queued mail over a single reused SMTP connection.
+
+    Jobs are moved from ``mail:queue`` to the worker's own
+    ``mail:processing:<worker_id>`` list and removed from it only once they
+    are delivered, scheduled for retry or dead-lettered, so a job in flight
+    when the worker dies is put back on the queue by the next worker started
+    with the same id. A failed job is scheduled in ``mail:retry`` with
+    exponential backoff; after ``max_attempts`` tries, or on a permanent 5xx
+    rejection, it is moved to ``mail:dead`` together with the last error.
+    Payloads that are not valid jobs go to ``mail:dead`` straight away.
+
+    Args:
+        hostname: SMTP server, defaults to ``MAIL_SERVER``
+        port: SMTP port, defaults to ``MAIL_PORT``
+        username: Login, defaults to ``MAIL_USERNAME``; empty disables auth
+        password: Password, defaults to ``MAIL_PASSWORD``
+        start_tls: Upgrade the connection with STARTTLS
+        sender: From address, defaults to ``MAIL_FROM``
+        batch_size: Jobs sent per batch
+        max_attempts: Delivery attempts before dead-lettering
+        base_delay: First retry delay in seconds
+        worker_id: Names the processing list; must be stable across restarts
+            and unique among running workers, defaults to the host name
+    """
+
+    def __init__(
+        self,
+        hostname: Optional[str] = None,
+        port: Optional[int] = None,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        start_tls: bool = True,
+        sender: Optional[str] = None,
+        batch_size: int = settings.MAIL_QUEUE_BATCH_SIZE,
+        max_attempts: int = settings.MAIL_MAX_ATTEMPTS,
+        base_delay: float = settings.MAIL_RETRY_BASE_DELAY,
+        worker_id: Optional[str] = None
+    ):
+        self.hostname = hostname or settings.MAIL_SERVER
+        self.port = port or settings.MAIL_PORT
+        self.username = settings.MAIL_USERNAME if username is None else username
+        self.password = settings.MAIL_PASSWORD if password is None else password
+        self.start_tls = start_tls
+        self.sender = sender or settings.MAIL_FROM
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.processing_key = PROCESSING_KEY.format(worker_id=worker_id or socket.gethostname())
+        self._smtp: Optional["aiosmtplib.SMTP"] = None
+
+    async def _connection(self) -> "aiosmtplib.SMTP":
+        import aiosmtplib
+
+        if self._smtp is None or not self._smtp.is_connected:
+            smtp = aiosmtplib.SMTP(
+                hostname=self.hostname,
+                port=self.port,
+                start_tls=self.start_tls,
+                username=self.username or None,
+                password=self.password or None
+            )
+            await smtp.connect()
+            self._smtp = smtp
+        return self._smtp
+
+    async def close(self) -> None:
+        """Close the SMTP connection if open."""
+        import aiosmtplib
+
+        if self._smtp is not None and self._smtp.is_connected:
+            try:
+                await self._smtp.quit()
+            except aiosmtplib.SMTPException:
+                self._smtp.close()
+        self._smtp = None
+
+    async def _promote_due_retries(self) -> None:
+        due = await cache.async_redis_client.zrangebyscore(RETRY_KEY, 0, time.time())
+        for raw in due:
+            if await cache.async_redis_client.zrem(RETRY_KEY, raw):
+                await cache.async_redis_client.lpush(QUEUE_KEY, raw)
+
+    async def requeue_in_flight(self) -> int:
+        """
+        Put jobs left in this worker's processing list back on the queue.
+
+        Returns:
+            Number of jobs requeued
+        """
+        count = 0
+        # Oldest job ends up next in line
+        while await cache.async_redis_client.lmove(
+            self.processing_key, QUEUE_KEY, "LEFT", "RIGHT"
+        ):
+            count += 1
+        return count
+
+    async def _fail(self, job: dict, error: Exception, permanent: bool) -> None:
+        job["attempts"] = job.get("attempts", 0) + 1
+        job["error"] = str(error)
+        if permanent or job["attempts"] >= self.max_attempts:
+            await cache.async_redis_client.lpush(DEAD_KEY, json.dumps(job))
+            return
+        delay = min(self.base_delay * 2 ** (job["attempts"] - 1), MAX_RETRY_DELAY)
+        await cache.async_redis_client.zadd(RETRY_KEY, {json.dumps(job): time.time() + delay})
+
+    async def _deliver(self, raw: bytes) -> None:
+        import aiosmtplib
+
+        try:
+            job = json.loads(raw)
+            message = build_message(job, self.sender)
+        except (json.JSONDecodeError, UnicodeDecodeError, KeyError, TypeError) as e:
+            print(f"Dropping malformed mail job: {e}")
+            dead = {"payload": raw.decode(errors="replace"), "error": str(e)}
+            await cache.async_redis_client.lpush(DEAD_KEY, json.dumps(dead))
+            return
+        try:
+            smtp = await self._connection()
+            await smtp.send_message(message)
+        except aiosmtplib.SMTPRecipientsRefused as e:
+            await self._fail(job, e, permanent=all(500 <= r.code < 600 for r in e.recipients))
+        except aiosmtplib.SMTPResponseException as e:
+            await self._fail(job, e, permanent=500 <= e.code < 600)
+        except (aiosmtplib.SMTPException, OSError) as e:
+            # Connection-level problem: reconnect for the next job
+            await self.close()
+            await self._fail(job, e, permanent=False)
+        except Exception as e:
+            # Unexpected failure of one job must not hold up the rest of the batch
+            print(f"Mail job failed: {e}")
+            await self._fail(job, e, permanent=False)
+
+    async def process_batch(self) -> int:
+        """
+        Send one batch of queued messages.
+
+        Returns:
+            Number of jobs taken from the queue
+
+        Raises:
+            RedisError: If Redis is unavailable; the job being handled stays
+                in the processing list
+        """
+        await self._promote_due_retries()
+        taken = 0
+        while taken < self.batch_size:
+            raw = await cache.async_redis_client.lmove(
+                QUEUE_KEY, self.processing_key, "RIGHT", "LEFT"
+            )
+            if raw is None:
+                break
+            taken += 1
+            await self._deliver(raw)
+            await cache.async_redis_client.lrem(self.processing_key, 1, raw)
+        return taken
+
+    async def run(self, poll_interval: float = 1.0) -> None:
+        """
+        Process batches until cancelled, sleeping while the queue is empty.
+
+        Jobs left in flight by a previous run are requeued first. Redis
+        errors are logged and retried after ``poll_interval``.
+        """
+        recover = True
+        try:
+            while True:
+                try:
+                    if recover:
+                        await self.requeue_in_flight()
+                        recover = False
+                    if await self.process_batch():
+                        continue
+                except RedisError as e:
+                    print(f"Mail queue unavailable, retrying: {e}")
+                    recover = True
+                await asyncio.sleep(poll_interval)
+        finally:
+            await self.close()
+
+if __name__ == "__main__":
+    asyncio.run(MailWorker().run())
@@ -0,0 +1,386 @@
+"""
+API benchmark harness.
+
+Seeds a temporary SQLite database with one user owning ``--sizes``
+contacts each (1k and 100k by default), swaps Redis for an in-memory fake
+and drives every route of ``src/api/auth.py`` and ``src/api/contacts.py``
+through an in-process ASGI transport with ``--concurrency`` clients.
+Reports throughput and p50/p95/p99 latency per route; runs offline.
+
+    python -m tests.bench.bench_api
+    python -m tests.bench.bench_api --sizes 1000 --save tests/bench/baseline.json
+    python -m tests.bench.bench_api --sizes 1000 --compare tests/bench/baseline.json
+
+``--compare`` exits with status 1 when a route's p95 latency grows, or
+its throughput drops, by more than ``--threshold`` (20% by default).
+Rate limits are lifted and bcrypt-bound routes run fewer requests.
+"""
+import argparse
+import asyncio
+import io
+import itertools
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import string
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+import fakeredis
+import httpx
+from PIL import Image
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.core import cache, rate_limit
+from src.core.auth import get_password_hash, token_cache
+from src.core.database import Base, get_db
+from src.main import app
+from src.models.contact import Contact, birthday_ordinal
+from src.models.user import User
+from src.services import avatar_storage
+
+SIZES = (1_000, 100_000)
+REQUESTS = 200
+CONCURRENCY = 8
+THRESHOLD = 0.2
+SEED_CHUNK = 10_000
+PASSWORD = "benchpassword"
+
+Request = Tuple[str, str, dict]
+
+class Scenario:
+    """
+    One benchmarked route.
+
+    Args:
+        name: Route label in reports and baselines
+        build: ``(index, context) -> (method, url, request kwargs)``
+        expect: Status code of a successful response
+        max_requests: Cap for expensive routes (bcrypt, image processing, export)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        build: Callable[[int, dict], Request],
+        expect: int = 200,
+        max_requests: Optional[int] = None
+    ):
+        self.name = name
+        self.build = build
+        self.expect = expect
+        self.max_requests = max_requests
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 9))).capitalize()
+
+def _contact(rng: random.Random, tag: str) -> dict:
+    birthday = date(1960, 1, 1) + timedelta(days=rng.randrange(40 * 365))
+    return {
+        "first_name": _word(rng),
+        "last_name": _word(rng),
+        "email": f"{tag}.{uuid.uuid4().hex[:12]}@example.com",
+        "phone": f"+380{rng.randrange(10**9):09d}",
+        "birthday": birthday.isoformat(),
+        "additional_data": rng.choice([None, "Colleague", "Family", "Met at a conference"]),
+    }
+
+def _avatar_png() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (640, 480), (30, 120, 200)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+def _scenarios() -> List[Scenario]:
+    def auth(ctx):
+        return {"headers": ctx["headers"]}
+
+    def random_id(ctx):
+        return ctx["rng"].choice(ctx["contact_ids"])
+
+    return [
+        Scenario("POST /auth/register", lambda i, ctx: ("POST", "/auth/register", {"json": {
+            "username": f"bench{uuid.uuid4().hex[:10]}",
+            "email": f"bench.{uuid.uuid4().hex}@example.com",
+            "password": PASSWORD,
+        }}), expect=201, max_requests=20),
+        Scenario("POST /auth/login", lambda i, ctx: ("POST", "/auth/login", {"json": {
+            "email": ctx["email"], "password": PASSWORD
+        }}), max_requests=20),
+        Scenario("GET /auth/me", lambda i, ctx: ("GET", "/auth/me", auth(ctx))),
+        Scenario("POST /auth/verify/{user_id}", lambda i, ctx: (
+            "POST", f"/auth/verify/{ctx['user_id']}", {}
+        )),
+        Scenario("POST /auth/avatar", lambda i, ctx: ("POST", "/auth/avatar", {
+            **auth(ctx), "files": {"file": ("avatar.png", ctx["avatar"], "image/png")}
+        }), max_requests=50),
+
+        Scenario("GET /contacts/ (repeat)", lambda i, ctx: (
+            "GET", "/contacts/?limit=100", auth(ctx)
+        )),
+        Scenario("GET /contacts/ (skip)", lambda i, ctx: (
+            "GET", f"/contacts/?limit=100&skip={ctx['rng'].randrange(ctx['size'])}", auth(ctx)
+        )),
+        Scenario("GET /contacts/ (cursor)", lambda i, ctx: (
+            "GET", "/contacts/", {**auth(ctx), "params": {
+                "limit": 100, "cursor": ctx["rng"].choice(ctx["cursors"])
+            }}
+        )),
+        Scenario("GET /contacts/ (q)", lambda i, ctx: (
+            "GET", "/contacts/", {**auth(ctx), "params": {
+                "q": ctx["rng"].choice(ctx["last_names"])[1:5].lower(), "skip": i
+            }}
+        )),
+        Scenario("GET /contacts/export", lambda i, ctx: (
+            "GET", "/contacts/export?format=ndjson", auth(ctx)
+        ), max_requests=5),
+        Scenario("GET /contacts/birthdays/upcoming", lambda i, ctx: (
+            "GET", f"/contacts/birthdays/upcoming?days={i % 367}", auth(ctx)
+        )),
+        Scenario("GET /contacts/{contact_id}", lambda i, ctx: (
+            "GET", f"/contacts/{random_id(ctx)}", auth(ctx)
+        )),
+
+        Scenario("POST /contacts/", lambda i, ctx: (
+            "POST", "/contacts/", {**auth(ctx), "json": _contact(ctx["rng"], "new")}
+        ), expect=201),
+        Scenario("POST /contacts/import", lambda i, ctx: (
+            "POST", "/contacts/import?format=ndjson", {**auth(ctx), "content": "\n".join(
+                json.dumps(_contact(ctx["rng"], "import")) for _ in range(100)
+            )}
+        ), max_requests=50),
+        Scenario("POST /contacts/batch", lambda i, ctx: (
+            "POST", "/contacts/batch", {**auth(ctx), "json": {"operations": [
+                {"op": "update", "id": random_id(ctx), "contact": _contact(ctx["rng"], "batch")}
+                for _ in range(20)
+            ]}}
+        )),
+        Scenario("PUT /contacts/{contact_id}", lambda i, ctx: (
+            "PUT", f"/contacts/{random_id(ctx)}",
+            {**auth(ctx), "json": _contact(ctx["rng"], "put")}
+        )),
+        Scenario("DELETE /contacts/{contact_id}", lambda i, ctx: (
+            "DELETE", f"/contacts/{ctx['contact_ids'].pop()}", auth(ctx)
+        )),
+    ]
+
+def _percentile(latencies: List[float], q: int) -> float:
+    if len(latencies) == 1:
+        return latencies[0]
+    return statistics.quantiles(latencies, n=100, method="inclusive")[q - 1]
+
+async def _run_scenario(
+    client: httpx.AsyncClient, scenario: Scenario, ctx: dict, requests: int, concurrency: int
+) -> dict:
+    total = min(requests, scenario.max_requests or requests)
+    latencies: List[float] = []
+    errors = 0
+    indices = itertools.count()
+
+    async def worker():
+        nonlocal errors
+        while (index := next(indices)) < total:
+            method, url, kwargs = scenario.build(index, ctx)
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != scenario.expect:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, total))))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": total,
+        "errors": errors,
+        "throughput": round(total / elapsed, 2),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 3),
+    }
+
+async def _seed(session_factory, size: int) -> dict:
+    rng = random.Random(size)
+    async with session_factory() as session:
+        user = User(
+            username="bench",
+            email="bench@example.com",
+            hashed_password=get_password_hash(PASSWORD),
+            is_verified=True
+        )
+        session.add(user)
+        await session.commit()
+        last_names = []
+        for offset in range(0, size, SEED_CHUNK):
+            rows = []
+            for _ in range(min(SEED_CHUNK, size - offset)):
+                row = _contact(rng, "seed")
+                row["birthday"] = date.fromisoformat(row["birthday"])
+                row["birthday_md"] = birthday_ordinal(row["birthday"])
+                row["user_id"] = user.id
+                rows.append(row)
+                last_names.append(row["last_name"])
+            await session.execute(insert(Contact.__table__), rows)
+            await session.commit()
+    return {
+        "rng": rng,
+        "size": size,
+        "user_id": user.id,
+        "email": user.email,
+        "contact_ids": list(range(1, size + 1)),
+        "last_names": last_names,
+        "avatar": _avatar_png(),
+    }
+
+async def run_size(size: int, requests: int, concurrency: int) -> Dict[str, dict]:
+    """Benchmark every scenario against a fresh database of ``size`` contacts."""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(
+            bind=engine, autoflush=False, expire_on_commit=False
+        )
+
+        async def override_get_db():
+            async with session_factory() as session:
+                yield session
+
+        app.dependency_overrides[get_db] = override_get_db
+        avatar_storage._storage = avatar_storage.LocalStorage(
+            os.path.join(tmp, "avatars"), "/media/avatars"
+        )
+        try:
+            ctx = await _seed(session_factory, size)
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                response = await client.post(
+                    "/auth/login", json={"email": ctx["email"], "password": PASSWORD}
+                )
+                ctx["headers"] = {"Authorization": f"Bearer {response.json()['access_token']}"}
+                ctx["cursors"] = []
+                for skip in range(0, size, max(size // 20, 1)):
+                    page = await client.get(
+                        f"/contacts/?limit=1&skip={skip}", headers=ctx["headers"]
+                    )
+                    ctx["cursors"].append(page.headers["X-Next-Cursor"])
+
+                results = {}
+                for scenario in _scenarios():
+                    results[scenario.name] = await _run_scenario(
+                        client, scenario, ctx, requests, concurrency
+                    )
+                    print(_format_row(scenario.name, results[scenario.name]), flush=True)
+        finally:
+            app.dependency_overrides.pop(get_db, None)
+            avatar_storage._storage = None
+            await engine.dispose()
+    return results
+
+def _format_row(name: str, result: dict) -> str:
+    errors = f"  {result['errors']} errors" if result["errors"] else ""
+    return (
+        f"  {name:34} {result['throughput']:>9.1f} req/s  p50 {result['p50_ms']:>8.2f}  "
+        f"p95 {result['p95_ms']:>8.2f}  p99 {result['p99_ms']:>8.2f} ms{errors}"
+    )
+
+async def run(sizes=SIZES, requests: int = REQUESTS, concurrency: int = CONCURRENCY) -> dict:
+    """
+    Run the benchmark offline.
+
+    Redis is replaced by fakeredis and the auth rate limits are lifted for
+    the duration of the run; both are restored afterwards.
+
+    Returns:
+        Baseline document with run metadata and results per size and route
+    """
+    saved_redis = cache.redis_client, cache.async_redis_client
+    saved_limits = {key: limiter.limit for key, limiter in rate_limit.limiters.items()}
+    server = fakeredis.FakeServer()
+    cache.redis_client = fakeredis.FakeRedis(server=server)
+    cache.async_redis_client = fakeredis.FakeAsyncRedis(server=server)
+    for limiter in rate_limit.limiters.values():
+        limiter.limit = sys.maxsize
+    try:
+        results = {}
+        for size in sizes:
+            cache.local_cache.clear()
+            token_cache.clear()
+            cache.redis_client.flushall()
+            print(f"{size} contacts, {requests} requests per route, concurrency {concurrency}")
+            results[str(size)] = await run_size(size, requests, concurrency)
+    finally:
+        cache.redis_client, cache.async_redis_client = saved_redis
+        for key, limit in saved_limits.items():
+            rate_limit.limiters[key].limit = limit
+    return {
+        "meta": {
+            "requests": requests,
+            "concurrency": concurrency,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+        },
+        "results": results,
+    }
+
+def compare(baseline: dict, current: dict, threshold: float = THRESHOLD) -> List[str]:
+    """
+    Find routes that got slower than the baseline.
+
+    Returns:
+        One line per regression: p95 latency up, or throughput down, by
+        more than ``threshold``
+    """
+    regressions = []
+    for size, routes in current["results"].items():
+        for name, result in routes.items():
+            base = baseline["results"].get(size, {}).get(name)
+            if base is None:
+                continue
+            if result["p95_ms"] > base["p95_ms"] * (1 + threshold):
+                regressions.append(
+                    f"{size}/{name}: p95 {base['p95_ms']:.2f} -> {result['p95_ms']:.2f} ms"
+                )
+            if result["throughput"] < base["throughput"] * (1 - threshold):
+                regressions.append(
+                    f"{size}/{name}: throughput {base['throughput']:.1f} -> "
+                    f"{result['throughput']:.1f} req/s"
+                )
+    return regressions
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)),
+                        help="comma-separated contact counts")
+    parser.add_argument("--requests", type=int, default=REQUESTS, help="requests per route")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--save", help="write results as a JSON baseline")
+    parser.add_argument("--compare", help="baseline to check for regressions")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    current = asyncio.run(run(sizes, args.requests, args.concurrency))
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"baseline written to {args.save}")
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), current, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print("no regressions")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Metrics overhead benchmark.
+
+Drives a minimal ASGI app directly, with and without ``MetricsMiddleware``,
+and times ``timed_redis`` around a no-op, to show the per-request cost of
+instrumentation. Run with::
+
+    python -m tests.bench.bench_metrics
+"""
+import asyncio
+import time
+from types import SimpleNamespace
+
+from src.core import metrics
+from src.core.metrics import MetricsMiddleware
+
+REPEAT = 100_000
+
+SCOPE = {"type": "http", "method": "GET", "path": "/contacts/1"}
+ROUTE = SimpleNamespace(path="/contacts/{contact_id}")
+
+async def app(scope, receive, send):
+    scope["route"] = ROUTE
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+async def send(message):
+    pass
+
+async def _timeit(handler) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        await handler(dict(SCOPE), receive, send)
+    return (time.perf_counter() - start) / REPEAT * 1e6
+
+def _time_redis_timer() -> float:
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        with metrics.timed_redis("bench"):
+            pass
+    return (time.perf_counter() - start) / REPEAT * 1e6
+
+def main() -> None:
+    bare = asyncio.run(_timeit(app))
+    metered = asyncio.run(_timeit(MetricsMiddleware(app)))
+    print(f"mean of {REPEAT} requests")
+    print(f"  bare app:          {bare:6.2f} us")
+    print(f"  with middleware:   {metered:6.2f} us  (+{metered - bare:.2f} us)")
+    print(f"  timed_redis block: {_time_redis_timer():6.2f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Contact search benchmark.
+
+Seeds one user with growing numbers of contacts in a temporary SQLite
+database and compares the indexed ``q`` search against the ``ilike`` scan
+of the per-field filters. Run with::
+
+    python -m tests.bench.bench_search
+"""
+import asyncio
+import os
+import random
+import string
+import tempfile
+import time
+from datetime import date
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.core.database import Base
+from src.crud.contact import get_user_contacts
+from src.crud.search import search_user_contacts
+from src.models.contact import Contact
+from src.models.user import User
+
+SIZES = (1_000, 10_000, 100_000)
+REPEAT = 50
+NEEDLE = "Zyxwvut"
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choices(string.ascii_lowercase, k=8)).capitalize()
+
+async def _seed(session, count: int) -> None:
+    rng = random.Random(count)
+    session.add(User(id=1, username="bench", email="bench@example.com", hashed_password="x"))
+    await session.flush()
+    rows = []
+    for i in range(count):
+        first_name = NEEDLE if i % (count // 10) == 0 else _word(rng)
+        rows.append({
+            "first_name": first_name,
+            "last_name": _word(rng),
+            "email": f"{_word(rng).lower()}{i}@example.com",
+            "phone": "+380000000000",
+            "birthday": date(1990, 1, 1),
+            "birthday_md": 101,
+            "user_id": 1,
+        })
+    await session.execute(insert(Contact), rows)
+    await session.commit()
+
+async def _time(call) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        await call()
+    return (time.perf_counter() - start) / REPEAT * 1000
+
+async def run_size(count: int) -> tuple:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+        async with session_factory() as session:
+            await _seed(session, count)
+            search_ms = await _time(
+                lambda: search_user_contacts(session, user_id=1, q=NEEDLE.lower())
+            )
+            scan_ms = await _time(
+                lambda: get_user_contacts(session, user_id=1, first_name=NEEDLE.lower())
+            )
+        await engine.dispose()
+    return search_ms, scan_ms
+
+async def main() -> None:
+    print(f"{'contacts':>10} {'q search, ms':>14} {'ilike scan, ms':>16}")
+    for count in SIZES:
+        search_ms, scan_ms = await run_size(count)
+        print(f"{count:>10} {search_ms:>14.3f} {scan_ms:>16.3f}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+"""
+Contact list serialization benchmark.
+
+Encodes a 100-row page the way ``response_model=List[ContactResponse]``
+does (Pydantic validation, ``jsonable_encoder``, stdlib ``json``) and with
+the orjson fast path, from ORM objects and from ``EXPORT_COLUMNS`` rows.
+Run with::
+
+    python -m tests.bench.bench_serialization
+"""
+import json
+import time
+from datetime import date
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import Row
+from sqlalchemy.engine.result import SimpleResultMetaData
+
+from src.crud.contact import EXPORT_COLUMNS
+from src.models.contact import Contact
+from src.schemas.contact import ContactResponse
+from src.services.contact_cache import serialize_contacts
+
+PAGE_SIZE = 100
+REPEAT = 2000
+
+_adapter = TypeAdapter(List[ContactResponse])
+
+def response_model_path(contacts) -> bytes:
+    content = jsonable_encoder(_adapter.validate_python(contacts, from_attributes=True))
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode()
+
+def _contacts() -> List[Contact]:
+    return [
+        Contact(
+            id=i,
+            first_name=f"First{i}",
+            last_name=f"Last{i}",
+            email=f"contact{i}@example.com",
+            phone="+380501234567",
+            birthday=date(1990, 1 + i % 12, 1 + i % 28),
+            additional_data="note" if i % 2 else None,
+        )
+        for i in range(PAGE_SIZE)
+    ]
+
+def _rows(contacts) -> List[Row]:
+    keys = [column.key for column in EXPORT_COLUMNS]
+    metadata = SimpleResultMetaData(keys)
+    return [
+        Row(metadata, None, metadata._key_to_index, tuple(getattr(c, key) for key in keys))
+        for c in contacts
+    ]
+
+def _timeit(func, data) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        func(data)
+    return (time.perf_counter() - start) / REPEAT * 1e6
+
+def main() -> None:
+    contacts = _contacts()
+    rows = _rows(contacts)
+    assert serialize_contacts(contacts) == serialize_contacts(rows) == response_model_path(contacts)
+
+    baseline = _timeit(response_model_path, contacts)
+    print(f"{PAGE_SIZE}-row page, mean of {REPEAT} runs")
+    print(f"  response_model + json:  {baseline:8.1f} us")
+    for label, data in (("orjson from ORM objects", contacts), ("orjson from rows", rows)):
+        elapsed = _timeit(serialize_contacts, data)
+        print(f"  {label + ':':24}{elapsed:8.1f} us  ({baseline / elapsed:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Access token verification benchmark.
+
+Compares a full decode with each installed JWT backend against a hit in
+the verified-token cache. Run with::
+
+    python -m tests.bench.bench_tokens
+"""
+import time
+
+from src.core import auth
+from src.core.config import settings
+
+REPEAT = 20_000
+
+def _timeit(func, *args) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        func(*args)
+    return (time.perf_counter() - start) / REPEAT * 1e6
+
+def main() -> None:
+    token = auth.create_access_token({"sub": "bench@example.com", "uid": 1})
+    print(f"mean of {REPEAT} verifications")
+    for name in auth.JWT_BACKENDS:
+        try:
+            _, decode, _ = auth.load_jwt_backend(name)
+        except ImportError:
+            print(f"  {name + ':':14}not installed")
+            continue
+        elapsed = _timeit(decode, token, settings.SECRET_KEY, [settings.ALGORITHM])
+        print(f"  {name + ':':14}{elapsed:8.2f} us")
+
+    auth.token_cache.clear()
+    auth.decode_access_token(token)
+    print(f"  {'cache hit:':14}{_timeit(auth.decode_access_token, token):8.2f} us")
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,149 @@
+import asyncio
+import inspect
+from contextlib import contextmanager
+
+import fakeredis
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from redis.exceptions import ConnectionError as RedisConnectionError
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
 
+from src.core import auth, cache, metrics, warmup
 from src.core.database import get_db, Base
 from src.main import app
 from src.models.user import User
 from src.models.contact import Contact
+from tests.query_budgets import ROUTE_BUDGETS, budget_key
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
+engine = create_async_engine(SQLALCHEMY_DATABASE_URL, poolclass=NullPool)
+TestingSessionLocal = async_sessionmaker(
+    bind=engine, autoflush=False, expire_on_commit=False
 )
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+metrics.instrument_engine(engine)
+
+async def _create_schema():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+async def _drop_schema():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+
+@pytest.fixture(autouse=True)
+def fake_redis(monkeypatch):
+    """Replace both Redis clients with in-memory fakes of one server and reset process caches."""
+    server = fakeredis.FakeServer()
+    client = fakeredis.FakeRedis(server=server)
+    monkeypatch.setattr(cache, "redis_client", client)
+    monkeypatch.setattr(cache, "async_redis_client", fakeredis.FakeAsyncRedis(server=server))
+    cache.local_cache.clear()
+    monkeypatch.setattr(cache, "_unbumped_contacts", set())
+    cache.reset_cache_stats()
+    auth.token_cache.clear()
+    return client
+
+@pytest.fixture
+def redis_down(monkeypatch):
+    """Make async Redis client methods raise ConnectionError; returns a setter taking method names."""
+    def set_down(*methods):
+        for name in methods:
+            if inspect.iscoroutinefunction(getattr(cache.async_redis_client, name)):
+                async def unavailable(*args, **kwargs):
+                    raise RedisConnectionError("down")
+            else:
+                def unavailable(*args, **kwargs):
+                    raise RedisConnectionError("down")
+            monkeypatch.setattr(cache.async_redis_client, name, unavailable)
+
+    return set_down
+
+async def _skip_step():
+    pass
+
+@pytest.fixture(autouse=True)
+def skip_warmup(monkeypatch):
+    """Turn warm-up steps into no-ops so startup does not probe the real database and Redis."""
+    monkeypatch.setattr(warmup, "STEPS", [(name, _skip_step) for name, _ in warmup.STEPS])
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "query_budget(route, limit): raise a route's SQL budget for one test"
+    )
+
+# Observers run inside the app: AssertionError reaches the test through the
+# test client, pytest.fail's BaseException would tear down its event loop
+def _over_budget(key: str, limit: int, counter) -> str:
+    statements = "\n".join(f"  {statement}" for statement in counter.statements)
+    return f"{key} ran {counter.count} SQL statements, budget is {limit}:\n{statements}"
+
+@pytest.fixture(autouse=True)
+def enforce_query_budgets(request):
+    """Fail any request that runs more SQL statements than its route budget."""
+    budgets = dict(ROUTE_BUDGETS)
+    for marker in request.node.iter_markers("query_budget"):
+        budgets[marker.args[0]] = marker.args[1]
+
+    def check(method, route, status, counter):
+        key = budget_key(method, route)
+        if key not in budgets:
+            raise AssertionError(f"No SQL budget declared for {key} in tests/query_budgets.py")
+        if counter.count > budgets[key]:
+            raise AssertionError(_over_budget(key, budgets[key], counter))
+
+    metrics.request_observers.append(check)
+    yield
+    metrics.request_observers.remove(check)
+
+@pytest.fixture
+def sql_budget():
+    """Context manager failing when requests inside it exceed ``limit`` statements each."""
+    @contextmanager
+    def budget(limit: int):
+        def check(method, route, status, counter):
+            if counter.count > limit:
+                raise AssertionError(_over_budget(budget_key(method, route), limit, counter))
+
+        metrics.request_observers.append(check)
+        try:
+            yield
+        finally:
+            metrics.request_observers.remove(check)
+
+    return budget
+
+@pytest.fixture
+def query_counter():
+    """Collect SQL statements executed against the test engine."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
 
 @pytest.fixture(scope="function")
 def db_session():
     """Create test database session."""
-    Base.metadata.create_all(bind=engine)
+    asyncio.run(_create_schema())
     session = TestingSessionLocal()
     try:
         yield session
     finally:
-        session.close()
-        Base.metadata.drop_all(bind=engine)
+        asyncio.run(session.close())
+        asyncio.run(_drop_schema())
 
 @pytest.fixture(scope="function")
 def client(db_session):
     """Create test client with test database."""
-    def override_get_db():
-        try:
-            yield db_session
-        finally:
-            pass
+    async def override_get_db():
+        async with TestingSessionLocal() as session:
+            yield session
 
     app.dependency_overrides[get_db] = override_get_db
     with TestClient(app) as test_client:
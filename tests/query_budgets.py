@@ -0,0 +1,37 @@
+"""
+SQL statement budgets per route.
+
+Every request made through the test client is checked against the budget
+of its route; a request over budget fails the test at the offending call.
+Budgets are worst cases for a user that is not in the cache yet (one
+``SELECT users``); warm paths are pinned tighter with the ``sql_budget``
+fixture. Raise a budget for a single test with
+``@pytest.mark.query_budget("METHOD /route", n)``.
+"""
+
+ROUTE_BUDGETS = {
+    "GET /": 0,
+    "GET /metrics": 0,
+    "GET /ready": 0,
+    # Docs, static files and requests refused before routing
+    "<unmatched>": 0,
+
+    "POST /auth/register": 3,  # email check, INSERT, refresh
+    "POST /auth/login": 2,  # user, rehash UPDATE
+    "GET /auth/me": 1,
+    "POST /auth/verify/{user_id}": 2,
+    "POST /auth/avatar": 4,  # user, user by id, UPDATE, refresh
+
+    "POST /contacts/": 3,  # user, INSERT, refresh
+    "POST /contacts/import": 3,  # user, existing emails, INSERT (per batch)
+    "POST /contacts/batch": 5,  # user, ownership, INSERT, UPDATE, DELETE
+    "GET /contacts/": 2,
+    "GET /contacts/export": 2,
+    "GET /contacts/birthdays/upcoming": 2,
+    "GET /contacts/{contact_id}": 2,
+    "PUT /contacts/{contact_id}": 4,  # user, contact, UPDATE, refresh
+    "DELETE /contacts/{contact_id}": 3,  # user, contact, DELETE
+}
+
+def budget_key(method: str, route: str) -> str:
+    return route if route == "<unmatched>" else f"{method} {route}"
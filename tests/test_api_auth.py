@@ -43,6 +43,29 @@ class TestAuthAPI:
         assert "access_token" in data
         assert data["token_type"] == "bearer"
 
+    def test_login_rehashes_outdated_password(self, client, db_session, test_user_data, monkeypatch):
+        """Test that login upgrades a hash made with another bcrypt cost."""
+        import asyncio
+        from passlib.context import CryptContext
+        from src.core import auth
+        from src.crud.user import get_user_by_email
+
+        default_context = auth.pwd_context
+        monkeypatch.setattr(auth, "pwd_context", CryptContext(schemes=["bcrypt"], bcrypt__rounds=4))
+        client.post("/auth/register", json=test_user_data)
+        monkeypatch.setattr(auth, "pwd_context", default_context)
+        
+        login_data = {
+            "email": test_user_data["email"],
+            "password": test_user_data["password"]
+        }
+        response = client.post("/auth/login", json=login_data)
+        
+        assert response.status_code == status.HTTP_200_OK
+        user = asyncio.run(get_user_by_email(db_session, test_user_data["email"]))
+        assert not user.hashed_password.startswith("$2b$04$")
+        assert client.post("/auth/login", json=login_data).status_code == status.HTTP_200_OK
+
     def test_login_wrong_password(self, client, test_user_data):
         """Test login with wrong password."""
         # Register user first
@@ -77,6 +100,27 @@ class TestAuthAPI:
         assert "email" in data
         assert "id" in data
 
+    def test_get_current_user_cache_hit_skips_db(self, client, authenticated_user, query_counter):
+        """Test that a warm user cache answers without SQL queries."""
+        client.get("/auth/me", headers=authenticated_user["headers"])
+        query_counter.clear()
+        
+        response = client.get("/auth/me", headers=authenticated_user["headers"])
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["email"] == "test@example.com"
+        assert query_counter == []
+
+    def test_get_current_user_after_verify_refreshes_cache(self, client, authenticated_user):
+        """Test that verifying email invalidates the cached user."""
+        me = client.get("/auth/me", headers=authenticated_user["headers"]).json()
+        assert me["is_verified"] is False
+        
+        client.post(f"/auth/verify/{me['id']}")
+        response = client.get("/auth/me", headers=authenticated_user["headers"])
+        
+        assert response.json()["is_verified"] is True
+
     def test_get_current_user_no_token(self, client):
         """Test getting current user without token."""
         response = client.get("/auth/me")
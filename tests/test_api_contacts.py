@@ -0,0 +1,728 @@
+import pytest
+from fastapi import status
+
+class TestContactsAPI:
+    """Test contacts API endpoints."""
+
+    def test_create_contact(self, client, authenticated_user, test_contact_data):
+        """Test contact creation."""
+        response = client.post(
+            "/contacts/", json=test_contact_data, headers=authenticated_user["headers"]
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        data = response.json()
+        assert data["email"] == test_contact_data["email"]
+        assert "id" in data
+
+    def test_get_contact_not_found(self, client, authenticated_user):
+        """Test getting non-existent contact."""
+        response = client.get("/contacts/999", headers=authenticated_user["headers"])
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_update_and_delete_contact(self, client, authenticated_user, test_contact_data):
+        """Test contact update followed by deletion."""
+        headers = authenticated_user["headers"]
+        contact_id = client.post("/contacts/", json=test_contact_data, headers=headers).json()["id"]
+
+        updated = dict(test_contact_data, first_name="Jane")
+        response = client.put(f"/contacts/{contact_id}", json=updated, headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["first_name"] == "Jane"
+
+        response = client.delete(f"/contacts/{contact_id}", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert client.get(f"/contacts/{contact_id}", headers=headers).status_code == 404
+
+class TestContactsPagination:
+    """Test keyset pagination of the contact list."""
+
+    @pytest.fixture
+    def contacts(self, client, authenticated_user, test_contact_data):
+        """Create five contacts sharing some last names."""
+        last_names = ["Smith", "Adams", "Smith", "Brown", "Adams"]
+        for i, last_name in enumerate(last_names):
+            data = dict(
+                test_contact_data, last_name=last_name, email=f"contact{i}@example.com"
+            )
+            client.post("/contacts/", json=data, headers=authenticated_user["headers"])
+        return last_names
+
+    def test_cursor_walks_all_pages(self, client, authenticated_user, contacts):
+        """Test that following next cursors returns every contact once in order."""
+        headers = authenticated_user["headers"]
+        seen = []
+        response = client.get("/contacts/?limit=2", headers=headers)
+        while True:
+            assert response.status_code == status.HTTP_200_OK
+            seen.extend(response.json())
+            next_cursor = response.headers.get("X-Next-Cursor")
+            if next_cursor is None:
+                break
+            assert "rel=\"next\"" in response.headers["Link"]
+            response = client.get(f"/contacts/?limit=2&cursor={next_cursor}", headers=headers)
+
+        assert len(seen) == 5
+        assert len({c["id"] for c in seen}) == 5
+        keys = [(c["last_name"], c["id"]) for c in seen]
+        assert keys == sorted(keys)
+
+    def test_skip_still_supported(self, client, authenticated_user, contacts):
+        """Test that offset pagination keeps working."""
+        headers = authenticated_user["headers"]
+        all_contacts = client.get("/contacts/", headers=headers).json()
+
+        response = client.get("/contacts/?skip=3&limit=2", headers=headers)
+
+        assert response.json() == all_contacts[3:5]
+
+    def test_invalid_cursor(self, client, authenticated_user):
+        """Test that a malformed cursor is rejected."""
+        response = client.get("/contacts/?cursor=not-a-cursor", headers=authenticated_user["headers"])
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+class TestContactsSearch:
+    """Test full-text search over contact fields."""
+
+    @pytest.fixture
+    def contacts(self, client, authenticated_user, test_contact_data):
+        """Create contacts with distinct names and emails."""
+        people = [
+            ("Johnny", "Walker", "walker@example.com"),
+            ("Anna", "Johnson", "anna@example.com"),
+            ("Peter", "Parker", "spidey@john.org"),
+            ("Mary", "Jane", "mj@example.com"),
+        ]
+        for first_name, last_name, email in people:
+            data = dict(
+                test_contact_data, first_name=first_name, last_name=last_name, email=email
+            )
+            client.post("/contacts/", json=data, headers=authenticated_user["headers"])
+
+    def test_q_matches_any_field(self, client, authenticated_user, contacts):
+        """Test that q finds substrings in names and emails case-insensitively."""
+        response = client.get("/contacts/?q=JOHN", headers=authenticated_user["headers"])
+
+        assert response.status_code == status.HTTP_200_OK
+        names = {c["first_name"] for c in response.json()}
+        assert names == {"Johnny", "Anna", "Peter"}
+
+    def test_q_short_query(self, client, authenticated_user, contacts):
+        """Test that queries shorter than a trigram still match."""
+        response = client.get("/contacts/?q=mj", headers=authenticated_user["headers"])
+
+        assert [c["first_name"] for c in response.json()] == ["Mary"]
+
+    def test_q_tracks_updates(self, client, authenticated_user, contacts, test_contact_data):
+        """Test that the search index follows contact updates and deletes."""
+        headers = authenticated_user["headers"]
+        contact = client.get("/contacts/?q=Parker", headers=headers).json()[0]
+
+        updated = dict(test_contact_data, first_name="Bruce", last_name="Wayne")
+        client.put(f"/contacts/{contact['id']}", json=updated, headers=headers)
+        assert client.get("/contacts/?q=Parker", headers=headers).json() == []
+        assert len(client.get("/contacts/?q=Wayne", headers=headers).json()) == 1
+
+        client.delete(f"/contacts/{contact['id']}", headers=headers)
+        assert client.get("/contacts/?q=Wayne", headers=headers).json() == []
+
+    def test_q_with_cursor_rejected(self, client, authenticated_user):
+        """Test that relevance search cannot be keyset paginated."""
+        response = client.get("/contacts/?q=john&cursor=abc", headers=authenticated_user["headers"])
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+class TestUpcomingBirthdays:
+    """Test upcoming birthdays endpoint."""
+
+    @pytest.fixture
+    def today(self, monkeypatch):
+        """Freeze today's date used by the birthday query."""
+        from datetime import date
+        from src.crud import contact as crud_contact
+
+        frozen = {"value": date(2025, 12, 29)}
+
+        class FrozenDate(date):
+            @classmethod
+            def today(cls):
+                return frozen["value"]
+
+        monkeypatch.setattr(crud_contact, "date", FrozenDate)
+        return frozen
+
+    def _create(self, client, headers, data, birthday, email):
+        client.post(
+            "/contacts/", json=dict(data, birthday=birthday, email=email), headers=headers
+        )
+
+    def test_ignores_birth_year_and_wraps_year(
+        self, client, authenticated_user, test_contact_data, today
+    ):
+        """Test that birthdays across New Year are returned in calendar order."""
+        headers = authenticated_user["headers"]
+        self._create(client, headers, test_contact_data, "1985-01-02", "jan@example.com")
+        self._create(client, headers, test_contact_data, "1990-12-30", "dec@example.com")
+        self._create(client, headers, test_contact_data, "2000-01-10", "late@example.com")
+        self._create(client, headers, test_contact_data, "1970-12-01", "past@example.com")
+
+        response = client.get("/contacts/birthdays/upcoming", headers=headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        emails = [c["email"] for c in response.json()]
+        assert emails == ["dec@example.com", "jan@example.com"]
+
+    def test_days_parameter(self, client, authenticated_user, test_contact_data, today):
+        """Test custom window size."""
+        from datetime import date
+
+        today["value"] = date(2025, 6, 1)
+        headers = authenticated_user["headers"]
+        self._create(client, headers, test_contact_data, "1990-06-05", "soon@example.com")
+        self._create(client, headers, test_contact_data, "1990-06-20", "later@example.com")
+
+        short = client.get("/contacts/birthdays/upcoming?days=7", headers=headers).json()
+        long = client.get("/contacts/birthdays/upcoming?days=30", headers=headers).json()
+
+        assert [c["email"] for c in short] == ["soon@example.com"]
+        assert [c["email"] for c in long] == ["soon@example.com", "later@example.com"]
+
+    def test_update_moves_birthday(
+        self, client, authenticated_user, test_contact_data, today
+    ):
+        """Test that updating the birthday refreshes the stored ordinal."""
+        headers = authenticated_user["headers"]
+        self._create(client, headers, test_contact_data, "1990-05-05", "c@example.com")
+        contact = client.get("/contacts/", headers=headers).json()[0]
+
+        updated = dict(test_contact_data, birthday="1990-12-31", email="c@example.com")
+        client.put(f"/contacts/{contact['id']}", json=updated, headers=headers)
+
+        response = client.get("/contacts/birthdays/upcoming", headers=headers)
+        assert [c["id"] for c in response.json()] == [contact["id"]]
+
+class TestContactsImport:
+    """Test bulk contact import."""
+
+    def test_import_ndjson_reports_bad_rows(self, client, authenticated_user, test_contact_data):
+        """Test that valid rows are saved and invalid ones reported by row number."""
+        import json
+
+        lines = [
+            json.dumps(dict(test_contact_data, email="a@example.com")),
+            json.dumps(dict(test_contact_data, email="not-an-email")),
+            "{broken",
+            "",
+            json.dumps(dict(test_contact_data, email="b@example.com")),
+        ]
+        response = client.post(
+            "/contacts/import",
+            content="\n".join(lines),
+            headers={**authenticated_user["headers"], "Content-Type": "application/x-ndjson"},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        report = response.json()
+        assert report["created"] == 2
+        assert report["failed"] == 2
+        assert [e["row"] for e in report["errors"]] == [2, 3]
+        assert report["errors"][0]["errors"][0].startswith("email")
+
+        contacts = client.get("/contacts/", headers=authenticated_user["headers"]).json()
+        assert {c["email"] for c in contacts} == {"a@example.com", "b@example.com"}
+
+    def test_import_csv_with_multiline_value(self, client, authenticated_user):
+        """Test CSV upload with a quoted value spanning lines."""
+        body = (
+            "first_name,last_name,email,phone,birthday,additional_data\r\n"
+            'Ann,Lee,ann@example.com,+1,1991-02-03,"line one\r\nline, two"\r\n'
+            "Bob,Ray,bob@example.com,+2,1992-03-04,\r\n"
+        )
+        response = client.post(
+            "/contacts/import?format=csv",
+            content=body.encode(),
+            headers=authenticated_user["headers"],
+        )
+
+        assert response.json()["created"] == 2
+        contacts = client.get("/contacts/?q=ann", headers=authenticated_user["headers"]).json()
+        assert contacts[0]["additional_data"] == "line one\nline, two"
+        bob = client.get("/contacts/?q=bob", headers=authenticated_user["headers"]).json()[0]
+        assert bob["additional_data"] is None
+
+    def test_import_csv_with_stray_quote(self, client, authenticated_user):
+        """Test that a quote inside an unquoted value does not swallow later rows."""
+        rows = ['John,O"Neil,john@example.com,+1,1990-01-02,']
+        rows += [f"User,{i},user{i}@example.com,+1,1990-01-02," for i in range(50)]
+        body = "first_name,last_name,email,phone,birthday,additional_data\n" + "\n".join(rows)
+
+        response = client.post(
+            "/contacts/import?format=csv",
+            content=body.encode(),
+            headers=authenticated_user["headers"],
+        )
+
+        assert response.json()["created"] == 51
+        john = client.get("/contacts/?q=john", headers=authenticated_user["headers"]).json()[0]
+        assert john["last_name"] == 'O"Neil'
+
+    def test_import_csv_unterminated_quote_is_bounded(self, client, authenticated_user, monkeypatch):
+        """Test that an unclosed quoted value fails its row instead of the whole upload."""
+        from src.services import contact_import
+
+        monkeypatch.setattr(contact_import, "MAX_RECORD_SIZE", 200)
+        rows = ['Ann,Lee,ann@example.com,+1,1991-02-03,"never closed']
+        rows += [f"User,{i},user{i}@example.com,+1,1990-01-02," for i in range(20)]
+        body = "first_name,last_name,email,phone,birthday,additional_data\n" + "\n".join(rows)
+
+        response = client.post(
+            "/contacts/import?format=csv",
+            content=body.encode(),
+            headers=authenticated_user["headers"],
+        )
+
+        report = response.json()
+        assert report["errors"][0]["errors"][0].startswith("quoted value longer")
+        assert report["failed"] == 1
+        assert report["created"] > 10
+
+    def test_import_skip_existing(self, client, authenticated_user, test_contact_data):
+        """Test dedupe against existing contacts and within the upload."""
+        import json
+
+        headers = authenticated_user["headers"]
+        client.post("/contacts/", json=test_contact_data, headers=headers)
+        lines = [
+            json.dumps(test_contact_data),
+            json.dumps(dict(test_contact_data, email="new@example.com")),
+            json.dumps(dict(test_contact_data, email="new@example.com")),
+        ]
+
+        response = client.post(
+            "/contacts/import?format=ndjson&skip_existing=true",
+            content="\n".join(lines),
+            headers=headers,
+        )
+
+        assert response.json()["created"] == 1
+        assert response.json()["skipped"] == 2
+        assert len(client.get("/contacts/", headers=headers).json()) == 2
+
+    def test_import_unknown_format(self, client, authenticated_user):
+        """Test that a body without a known format is rejected."""
+        response = client.post(
+            "/contacts/import",
+            content=b"whatever",
+            headers={**authenticated_user["headers"], "Content-Type": "text/plain"},
+        )
+
+        assert response.status_code == status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+
+class TestContactsExport:
+    """Test streaming contact export."""
+
+    @pytest.fixture
+    def contacts(self, client, authenticated_user, test_contact_data):
+        """Create three contacts."""
+        for i in range(3):
+            data = dict(test_contact_data, email=f"c{i}@example.com", additional_data=f"note, {i}")
+            client.post("/contacts/", json=data, headers=authenticated_user["headers"])
+
+    def test_export_ndjson(self, client, authenticated_user, contacts):
+        """Test NDJSON export contains every contact."""
+        import json
+
+        response = client.get("/contacts/export", headers=authenticated_user["headers"])
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert [r["email"] for r in records] == ["c0@example.com", "c1@example.com", "c2@example.com"]
+        assert records[0]["birthday"] == "1990-01-01"
+
+    def test_export_csv_round_trips_through_import(self, client, authenticated_user, contacts):
+        """Test that a CSV export can be imported back."""
+        headers = authenticated_user["headers"]
+        response = client.get("/contacts/export?format=csv", headers=headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert 'filename="contacts.csv"' in response.headers["content-disposition"]
+        lines = response.text.splitlines()
+        assert lines[0] == "id,first_name,last_name,email,phone,birthday,additional_data"
+        assert len(lines) == 4
+
+        report = client.post(
+            "/contacts/import?format=csv&skip_existing=true",
+            content=response.content,
+            headers=headers,
+        ).json()
+        assert report == {"created": 0, "skipped": 3, "failed": 0, "errors": []}
+
+class TestConditionalGet:
+    """Test ETag / If-None-Match on contact reads."""
+
+    def test_not_modified_without_queries(
+        self, client, authenticated_user, test_contact_data, query_counter
+    ):
+        """Test that a matching If-None-Match returns 304 with zero SQL."""
+        headers = authenticated_user["headers"]
+        client.post("/contacts/", json=test_contact_data, headers=headers)
+        response = client.get("/contacts/", headers=headers)
+        etag = response.headers["ETag"]
+        query_counter.clear()
+
+        response = client.get("/contacts/", headers={**headers, "If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.headers["ETag"] == etag
+        assert response.content == b""
+        assert query_counter == []
+
+    def test_write_changes_etag(self, client, authenticated_user, test_contact_data):
+        """Test that create, update and delete invalidate the ETag."""
+        headers = authenticated_user["headers"]
+        etags = [client.get("/contacts/", headers=headers).headers["ETag"]]
+
+        contact_id = client.post("/contacts/", json=test_contact_data, headers=headers).json()["id"]
+        etags.append(client.get("/contacts/", headers=headers).headers["ETag"])
+        client.put(
+            f"/contacts/{contact_id}", json=dict(test_contact_data, first_name="X"), headers=headers
+        )
+        etags.append(client.get("/contacts/", headers=headers).headers["ETag"])
+        client.delete(f"/contacts/{contact_id}", headers=headers)
+        etags.append(client.get("/contacts/", headers=headers).headers["ETag"])
+
+        assert len(set(etags)) == 4
+        response = client.get("/contacts/", headers={**headers, "If-None-Match": etags[0]})
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_etag_depends_on_resource(self, client, authenticated_user, test_contact_data):
+        """Test that different queries and contacts get different ETags."""
+        headers = authenticated_user["headers"]
+        contact_id = client.post("/contacts/", json=test_contact_data, headers=headers).json()["id"]
+
+        first_page = client.get("/contacts/?limit=1", headers=headers).headers["ETag"]
+        all_contacts = client.get("/contacts/", headers=headers).headers["ETag"]
+        single = client.get(f"/contacts/{contact_id}", headers=headers)
+
+        assert len({first_page, all_contacts, single.headers["ETag"]}) == 3
+        response = client.get(
+            f"/contacts/{contact_id}", headers={**headers, "If-None-Match": single.headers["ETag"]}
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_import_changes_etag(self, client, authenticated_user, test_contact_data):
+        """Test that a bulk import invalidates the ETag."""
+        import json
+
+        headers = authenticated_user["headers"]
+        etag = client.get("/contacts/", headers=headers).headers["ETag"]
+        client.post(
+            "/contacts/import?format=ndjson", content=json.dumps(test_contact_data), headers=headers
+        )
+
+        response = client.get("/contacts/", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_failed_bump_does_not_validate_old_etag(
+        self, client, authenticated_user, test_contact_data, monkeypatch
+    ):
+        """Test that a write whose version bump failed is not answered with 304."""
+        from redis.exceptions import ConnectionError as RedisConnectionError
+        from src.core import cache
+
+        headers = authenticated_user["headers"]
+        contact_id = client.post("/contacts/", json=test_contact_data, headers=headers).json()["id"]
+        etag = client.get(f"/contacts/{contact_id}", headers=headers).headers["ETag"]
+        bump = cache.bump_contacts_version
+
+        async def failing_bump(user_id):
+            raise RedisConnectionError("down")
+
+        monkeypatch.setattr(cache, "bump_contacts_version", failing_bump)
+        client.put(
+            f"/contacts/{contact_id}", json=dict(test_contact_data, first_name="X"), headers=headers
+        )
+        response = client.get(f"/contacts/{contact_id}", headers={**headers, "If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "ETag" not in response.headers
+        assert response.json()["first_name"] == "X"
+
+        monkeypatch.setattr(cache, "bump_contacts_version", bump)
+        response = client.get(f"/contacts/{contact_id}", headers={**headers, "If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["ETag"] != etag
+
+class TestResultCache:
+    """Test cached contact listings."""
+
+    def test_repeat_list_served_from_cache(
+        self, client, authenticated_user, test_contact_data, query_counter
+    ):
+        """Test that a repeated listing runs no SQL and returns the same body."""
+        headers = authenticated_user["headers"]
+        client.post("/contacts/", json=test_contact_data, headers=headers)
+        first = client.get("/contacts/?limit=1&skip=0", headers=headers)
+        query_counter.clear()
+
+        second = client.get("/contacts/?skip=0&limit=1", headers=headers)
+
+        assert second.status_code == status.HTTP_200_OK
+        assert second.content == first.content
+        assert second.headers["X-Next-Cursor"] == first.headers["X-Next-Cursor"]
+        assert query_counter == []
+
+    def test_write_invalidates_cached_list(self, client, authenticated_user, test_contact_data):
+        """Test that a contact write is visible on the next listing."""
+        headers = authenticated_user["headers"]
+        assert client.get("/contacts/", headers=headers).json() == []
+
+        client.post("/contacts/", json=test_contact_data, headers=headers)
+
+        assert len(client.get("/contacts/", headers=headers).json()) == 1
+
+    def test_birthdays_cached(
+        self, client, authenticated_user, test_contact_data, query_counter
+    ):
+        """Test that the upcoming birthdays list is cached per days value."""
+        headers = authenticated_user["headers"]
+        first = client.get("/contacts/birthdays/upcoming?days=30", headers=headers)
+        query_counter.clear()
+
+        second = client.get("/contacts/birthdays/upcoming?days=30", headers=headers)
+        assert second.content == first.content
+        assert query_counter == []
+
+        client.get("/contacts/birthdays/upcoming?days=31", headers=headers)
+        assert query_counter != []
+
+    def test_works_without_redis(
+        self, client, authenticated_user, test_contact_data, redis_down
+    ):
+        """Test that listings bypass the cache when Redis is down."""
+        headers = authenticated_user["headers"]
+        client.post("/contacts/", json=test_contact_data, headers=headers)
+
+        redis_down("get", "hgetall")
+        response = client.get("/contacts/", headers=headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "ETag" not in response.headers
+        assert len(response.json()) == 1
+
+    def test_writes_succeed_without_redis(
+        self, client, authenticated_user, test_contact_data, redis_down
+    ):
+        """Test that committed writes are not reported as failures when the version bump fails."""
+        import json
+
+        headers = authenticated_user["headers"]
+        redis_down("pipeline")
+        response = client.post("/contacts/", json=test_contact_data, headers=headers)
+        assert response.status_code == status.HTTP_201_CREATED
+        contact_id = response.json()["id"]
+
+        response = client.put(
+            f"/contacts/{contact_id}", json=dict(test_contact_data, first_name="Jane"), headers=headers
+        )
+        assert response.status_code == status.HTTP_200_OK
+        response = client.post(
+            "/contacts/import?format=ndjson",
+            content=json.dumps(dict(test_contact_data, email="other@example.com")),
+            headers=headers
+        )
+        assert response.json()["created"] == 1
+        response = client.post(
+            "/contacts/batch", json={"operations": [{"op": "delete", "id": contact_id}]},
+            headers=headers
+        )
+        assert response.json()[0]["status"] == 200
+        contact_id = client.post("/contacts/", json=test_contact_data, headers=headers).json()["id"]
+        assert client.delete(f"/contacts/{contact_id}", headers=headers).status_code == status.HTTP_200_OK
+
+class TestSerialization:
+    """Test the fast contact list serializer."""
+
+    def test_matches_response_model_encoding(self):
+        """Test byte equality with FastAPI's response_model path."""
+        import json
+        from datetime import date
+        from types import SimpleNamespace
+        from fastapi.encoders import jsonable_encoder
+        from pydantic import TypeAdapter
+        from src.schemas.contact import ContactResponse
+        from src.services.contact_cache import serialize_contacts
+
+        contacts = [
+            SimpleNamespace(
+                id=1, first_name="Іван", last_name="O'Brien \"Jr\"", email="ivan@example.com",
+                phone="+380501234567", birthday=date(1990, 2, 28), additional_data="tab\there"
+            ),
+            SimpleNamespace(
+                id=2, first_name="Jane", last_name="Doe", email="jane@example.com",
+                phone="+1", birthday=date(2000, 12, 31), additional_data=None
+            ),
+        ]
+        adapter = TypeAdapter(list[ContactResponse])
+        expected = json.dumps(
+            jsonable_encoder(adapter.validate_python(contacts, from_attributes=True)),
+            ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+        ).encode()
+
+        assert serialize_contacts(contacts) == expected
+
+    def test_openapi_schema_unchanged(self, client):
+        """Test that the list route still documents List[ContactResponse]."""
+        schema = client.get("/openapi.json").json()
+        operation = schema["paths"]["/contacts/"]["get"]
+        content = operation["responses"]["200"]["content"]["application/json"]
+
+        assert content["schema"]["items"] == {"$ref": "#/components/schemas/ContactResponse"}
+        assert {p["name"] for p in operation["parameters"]} == {
+            "skip", "limit", "cursor", "q", "first_name", "last_name", "email"
+        }
+
+class TestBatch:
+    """Test transactional batch mutations."""
+
+    def _contact(self, i):
+        return {
+            "first_name": f"First{i}",
+            "last_name": f"Last{i}",
+            "email": f"batch{i}@example.com",
+            "phone": "+380501234567",
+            "birthday": "1990-05-15",
+            "additional_data": None
+        }
+
+    def test_mixed_operations(self, client, authenticated_user, test_contact_data):
+        """Test create, update, delete and missing ids in one batch."""
+        headers = authenticated_user["headers"]
+        keep = client.post("/contacts/", json=test_contact_data, headers=headers).json()["id"]
+        drop = client.post(
+            "/contacts/", json=dict(test_contact_data, email="drop@example.com"), headers=headers
+        ).json()["id"]
+
+        response = client.post("/contacts/batch", json={"operations": [
+            {"op": "create", "contact": self._contact(1)},
+            {"op": "update", "id": keep, "contact": dict(test_contact_data, first_name="Updated")},
+            {"op": "delete", "id": drop},
+            {"op": "update", "id": drop, "contact": test_contact_data},
+            {"op": "delete", "id": 999999},
+        ]}, headers=headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        results = response.json()
+        assert [r["status"] for r in results] == [201, 200, 200, 404, 404]
+        assert [r["index"] for r in results] == [0, 1, 2, 3, 4]
+        created = results[0]["id"]
+
+        contacts = {c["id"]: c for c in client.get("/contacts/", headers=headers).json()}
+        assert set(contacts) == {keep, created}
+        assert contacts[keep]["first_name"] == "Updated"
+        assert contacts[created]["email"] == "batch1@example.com"
+
+    def test_updated_birthday_is_searchable(self, client, authenticated_user, test_contact_data):
+        """Test that the batch update keeps birthday_md in sync."""
+        from datetime import date, timedelta
+
+        headers = authenticated_user["headers"]
+        contact_id = client.post("/contacts/", json=test_contact_data, headers=headers).json()["id"]
+        soon = date.today() + timedelta(days=2)
+
+        client.post("/contacts/batch", json={"operations": [{
+            "op": "update", "id": contact_id,
+            "contact": dict(test_contact_data, birthday=soon.replace(year=1990).isoformat())
+        }]}, headers=headers)
+
+        upcoming = client.get("/contacts/birthdays/upcoming?days=3", headers=headers).json()
+        assert [c["id"] for c in upcoming] == [contact_id]
+
+    def test_other_users_contacts_untouched(
+        self, client, authenticated_user, test_contact_data, db_session
+    ):
+        """Test that ids of another user's contacts report 404."""
+        import asyncio
+        from datetime import date
+        from src.models.contact import Contact
+        from src.models.user import User
+
+        async def seed():
+            other = User(username="other", email="other@example.com", hashed_password="x")
+            db_session.add(other)
+            await db_session.flush()
+            contact = Contact(
+                **dict(test_contact_data, birthday=date(1990, 1, 1)), user_id=other.id
+            )
+            db_session.add(contact)
+            await db_session.commit()
+            return contact.id
+
+        foreign_id = asyncio.run(seed())
+
+        response = client.post("/contacts/batch", json={"operations": [
+            {"op": "delete", "id": foreign_id},
+            {"op": "update", "id": foreign_id, "contact": test_contact_data},
+        ]}, headers=authenticated_user["headers"])
+
+        assert [r["status"] for r in response.json()] == [404, 404]
+
+    @pytest.mark.query_budget("POST /contacts/batch", 101)
+    def test_set_based_statements(self, client, authenticated_user, query_counter):
+        """Test that a large batch runs a constant number of statements."""
+        headers = authenticated_user["headers"]
+        created = client.post("/contacts/batch", json={"operations": [
+            {"op": "create", "contact": self._contact(i)} for i in range(100)
+        ]}, headers=headers).json()
+        ids = [r["id"] for r in created]
+        assert len(set(ids)) == 100
+        query_counter.clear()
+
+        response = client.post("/contacts/batch", json={"operations": [
+            *({"op": "update", "id": i, "contact": self._contact(i)} for i in ids[:50]),
+            *({"op": "delete", "id": i} for i in ids[50:]),
+        ]}, headers=headers)
+
+        assert {r["status"] for r in response.json()} == {200}
+        # ownership SELECT, UPDATE, DELETE; creates batch only where the dialect
+        # can order RETURNING rows (PostgreSQL), SQLite inserts them one by one
+        assert len(query_counter) == 3
+        assert len(client.get("/contacts/", headers=headers).json()) == 50
+
+    @pytest.mark.parametrize("operation", [
+        {"op": "update", "contact": None},
+        {"op": "delete"},
+        {"op": "create"},
+        {"op": "rename", "id": 1},
+    ])
+    def test_invalid_operation(self, client, authenticated_user, operation):
+        """Test validation of malformed operations."""
+        response = client.post(
+            "/contacts/batch", json={"operations": [operation]},
+            headers=authenticated_user["headers"]
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_empty_batch_rejected(self, client, authenticated_user):
+        """Test that a batch needs at least one operation."""
+        response = client.post(
+            "/contacts/batch", json={"operations": []}, headers=authenticated_user["headers"]
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_postgres_update_from_values(self):
+        """Test the PostgreSQL UPDATE ... FROM (VALUES ...) statement."""
+        from datetime import date
+        from sqlalchemy.dialects.postgresql import asyncpg
+        from src.crud.contact import _postgres_bulk_update
+
+        row = dict(self._contact(1), birthday=date(1990, 5, 15), birthday_md=515)
+        sql = str(_postgres_bulk_update(7, {1: row, 2: row}).compile(dialect=asyncpg.dialect()))
+
+        assert "FROM (VALUES ($1::INTEGER, $2::VARCHAR" in sql
+        assert "$6::DATE" in sql
+        assert "WHERE contacts.id = changes.id AND contacts.user_id =" in sql
@@ -3,7 +3,11 @@ from src.core.auth import (
     verify_password, 
     get_password_hash, 
     create_access_token, 
-    verify_token
+    verify_token,
+    decode_access_token,
+    get_password_hash_async,
+    verify_and_update_password_async,
+    get_hashing_stats
 )
 from fastapi import HTTPException
 
@@ -34,6 +38,42 @@ class TestPasswordHashing:
         
         assert verify_password(wrong_password, hashed) is False
 
+class TestAsyncPasswordHashing:
+    """Test password hashing in the hashing pool."""
+
+    @pytest.mark.asyncio
+    async def test_hash_and_verify_async(self):
+        """Test async hash/verify round trip and completed counter."""
+        completed = get_hashing_stats()["completed"]
+        hashed = await get_password_hash_async("testpassword123")
+
+        valid, new_hash = await verify_and_update_password_async("testpassword123", hashed)
+        assert valid is True
+        assert new_hash is None
+        assert get_hashing_stats()["completed"] == completed + 2
+        assert get_hashing_stats()["pending"] == 0
+
+    @pytest.mark.asyncio
+    async def test_verify_wrong_password_async(self):
+        """Test async verification with wrong password."""
+        hashed = await get_password_hash_async("testpassword123")
+
+        valid, new_hash = await verify_and_update_password_async("wrongpassword", hashed)
+        assert valid is False
+        assert new_hash is None
+
+    @pytest.mark.asyncio
+    async def test_outdated_cost_needs_rehash(self):
+        """Test that a hash with a different cost factor gets replaced."""
+        from passlib.context import CryptContext
+
+        cheap = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("testpassword123")
+
+        valid, new_hash = await verify_and_update_password_async("testpassword123", cheap)
+        assert valid is True
+        assert new_hash is not None
+        assert not new_hash.startswith("$2b$04$")
+
 class TestJWTTokens:
     """Test JWT token functions."""
     
@@ -55,6 +95,14 @@ class TestJWTTokens:
         decoded_email = verify_token(token)
         assert decoded_email == email
 
+    def test_decode_access_token_keeps_user_id(self):
+        """Test that the user id claim survives the token round trip."""
+        token = create_access_token({"sub": "test@example.com", "uid": 7})
+        
+        payload = decode_access_token(token)
+        assert payload["sub"] == "test@example.com"
+        assert payload["uid"] == 7
+
     def test_verify_token_invalid(self):
         """Test token verification with invalid token."""
         invalid_token = "invalid.jwt.token"
@@ -70,4 +118,66 @@ class TestJWTTokens:
         
         with pytest.raises(HTTPException) as exc:
             verify_token(token)
-        assert exc.value.status_code == 401
\ No newline at end of file
+        assert exc.value.status_code == 401
+
+
+class TestTokenCache:
+    """Test verified-token cache."""
+
+    @pytest.fixture
+    def decode_calls(self, monkeypatch):
+        """Count calls into the JWT backend."""
+        from src.core import auth
+
+        calls = []
+        encode, real_decode, error = auth.get_jwt_backend()
+
+        def counting_decode(*args, **kwargs):
+            calls.append(args[0])
+            return real_decode(*args, **kwargs)
+
+        monkeypatch.setattr(auth, "_jwt_backend", (encode, counting_decode, error))
+        return calls
+
+    def test_repeat_token_skips_backend(self, decode_calls):
+        """Test that a verified token is served from the cache."""
+        token = create_access_token({"sub": "test@example.com", "uid": 7})
+
+        first = decode_access_token(token)
+        first["sub"] = "mutated"
+        second = decode_access_token(token)
+
+        assert second["sub"] == "test@example.com"
+        assert second["uid"] == 7
+        assert len(decode_calls) == 1
+
+    def test_not_served_past_expiry(self, decode_calls, monkeypatch):
+        """Test that an expired cache entry is handed back to the backend."""
+        from src.core import auth
+
+        token = create_access_token({"sub": "test@example.com"})
+        exp = decode_access_token(token)["exp"]
+
+        monkeypatch.setattr(auth.time, "time", lambda: exp + 1)
+        decode_access_token(token)
+        assert len(decode_calls) == 2
+
+    def test_invalid_tokens_not_cached(self, decode_calls):
+        """Test that rejected tokens are checked every time."""
+        from src.core import auth
+
+        for _ in range(2):
+            with pytest.raises(HTTPException):
+                verify_token("invalid.jwt.token")
+
+        assert len(decode_calls) == 2
+        assert len(auth.token_cache) == 0
+
+    def test_unknown_backend(self):
+        """Test that backends are looked up by name."""
+        from src.core.auth import load_jwt_backend
+
+        encode, decode, error = load_jwt_backend("jose")
+        assert issubclass(error, Exception)
+        with pytest.raises(KeyError):
+            load_jwt_backend("nope")
@@ -0,0 +1,98 @@
+import io
+import pytest
+from fastapi import status
+from PIL import Image
+from src.core.config import settings
+from src.services import avatar_storage, avatars
+from src.services.avatar_storage import LocalStorage
+
+def _image_bytes(size=(640, 480), mode="RGBA", fmt="PNG"):
+    buffer = io.BytesIO()
+    Image.new(mode, size, (200, 30, 30, 128) if mode == "RGBA" else (200, 30, 30)).save(buffer, fmt)
+    return buffer.getvalue()
+
+@pytest.fixture
+def local_storage(tmp_path, monkeypatch):
+    """Store avatars in a temporary directory and count uploads."""
+    storage = LocalStorage(str(tmp_path), "/media/avatars")
+    saved = []
+    original_save = storage.save
+
+    async def counting_save(name, data):
+        saved.append(name)
+        return await original_save(name, data)
+
+    monkeypatch.setattr(storage, "save", counting_save)
+    monkeypatch.setattr(avatar_storage, "_storage", storage)
+    return tmp_path, saved
+
+class TestProcessAvatar:
+    """Test local image processing."""
+
+    def test_resizes_to_square_jpeg(self):
+        """Test that any image becomes a 200x200 JPEG."""
+        result = Image.open(io.BytesIO(avatars.process_avatar(_image_bytes())))
+
+        assert result.format == "JPEG"
+        assert result.size == (200, 200)
+
+    def test_rejects_non_image(self):
+        """Test that garbage is reported as invalid."""
+        with pytest.raises(avatars.InvalidAvatar):
+            avatars.process_avatar(b"definitely not an image")
+
+class TestAvatarUpload:
+    """Test avatar upload endpoint."""
+
+    def _upload(self, client, headers, data, name="avatar.png"):
+        return client.post(
+            "/auth/avatar", files={"file": (name, data, "image/png")}, headers=headers
+        )
+
+    def test_upload_stores_resized_avatar(self, client, authenticated_user, local_storage):
+        """Test upload to local storage and avatar URL update."""
+        directory, saved = local_storage
+
+        response = self._upload(client, authenticated_user["headers"], _image_bytes())
+
+        assert response.status_code == status.HTTP_200_OK
+        avatar_url = response.json()["avatar_url"]
+        assert avatar_url == f"/media/avatars/{saved[0]}.jpg"
+        stored = Image.open(directory / f"{saved[0]}.jpg")
+        assert stored.size == (200, 200)
+        me = client.get("/auth/me", headers=authenticated_user["headers"]).json()
+        assert me["avatar_url"] == avatar_url
+
+    def test_identical_upload_is_deduplicated(self, client, authenticated_user, local_storage):
+        """Test that the same bytes are processed and stored once."""
+        _, saved = local_storage
+        data = _image_bytes()
+
+        first = self._upload(client, authenticated_user["headers"], data).json()
+        second = self._upload(client, authenticated_user["headers"], data).json()
+
+        assert first["avatar_url"] == second["avatar_url"]
+        assert len(saved) == 1
+
+    def test_invalid_image(self, client, authenticated_user, local_storage):
+        """Test that non-image uploads are rejected."""
+        response = self._upload(client, authenticated_user["headers"], b"plain text")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_file_over_limit(self, client, authenticated_user, local_storage, monkeypatch):
+        """Test that files over AVATAR_MAX_BYTES are refused."""
+        monkeypatch.setattr(settings, "AVATAR_MAX_BYTES", 100)
+
+        response = self._upload(client, authenticated_user["headers"], _image_bytes())
+
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        assert local_storage[1] == []
+
+    def test_body_over_limit_refused_before_reading(self, client, authenticated_user):
+        """Test that an oversized request body is cut off by the middleware."""
+        data = b"\0" * (settings.AVATAR_MAX_BYTES + 128 * 1024)
+
+        response = self._upload(client, authenticated_user["headers"], data)
+
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
@@ -0,0 +1,300 @@
+import asyncio
+
+import pytest
+from src.core import cache
+from src.core.cache import LocalCache
+from src.core.config import settings
+from src.models.user import User
+
+@pytest.fixture
+def user():
+    """Detached user object for caching."""
+    return User(
+        id=1,
+        username="testuser",
+        email="test@example.com",
+        is_verified=False,
+        avatar_url=None
+    )
+
+class TestLocalCache:
+    """Test in-process LRU cache."""
+
+    def test_evicts_least_recently_used(self):
+        """Test that the oldest untouched entry is dropped first."""
+        local = LocalCache(maxsize=2, ttl=60)
+        local.set("a", 1)
+        local.set("b", 2)
+        local.get("a")
+        local.set("c", 3)
+
+        assert local.get("a") == 1
+        assert local.get("b") is None
+        assert local.get("c") == 3
+
+    def test_expires_after_ttl(self, monkeypatch):
+        """Test that entries are not served past their TTL."""
+        now = [100.0]
+        monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+        local = LocalCache(maxsize=2, ttl=5)
+        local.set("a", 1)
+
+        now[0] += 4
+        assert local.get("a") == 1
+        now[0] += 2
+        assert local.get("a") is None
+
+    def test_per_entry_ttl_is_capped(self, monkeypatch):
+        """Test that a per-entry TTL can shorten but not extend the lifetime."""
+        now = [100.0]
+        monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+        local = LocalCache(maxsize=2, ttl=5)
+        local.set("short", 1, ttl=1)
+        local.set("long", 2, ttl=60)
+
+        now[0] += 2
+        assert local.get("short") is None
+        assert local.get("long") == 2
+        now[0] += 4
+        assert local.get("long") is None
+
+class TestUserCache:
+    """Test two-tier user cache."""
+
+    def test_local_hit_skips_redis(self, fake_redis, user):
+        """Test that a hot user is served from process memory."""
+        asyncio.run(cache.cache_user(user))
+        fake_redis.flushall()
+
+        assert asyncio.run(cache.get_cached_user(1))["email"] == "test@example.com"
+        assert cache.get_cache_stats()["local"]["hits"] == 1
+
+    def test_redis_hit_fills_local_tier(self, user):
+        """Test that a Redis hit is copied into the local tier."""
+        asyncio.run(cache.cache_user(user))
+        cache.local_cache.clear()
+
+        assert asyncio.run(cache.get_cached_user(1))["username"] == "testuser"
+        assert asyncio.run(cache.get_cached_user(1))["username"] == "testuser"
+
+        stats = cache.get_cache_stats()
+        assert stats["local"] == {"hits": 1, "misses": 1, "size": 1}
+        assert stats["redis"] == {"hits": 1, "misses": 0}
+
+    def test_miss_counts_both_tiers(self):
+        """Test miss counters for an uncached user."""
+        assert asyncio.run(cache.get_cached_user(42)) is None
+
+        stats = cache.get_cache_stats()
+        assert stats["local"]["misses"] == 1
+        assert stats["redis"]["misses"] == 1
+
+    def test_invalidate_publishes_user_id(self, fake_redis, user):
+        """Test that invalidation is broadcast to other workers."""
+        pubsub = fake_redis.pubsub()
+        pubsub.subscribe(settings.USER_CACHE_CHANNEL)
+        assert pubsub.get_message(timeout=1)["type"] == "subscribe"
+        asyncio.run(cache.cache_user(user))
+
+        asyncio.run(cache.invalidate_user_cache(1))
+
+        message = pubsub.get_message(timeout=1)
+        assert message["data"] == b"1"
+        assert asyncio.run(cache.get_cached_user(1)) is None
+
+    def test_invalidation_message_evicts_local_copy(self, user):
+        """Test that a message from another worker drops the local entry."""
+        cache.local_cache.set(1, {"id": 1})
+
+        cache._handle_invalidation({"data": b"1"})
+
+        assert cache.local_cache.get(1) is None
+
+class TestMultiKey:
+    """Test pipelined multi-key cache operations."""
+
+    def test_many_primitives(self, fake_redis):
+        """Test set/get/delete of several keys at once."""
+        asyncio.run(cache.set_many({"a": "1", "b": b"2"}, expire_seconds=30))
+
+        assert asyncio.run(cache.get_many(["a", "missing", "b"])) == [b"1", None, b"2"]
+        assert 0 < fake_redis.ttl("b") <= 30
+        assert asyncio.run(cache.delete_many(["a", "b", "missing"])) == 2
+        assert asyncio.run(cache.get_many([])) == []
+
+    def test_users_fetched_with_one_mget(self, user, monkeypatch):
+        """Test that users missing locally are read in a single round trip."""
+        other = User(id=2, username="other", email="other@example.com",
+                     is_verified=True, avatar_url=None)
+        asyncio.run(cache.cache_users([user, other]))
+        cache.local_cache.clear()
+
+        calls = []
+        mget = cache.async_redis_client.mget
+
+        async def counting_mget(keys):
+            calls.append(keys)
+            return await mget(keys)
+
+        monkeypatch.setattr(cache.async_redis_client, "mget", counting_mget)
+        found = asyncio.run(cache.get_cached_users([1, 2, 3]))
+
+        assert sorted(found) == [1, 2]
+        assert found[2]["email"] == "other@example.com"
+        assert calls == [["user:1", "user:2", "user:3"]]
+        assert asyncio.run(cache.get_cached_users([1, 2])).keys() == {1, 2}
+        assert len(calls) == 1
+
+    def test_invalidate_several_users(self, fake_redis, user):
+        """Test that invalidation drops, pins and announces every user."""
+        pubsub = fake_redis.pubsub()
+        pubsub.subscribe(settings.USER_CACHE_CHANNEL)
+        pubsub.get_message(timeout=1)
+        asyncio.run(cache.cache_user(user))
+
+        asyncio.run(cache.invalidate_users([1, 2]))
+
+        assert fake_redis.get("user:1") is None
+        assert cache.local_cache.get(1) is None
+        assert fake_redis.exists("db:primary:1", "db:primary:2") == 2
+        assert [pubsub.get_message(timeout=1)["data"] for _ in range(2)] == [b"1", b"2"]
+
+@pytest.fixture
+def loader(user):
+    """Counting stand-in for the database lookup of ``user``."""
+    class Loader:
+        calls = 0
+        result = user
+
+        async def __call__(self):
+            self.calls += 1
+            await asyncio.sleep(0.01)
+            return self.result
+
+    return Loader()
+
+@pytest.fixture
+def fast_lock(monkeypatch):
+    """Short reload lock so waits end quickly."""
+    monkeypatch.setattr(settings, "USER_CACHE_LOCK_TIMEOUT", 0.2)
+    monkeypatch.setattr(settings, "USER_CACHE_LOCK_POLL_INTERVAL", 0.01)
+
+class TestStampedeProtection:
+    """Test single-flight loads, the reload lock and early refresh."""
+
+    def test_concurrent_misses_load_once(self, loader):
+        """Test that simultaneous misses in one process share a load."""
+        async def burst():
+            return await asyncio.gather(*(cache.get_or_load_user(1, loader) for _ in range(20)))
+
+        results = asyncio.run(burst())
+
+        assert loader.calls == 1
+        assert all(result["email"] == "test@example.com" for result in results)
+        assert cache.get_cache_stats()["stampede"]["coalesced"] == 19
+
+    def test_waits_for_other_worker(self, fake_redis, user, loader, fast_lock):
+        """Test that a miss waits for the worker holding the lock."""
+        fake_redis.set("lock:user:1", "other-worker")
+
+        async def other_worker_finishes():
+            await asyncio.sleep(0.03)
+            await cache.cache_users([user])
+            cache.local_cache.clear()
+
+        async def scenario():
+            result, _ = await asyncio.gather(
+                cache.get_or_load_user(1, loader), other_worker_finishes()
+            )
+            return result
+
+        assert asyncio.run(scenario())["username"] == "testuser"
+        assert loader.calls == 0
+        assert cache.get_cache_stats()["stampede"]["lock_waits"] == 1
+
+    def test_loads_when_lock_holder_never_finishes(self, fake_redis, loader, fast_lock):
+        """Test that waiting is bounded by the lock timeout."""
+        fake_redis.set("lock:user:1", "other-worker")
+
+        assert asyncio.run(cache.get_or_load_user(1, loader))["id"] == 1
+        assert loader.calls == 1
+
+    def test_expired_entry_served_while_locked(self, fake_redis, user, loader):
+        """Test that others get the stale entry while one request reloads."""
+        asyncio.run(cache.cache_users([user], expire_seconds=0))
+        cache.local_cache.clear()
+        fake_redis.set("lock:user:1", "other-worker")
+        loader.result = User(id=1, username="renamed", email="test@example.com",
+                             is_verified=True, avatar_url=None)
+
+        assert asyncio.run(cache.get_or_load_user(1, loader))["username"] == "testuser"
+        assert loader.calls == 0
+        assert cache.get_cache_stats()["stampede"]["stale_served"] == 1
+
+    def test_expired_entry_reloaded_by_lock_holder(self, fake_redis, user, loader):
+        """Test that the request getting the lock refreshes the entry."""
+        asyncio.run(cache.cache_users([user], expire_seconds=0))
+        cache.local_cache.clear()
+        loader.result = User(id=1, username="renamed", email="test@example.com",
+                             is_verified=True, avatar_url=None)
+
+        assert asyncio.run(cache.get_or_load_user(1, loader))["username"] == "renamed"
+        assert loader.calls == 1
+        assert not fake_redis.exists("lock:user:1")
+        assert 300 < fake_redis.ttl("user:1") <= 300 + settings.USER_CACHE_STALE_SECONDS
+
+    def test_expensive_entry_refreshed_early(self, user, loader, monkeypatch):
+        """Test XFetch: a slow-to-load entry is refreshed before it expires."""
+        asyncio.run(cache.cache_users([user], delta=1e6))
+        cache.local_cache.clear()
+
+        asyncio.run(cache.get_or_load_user(1, loader))
+        assert loader.calls == 1
+        assert cache.get_cache_stats()["stampede"]["early_refreshes"] == 1
+
+        monkeypatch.setattr(settings, "USER_CACHE_XFETCH_BETA", 0.0)
+        asyncio.run(cache.cache_users([user], delta=1e6))
+        cache.local_cache.clear()
+        asyncio.run(cache.get_or_load_user(1, loader))
+        assert loader.calls == 1
+
+    def test_unknown_user_not_cached(self, fake_redis, loader):
+        """Test that a failed lookup returns None and stores nothing."""
+        loader.result = None
+
+        assert asyncio.run(cache.get_or_load_user(1, loader)) is None
+        assert fake_redis.get("user:1") is None
+        assert not fake_redis.exists("lock:user:1")
+
+class TestResultCache:
+    """Test versioned result cache."""
+
+    def test_version_bump_hides_old_entries(self):
+        """Test that a collection write makes cached results unreachable."""
+        version = asyncio.run(cache.get_contacts_version(1))
+        asyncio.run(cache.cache_result(1, version, "page", b"[]", cursor="abc"))
+
+        cached = asyncio.run(cache.get_cached_result(1, version, "page"))
+        assert cached == {"body": b"[]", "cursor": "abc"}
+        new_version = asyncio.run(cache.bump_contacts_version(1))
+        assert new_version == version + 1
+        assert asyncio.run(cache.get_cached_result(1, new_version, "page")) is None
+
+    def test_entries_expire(self, fake_redis):
+        """Test that result entries carry a TTL."""
+        asyncio.run(cache.cache_result(1, 1, "page", b"[]", expire_seconds=30))
+
+        assert 0 < fake_redis.ttl("contacts:result:1:1:page") <= 30
+
+    def test_stats_report_hit_rate_and_bytes(self):
+        """Test hit rate and byte counters."""
+        asyncio.run(cache.cache_result(1, 1, "page", b"[1,2]"))
+        asyncio.run(cache.get_cached_result(1, 1, "page"))
+        asyncio.run(cache.get_cached_result(1, 1, "other"))
+
+        results = cache.get_cache_stats()["results"]
+        assert results["hits"] == 1
+        assert results["misses"] == 1
+        assert results["hit_rate"] == 0.5
+        assert results["bytes_stored"] == 5
+        assert results["bytes_served"] == 5
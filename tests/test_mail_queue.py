@@ -0,0 +1,167 @@
+import asyncio
+import json
+import socket
+import pytest
+from aiosmtpd.controller import Controller
+from src.services import mail_queue
+from src.services.mail_queue import MailWorker, enqueue_email
+
+class RecordingHandler:
+    """aiosmtpd handler that keeps delivered messages and counts sessions."""
+
+    def __init__(self, reject_to=None):
+        self.messages = []
+        self.sessions = 0
+        self.reject_to = reject_to
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address == self.reject_to:
+            return "550 mailbox unavailable"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return "250 Message accepted"
+
+@pytest.fixture
+def smtp_server():
+    """Local SMTP stand-in."""
+    handler = RecordingHandler(reject_to="bounce@example.com")
+    port = _free_port()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    yield handler, port
+    controller.stop()
+
+def _worker(port, **kwargs):
+    return MailWorker(
+        hostname="127.0.0.1",
+        port=port,
+        username="",
+        start_tls=False,
+        sender="noreply@example.com",
+        **kwargs
+    )
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class TestMailQueue:
+    """Test outbound mail queue and worker."""
+
+    @pytest.mark.asyncio
+    async def test_batch_reuses_one_connection(self, smtp_server):
+        """Test that a batch is delivered over a single SMTP session."""
+        handler, port = smtp_server
+        for i in range(3):
+            await enqueue_email("Hello", [f"user{i}@example.com"], "<p>Hi</p>")
+        worker = _worker(port)
+
+        assert await worker.process_batch() == 3
+        await worker.close()
+
+        assert len(handler.messages) == 3
+        assert handler.sessions == 1
+        assert handler.messages[0].rcpt_tos == ["user0@example.com"]
+
+    @pytest.mark.asyncio
+    async def test_unreachable_server_schedules_retry(self, fake_redis):
+        """Test that connection failures are retried with backoff."""
+        await enqueue_email("Hello", ["user@example.com"], "<p>Hi</p>")
+        worker = _worker(_free_port(), base_delay=10)
+
+        await worker.process_batch()
+
+        retries = fake_redis.zrange(mail_queue.RETRY_KEY, 0, -1, withscores=True)
+        assert len(retries) == 1
+        assert json.loads(retries[0][0])["attempts"] == 1
+        assert fake_redis.llen(mail_queue.QUEUE_KEY) == 0
+
+    @pytest.mark.asyncio
+    async def test_dead_letter_after_max_attempts(self, fake_redis):
+        """Test that a job is dead-lettered once attempts run out."""
+        await enqueue_email("Hello", ["user@example.com"], "<p>Hi</p>")
+        worker = _worker(_free_port(), max_attempts=2, base_delay=0)
+
+        await worker.process_batch()
+        await worker.process_batch()
+
+        dead = [json.loads(raw) for raw in fake_redis.lrange(mail_queue.DEAD_KEY, 0, -1)]
+        assert len(dead) == 1
+        assert dead[0]["attempts"] == 2
+        assert "error" in dead[0]
+
+    @pytest.mark.asyncio
+    async def test_permanent_rejection_dead_letters(self, smtp_server, fake_redis):
+        """Test that a 5xx rejection is not retried."""
+        handler, port = smtp_server
+        await enqueue_email("Hello", ["bounce@example.com"], "<p>Hi</p>")
+        await enqueue_email("Hello", ["ok@example.com"], "<p>Hi</p>")
+        worker = _worker(port)
+
+        await worker.process_batch()
+        await worker.close()
+
+        assert fake_redis.llen(mail_queue.DEAD_KEY) == 1
+        assert fake_redis.zcard(mail_queue.RETRY_KEY) == 0
+        assert [m.rcpt_tos for m in handler.messages] == [["ok@example.com"]]
+
+    @pytest.mark.asyncio
+    async def test_malformed_job_dead_letters(self, smtp_server, fake_redis):
+        """Test that an undecodable payload is dead-lettered without stopping the batch."""
+        handler, port = smtp_server
+        fake_redis.lpush(mail_queue.QUEUE_KEY, b"not json")
+        fake_redis.lpush(mail_queue.QUEUE_KEY, json.dumps({"subject": "Hello"}))
+        await enqueue_email("Hello", ["ok@example.com"], "<p>Hi</p>")
+        worker = _worker(port)
+
+        assert await worker.process_batch() == 3
+        await worker.close()
+
+        dead = [json.loads(raw) for raw in fake_redis.lrange(mail_queue.DEAD_KEY, 0, -1)]
+        assert sorted(d["payload"][:8] for d in dead) == ["not json", '{"subjec']
+        assert [m.rcpt_tos for m in handler.messages] == [["ok@example.com"]]
+        assert fake_redis.llen(worker.processing_key) == 0
+
+    @pytest.mark.asyncio
+    async def test_in_flight_jobs_requeued(self, fake_redis):
+        """Test that jobs left by a crashed worker go back on the queue."""
+        await enqueue_email("First", ["user@example.com"], "<p>Hi</p>")
+        await enqueue_email("Second", ["user@example.com"], "<p>Hi</p>")
+        worker = _worker(_free_port(), worker_id="mail-1")
+        for _ in range(2):
+            fake_redis.lmove(mail_queue.QUEUE_KEY, worker.processing_key, "RIGHT", "LEFT")
+
+        assert await worker.requeue_in_flight() == 2
+
+        assert fake_redis.llen(worker.processing_key) == 0
+        assert json.loads(fake_redis.rpop(mail_queue.QUEUE_KEY))["subject"] == "First"
+
+    @pytest.mark.asyncio
+    async def test_run_survives_redis_errors(self, redis_down):
+        """Test that the worker loop keeps going while Redis is down."""
+        redis_down("lmove", "zrangebyscore")
+        task = asyncio.create_task(_worker(_free_port()).run(poll_interval=0.01))
+
+        await asyncio.sleep(0.05)
+        assert not task.done()
+
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+def test_register_queues_verification_email(client, fake_redis, test_user_data):
+    """Test that registration only enqueues the verification email."""
+    response = client.post("/auth/register", json=test_user_data)
+
+    job = json.loads(fake_redis.lindex(mail_queue.QUEUE_KEY, 0))
+    assert job["recipients"] == [test_user_data["email"]]
+    assert f"/auth/verify/{response.json()['id']}" in job["html"]
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import os
+import re
+import runpy
+import subprocess
+import sys
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.core import cache, database, warmup
+from src.main import app
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+# Cost of importing src.main on top of the frameworks it is built on
+IMPORT_TIME_BUDGET_MS = 500
+FRAMEWORKS = "import fastapi, fastapi.security, pydantic, sqlalchemy.ext.asyncio"
+# Imported on first use or during warm-up, never by ``import src.main``
+LAZY_MODULES = ("PIL", "aiosmtplib", "asyncpg", "cloudinary", "jose", "passlib")
+
+def _python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+
+class TestLifespan:
+    """Test per-worker resource setup and teardown."""
+
+    def test_pools_opened_on_startup_and_disposed_on_shutdown(self, monkeypatch):
+        calls = []
+
+        async def open_pools():
+            calls.append("open_pools")
+
+        async def dispose_engines():
+            calls.append("dispose_engines")
+
+        monkeypatch.setattr(database, "open_pools", open_pools)
+        monkeypatch.setattr(database, "dispose_engines", dispose_engines)
+        monkeypatch.setattr(cache, "reset_redis_pool", lambda: calls.append("reset_redis_pool"))
+
+        async def close_redis():
+            calls.append("close_redis")
+
+        monkeypatch.setattr(cache, "close_redis", close_redis)
+
+        with TestClient(app) as client:
+            assert calls == ["open_pools", "reset_redis_pool"]
+            assert client.get("/").status_code == 200
+
+        assert calls == ["open_pools", "reset_redis_pool", "dispose_engines", "close_redis"]
+
+    def test_redis_usable_after_restart(self, fake_redis):
+        fake_redis.set("key", "value")
+        with TestClient(app):
+            pass
+        with TestClient(app):
+            assert fake_redis.get("key") == b"value"
+
+class TestImportTime:
+    """Test that importing the app stays cheap."""
+
+    def test_subsystems_imported_lazily(self):
+        result = _python("-c", (
+            "import json, sys, src.main; "
+            f"print(json.dumps([m for m in {LAZY_MODULES!r} if m in sys.modules]))"
+        ))
+        assert json.loads(result.stdout) == []
+
+    def test_import_time_budget(self):
+        result = _python("-X", "importtime", "-c", f"{FRAMEWORKS}; import src.main")
+        cumulative_us = int(re.search(r"\|\s*(\d+) \| src\.main$", result.stderr, re.M).group(1))
+        assert cumulative_us / 1000 < IMPORT_TIME_BUDGET_MS
+
+@pytest.fixture
+def warmup_steps(monkeypatch):
+    """Replace warm-up steps; returns a setter taking ``{name: coroutine function}``."""
+    def set_steps(steps):
+        monkeypatch.setattr(warmup, "STEPS", list(steps.items()))
+
+    monkeypatch.setattr(warmup, "RETRY_DELAY", 0.01)
+    return set_steps
+
+def _wait_ready(client, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        response = client.get("/ready")
+        if response.status_code == 200:
+            return response
+        time.sleep(0.01)
+    return response
+
+class TestReadiness:
+    """Test the readiness endpoint and warm-up."""
+
+    def test_warming_up_until_steps_finish(self, warmup_steps):
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+
+        async def fast():
+            pass
+
+        warmup_steps({"slow": slow, "fast": fast})
+        with TestClient(app) as client:
+            response = client.get("/ready")
+            assert response.status_code == 503
+            assert response.json() == {"status": "warming_up", "pending": ["slow"]}
+            assert client.get("/").status_code == 200
+
+            client.portal.call(release.set)
+            assert _wait_ready(client).json() == {"status": "ready"}
+
+    def test_failed_step_retried(self, warmup_steps):
+        attempts = []
+
+        async def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise ConnectionError("not up yet")
+
+        warmup_steps({"database": flaky})
+        with TestClient(app) as client:
+            assert _wait_ready(client).status_code == 200
+        assert len(attempts) == 3
+
+class TestServerConfig:
+    """Test the gunicorn settings file."""
+
+    def test_preloads_app_into_uvicorn_workers(self):
+        config = runpy.run_path(os.path.join(os.path.dirname(__file__), "..", "gunicorn.conf.py"))
+        assert config["preload_app"] is True
+        assert config["worker_class"] == "uvicorn_worker.UvicornWorker"
+        assert config["workers"] >= 1
+        assert config["graceful_timeout"] > 0
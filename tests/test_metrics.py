@@ -0,0 +1,145 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+
+from src.core import database, metrics
+from src.core.metrics import Histogram
+
+@pytest.fixture
+def recorded(monkeypatch):
+    """Fresh metrics with the test engine instrumented."""
+    from tests.conftest import engine
+
+    metrics.reset()
+    metrics.instrument_engine(engine)
+    yield
+    metrics.reset()
+
+def _sample(body: str, prefix: str) -> float:
+    for line in body.splitlines():
+        if line.startswith(prefix):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{prefix} not found")
+
+class TestHistogram:
+    """Test Prometheus histogram rendering."""
+
+    def test_cumulative_buckets(self):
+        """Test bucket counts, sum and count lines."""
+        histogram = Histogram("h", "Test.", ("route",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, ("/a",))
+
+        assert histogram.render() == [
+            "# HELP h Test.",
+            "# TYPE h histogram",
+            'h_bucket{route="/a",le="0.1"} 2',
+            'h_bucket{route="/a",le="1.0"} 3',
+            'h_bucket{route="/a",le="+Inf"} 4',
+            'h_sum{route="/a"} 3.65',
+            'h_count{route="/a"} 4',
+        ]
+
+    def test_label_values_escaped(self):
+        """Test that quotes in label values cannot break the format."""
+        histogram = Histogram("h", "Test.", ("route",), buckets=(1.0,))
+        histogram.observe(0.5, ('say "hi"',))
+
+        assert 'h_count{route="say \\"hi\\""} 1' in histogram.render()
+
+class TestMetricsEndpoint:
+    """Test /metrics exposition."""
+
+    def test_route_latency_by_template(
+        self, client, authenticated_user, test_contact_data, recorded
+    ):
+        """Test that requests are labelled by route template and status."""
+        headers = authenticated_user["headers"]
+        contact_id = client.post("/contacts/", json=test_contact_data, headers=headers).json()["id"]
+        client.get(f"/contacts/{contact_id}", headers=headers)
+        client.get("/contacts/999999", headers=headers)
+        client.get("/no/such/path")
+
+        response = client.get("/metrics")
+        body = response.text
+
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert _sample(body, 'http_request_duration_seconds_count{method="GET",'
+                             'route="/contacts/{contact_id}",status="200"}') == 1
+        assert _sample(body, 'http_request_duration_seconds_count{method="GET",'
+                             'route="/contacts/{contact_id}",status="404"}') == 1
+        assert _sample(body, 'http_request_duration_seconds_count{method="GET",'
+                             'route="<unmatched>",status="404"}') == 1
+
+    def test_sql_per_request(self, client, authenticated_user, test_contact_data, recorded):
+        """Test SQL statement counts and time per route."""
+        headers = authenticated_user["headers"]
+        client.post("/contacts/", json=test_contact_data, headers=headers)
+
+        body = client.get("/metrics").text
+
+        assert _sample(body, 'db_statements_per_request_count{route="/contacts/"}') == 1
+        assert _sample(body, 'db_statements_per_request_sum{route="/contacts/"}') >= 1
+        assert _sample(body, 'db_time_per_request_seconds_sum{route="/contacts/"}') > 0
+        assert _sample(body, "db_statement_duration_seconds_count") >= 1
+
+    def test_redis_and_cache_counters(self, client, authenticated_user, recorded):
+        """Test Redis latency and cache hit/miss counters."""
+        headers = authenticated_user["headers"]
+        client.get("/contacts/", headers=headers)
+        client.get("/contacts/", headers=headers)
+
+        body = client.get("/metrics").text
+
+        assert _sample(body, 'redis_operation_duration_seconds_count'
+                             '{operation="get_contacts_version"}') == 2
+        assert _sample(body, 'cache_requests_total{tier="results",result="hit"}') == 1
+        assert _sample(body, 'cache_requests_total{tier="results",result="miss"}') == 1
+        assert _sample(body, 'result_cache_bytes_total{direction="served"}') == 2
+        assert _sample(body, 'db_pool_checked_out{pool="primary"}') == 0
+
+    def test_failed_statement_releases_timer(self, tmp_path, recorded):
+        """Test that a statement that raises does not leave its start time behind."""
+        engine = database.create_engine(f"sqlite+aiosqlite:///{tmp_path / 'errors.db'}", "test")
+        metrics.instrument_engine(engine)
+
+        async def fail_twice():
+            async with engine.connect() as conn:
+                for _ in range(2):
+                    with pytest.raises(Exception):
+                        await conn.execute(text("SELECT * FROM missing_table"))
+                starts = await conn.run_sync(lambda sync_conn: sync_conn.info.get("query_start"))
+            await engine.dispose()
+            return starts
+
+        assert asyncio.run(fail_twice()) == []
+
+    def test_hashing_pool_metrics(self, client, test_user_data, recorded):
+        """Test that hashing queue depth and completed jobs are exported."""
+        before = _sample(client.get("/metrics").text, "password_hash_completed_total ")
+
+        client.post("/auth/register", json=test_user_data)
+        client.post("/auth/login", json=test_user_data)
+
+        body = client.get("/metrics").text
+        assert _sample(body, "password_hash_completed_total ") == before + 2
+        assert _sample(body, "password_hash_pending ") == 0
+        assert _sample(body, "password_hash_workers ") >= 1
+
+class TestPoolMetrics:
+    """Test connection pool instrumentation."""
+
+    def test_checkout_wait_recorded(self, tmp_path, recorded):
+        """Test that obtaining a pooled connection is timed per pool."""
+        engine = database.create_engine(f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}", "test")
+
+        async def use():
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+            await engine.dispose()
+
+        asyncio.run(use())
+
+        body = "\n".join(metrics.render())
+        assert _sample(body, 'db_pool_checkout_wait_seconds_count{pool="test"}') == 1
@@ -0,0 +1,55 @@
+import pytest
+from fastapi.routing import APIRoute
+
+from src.main import app
+from tests.query_budgets import ROUTE_BUDGETS
+
+class TestQueryBudgets:
+    """Test SQL statement budgets."""
+
+    def test_every_route_has_budget(self):
+        """Test that new routes cannot ship without a declared budget."""
+        missing = [
+            f"{method} {route.path}"
+            for route in app.routes if isinstance(route, APIRoute)
+            for method in route.methods
+            if f"{method} {route.path}" not in ROUTE_BUDGETS
+        ]
+        assert missing == []
+
+    def test_over_budget_request_fails(self, client, authenticated_user, sql_budget):
+        """Test that a request over budget fails the test."""
+        with pytest.raises(AssertionError, match="GET /auth/me ran 1 SQL statements"):
+            with sql_budget(0):
+                client.get("/auth/me", headers=authenticated_user["headers"])
+
+    def test_warm_user_costs_no_queries(
+        self, client, authenticated_user, test_contact_data, sql_budget
+    ):
+        """Test that a cached user adds no statements to any route."""
+        headers = authenticated_user["headers"]
+        client.get("/auth/me", headers=headers)
+
+        with sql_budget(0):
+            client.get("/auth/me", headers=headers)
+        with sql_budget(2):
+            contact_id = client.post(
+                "/contacts/", json=test_contact_data, headers=headers
+            ).json()["id"]
+        with sql_budget(1):
+            client.get(f"/contacts/{contact_id}", headers=headers)
+            client.get("/contacts/?limit=10", headers=headers)
+            client.get("/contacts/birthdays/upcoming?days=30", headers=headers)
+            client.get("/contacts/export", headers=headers)
+        with sql_budget(3):
+            client.put(f"/contacts/{contact_id}", json=test_contact_data, headers=headers)
+        with sql_budget(2):
+            client.delete(f"/contacts/{contact_id}", headers=headers)
+
+    def test_cached_listing_costs_no_queries(self, client, authenticated_user, sql_budget):
+        """Test that a repeated listing is answered from the result cache."""
+        headers = authenticated_user["headers"]
+        client.get("/contacts/", headers=headers)
+
+        with sql_budget(0):
+            client.get("/contacts/", headers=headers)
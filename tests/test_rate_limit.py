@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from fastapi import status
+from src.core import auth, rate_limit
+from src.core.rate_limit import SlidingWindowLimiter
+
+class TestSlidingWindowLimiter:
+    """Test Redis sliding-window limiter."""
+
+    def test_limit_and_retry_after(self, monkeypatch):
+        """Test that hits over the limit are rejected until the window slides."""
+        now = [1000.0]
+        monkeypatch.setattr(rate_limit.time, "time", lambda: now[0])
+        limiter = SlidingWindowLimiter("test", limit=2, window=10)
+
+        assert asyncio.run(limiter.hit("k")) is None
+        now[0] += 4
+        assert asyncio.run(limiter.hit("k")) is None
+        now[0] += 1
+        assert asyncio.run(limiter.hit("k")) == pytest.approx(5)
+
+        now[0] += 5.5
+        assert asyncio.run(limiter.hit("k")) is None
+        assert asyncio.run(limiter.hit("other")) is None
+
+    def test_rejected_hits_do_not_extend_window(self, monkeypatch):
+        """Test that hammering while limited does not delay recovery."""
+        now = [1000.0]
+        monkeypatch.setattr(rate_limit.time, "time", lambda: now[0])
+        limiter = SlidingWindowLimiter("test", limit=1, window=10)
+
+        asyncio.run(limiter.hit("k"))
+        for _ in range(5):
+            now[0] += 1
+            assert asyncio.run(limiter.hit("k")) is not None
+
+        now[0] += 5
+        assert asyncio.run(limiter.hit("k")) is None
+
+class TestAuthAdmission:
+    """Test admission control on auth routes."""
+
+    def test_login_limited_per_email(self, client, test_user_data):
+        """Test 429 with Retry-After after too many logins for one account."""
+        login_data = {"email": test_user_data["email"], "password": "wrongpassword"}
+        limit = rate_limit.limiters[("login", "email")].limit
+        for _ in range(limit):
+            assert client.post("/auth/login", json=login_data).status_code == 401
+
+        response = client.post("/auth/login", json=login_data)
+
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert int(response.headers["Retry-After"]) >= 1
+        other = {"email": "other@example.com", "password": "x"}
+        assert client.post("/auth/login", json=other).status_code == 401
+
+    def test_login_limited_per_ip(self, client, monkeypatch):
+        """Test that one client cannot spray many accounts."""
+        monkeypatch.setitem(
+            rate_limit.limiters, ("login", "ip"), SlidingWindowLimiter("login:ip", 3, 60)
+        )
+        for i in range(3):
+            client.post("/auth/login", json={"email": f"u{i}@example.com", "password": "x"})
+
+        response = client.post("/auth/login", json={"email": "u9@example.com", "password": "x"})
+
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+    def test_sheds_load_on_hashing_backlog(self, client, test_user_data, monkeypatch):
+        """Test 503 while the password hashing queue is too deep."""
+        monkeypatch.setitem(auth.hashing_stats, "pending", 10_000)
+
+        response = client.post("/auth/register", json=test_user_data)
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,144 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import status
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from src.core import cache, database
+from src.core.auth import decode_access_token
+from src.core.database import Base, ReplicaSet
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch):
+    """Route reads to an empty SQLite file standing in for a lagging replica."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}", poolclass=NullPool)
+
+    async def create_schema():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    asyncio.run(create_schema())
+    monkeypatch.setattr(database, "replicas", ReplicaSet([engine]))
+    yield engine
+    asyncio.run(engine.dispose())
+
+def _unpin(fake_redis, auth):
+    user_id = decode_access_token(auth["token"])["uid"]
+    fake_redis.delete(f"db:primary:{user_id}")
+
+def _fake_engine(checked_out):
+    return SimpleNamespace(sync_engine=SimpleNamespace(pool=SimpleNamespace(
+        checkedout=lambda: checked_out
+    )))
+
+class TestReadRouting:
+    """Test replica routing with read-your-writes stickiness."""
+
+    def test_reads_use_replica_after_window(
+        self, client, authenticated_user, test_contact_data, replica, fake_redis
+    ):
+        """Test that the writer reads the primary until the pin expires."""
+        headers = authenticated_user["headers"]
+        contact_id = client.post("/contacts/", json=test_contact_data, headers=headers).json()["id"]
+
+        assert client.get(f"/contacts/{contact_id}", headers=headers).status_code == 200
+
+        _unpin(fake_redis, authenticated_user)
+        assert client.get(f"/contacts/{contact_id}", headers=headers).status_code == 404
+        assert client.get("/contacts/?limit=5", headers=headers).json() == []
+        assert client.get("/contacts/birthdays/upcoming?days=366", headers=headers).json() == []
+
+    def test_write_pins_to_primary(
+        self, client, authenticated_user, test_contact_data, replica, fake_redis
+    ):
+        """Test that a mutation sends the user's reads back to the primary."""
+        headers = authenticated_user["headers"]
+        contact_id = client.post("/contacts/", json=test_contact_data, headers=headers).json()["id"]
+        _unpin(fake_redis, authenticated_user)
+
+        response = client.put(
+            f"/contacts/{contact_id}", json=dict(test_contact_data, first_name="Jane"), headers=headers
+        )
+        assert response.status_code == 200
+        assert client.get(f"/contacts/{contact_id}", headers=headers).json()["first_name"] == "Jane"
+
+    def test_auth_lookup_uses_replica(self, client, authenticated_user, replica, fake_redis):
+        """Test that an uncached user is loaded from the replica."""
+        _unpin(fake_redis, authenticated_user)
+        cache.local_cache.clear()
+        for key in fake_redis.scan_iter("user:*"):
+            fake_redis.delete(key)
+
+        response = client.get("/auth/me", headers=authenticated_user["headers"])
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_user_lookup_releases_session(self, authenticated_user, fake_redis):
+        """Test that loading an uncached user does not keep its transaction open."""
+        from src.core.dependencies import get_current_user
+        from tests.conftest import TestingSessionLocal
+
+        payload = decode_access_token(authenticated_user["token"])
+        cache.local_cache.clear()
+        for key in fake_redis.scan_iter("user:*"):
+            fake_redis.delete(key)
+
+        async def lookup():
+            async with TestingSessionLocal() as session:
+                user = await get_current_user(payload, session)
+                return user, session.in_transaction()
+
+        user, in_transaction = asyncio.run(lookup())
+        assert user.id == payload["uid"]
+        assert not in_transaction
+
+    def test_registration_pins_new_user(self, client, authenticated_user, replica):
+        """Test that a fresh account is readable before it replicates."""
+        response = client.get("/auth/me", headers=authenticated_user["headers"])
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_redis_failure_reads_primary(
+        self, client, authenticated_user, test_contact_data, replica, fake_redis, redis_down
+    ):
+        """Test that reads stay on the primary when stickiness is unknown."""
+        headers = authenticated_user["headers"]
+        contact_id = client.post("/contacts/", json=test_contact_data, headers=headers).json()["id"]
+        _unpin(fake_redis, authenticated_user)
+
+        redis_down("exists")
+        assert client.get(f"/contacts/{contact_id}", headers=headers).status_code == 200
+
+    def test_registration_survives_redis_failure(self, client, test_user_data, redis_down):
+        """Test that a committed account is reported as created without Redis."""
+        redis_down("set")
+        response = client.post("/auth/register", json=test_user_data)
+        assert response.status_code == status.HTTP_201_CREATED
+
+class TestReplicaSet:
+    """Test replica selection."""
+
+    def test_round_robin(self):
+        """Test that replicas take turns."""
+        a, b = _fake_engine(0), _fake_engine(0)
+        replicas = ReplicaSet([a, b])
+
+        assert [replicas.pick() for _ in range(4)] == [a, b, a, b]
+
+    def test_least_connections(self):
+        """Test that the least busy replica is chosen."""
+        busy, idle = _fake_engine(5), _fake_engine(1)
+        replicas = ReplicaSet([busy, idle], strategy="least_connections")
+
+        assert [replicas.pick() for _ in range(3)] == [idle, idle, idle]
+
+    def test_least_connections_breaks_ties_round_robin(self):
+        """Test that equally busy replicas still share the load."""
+        a, b = _fake_engine(2), _fake_engine(2)
+        replicas = ReplicaSet([a, b], strategy="least_connections")
+
+        assert [replicas.pick() for _ in range(4)] == [a, b, a, b]
+
+    def test_empty_set_is_falsy(self):
+        """Test that no configured replicas means primary-only routing."""
+        assert not ReplicaSet([])